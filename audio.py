@@ -1,44 +1,126 @@
 # Datei: audio.py
 import pygame
-import threading
 import os
 import atexit
+from audio_decode import decode_pcm
+from segment_cache import segment_cache
+from audio_mixer import AudioMixer, LAYER_AMBIENCE, LAYER_LABELS
+from settings import get_setting, set_setting
 
 pygame.mixer.init()
 
-_current_timer = None
-_current_file = None
+mixer = AudioMixer(
+    sfx_voices=get_setting("sfx_voices"),
+    volumes=get_setting("layer_volumes")
+)
+
+# pygame-Mixerformat -> FFmpeg-Sampleformat
+_FFMPEG_FORMATS = {
+    8: "u8",
+    -8: "s8",
+    16: "u16le",
+    -16: "s16le",
+    32: "f32le",
+}
 
 def cleanup():
     """Aufräumen beim Programmende"""
-    global _current_timer
-    if _current_timer:
-        _current_timer.cancel()
-        _current_timer = None
-    pygame.mixer.music.stop()
+    stop_playback()
     pygame.mixer.quit()
 
 # Registriere cleanup für Programmende
 atexit.register(cleanup)
 
+def _mixer_format():
+    """Liefert (Samplerate, FFmpeg-Format, Kanäle, Bytes pro Frame) des Mixers"""
+    freq, fmt, channels = pygame.mixer.get_init()
+    sample_format = _FFMPEG_FORMATS.get(fmt, "s16le")
+    return freq, sample_format, channels, abs(fmt) // 8 * channels
+
+def decode_segment(file_path, start_sec, duration_sec, low_priority=False):
+    """Dekodiert [start, start+dauer) einmalig in einen PCM-Puffer im Mixer-Format"""
+    if duration_sec <= 0:
+        raise ValueError("Die Dauer einer Szene muss größer als 0 sein.")
+
+    freq, sample_format, channels, frame_size = _mixer_format()
+    first_frame = int(round(start_sec * freq))
+    frames = int(round(duration_sec * freq))
+
+    pcm = decode_pcm(file_path, first_frame / freq, frames / freq, freq, channels, sample_format,
+                     low_priority=low_priority)
+    if pcm is None:
+        # Ohne FFmpeg: ganze Datei über SDL dekodieren und den Abschnitt ausschneiden
+        raw = pygame.mixer.Sound(file_path).get_raw()
+        pcm = raw[first_frame * frame_size:(first_frame + frames) * frame_size]
+
+    # Nur ganze Frames behalten, damit die Schleife sampelgenau umbricht
+    size = min(len(pcm), frames * frame_size)
+    size -= size % frame_size
+    if size == 0:
+        raise ValueError(f"Abschnitt liegt außerhalb der Audiodatei: {file_path}")
+    return pcm[:size]
+
+def load_segment(file_path, start_sec, duration_sec, low_priority=False):
+    """Liefert den Abschnitt als abspielbereiten Sound, bevorzugt aus dem Segment-Cache"""
+    key = segment_cache.make_key(file_path, start_sec, duration_sec)
+
+    def load():
+        pcm = decode_segment(file_path, start_sec, duration_sec, low_priority=low_priority)
+        return pygame.mixer.Sound(buffer=pcm), len(pcm)
+
+    return segment_cache.get_or_load(key, load)
+
+def is_segment_cached(file_path, start_sec, duration_sec):
+    """Prüft, ob der Abschnitt bereits dekodiert im Cache liegt"""
+    return segment_cache.make_key(file_path, start_sec, duration_sec) in segment_cache
+
+def is_playing():
+    """True, solange eine Szene läuft (auch pausiert)"""
+    return mixer.is_busy()
+
 def stop_playback():
-    """Stoppt die aktuelle Wiedergabe und räumt auf"""
-    global _current_timer, _current_file
-    if _current_timer:
-        _current_timer.cancel()
-        _current_timer = None
-    if _current_file:
-        _current_file = None
-    pygame.mixer.music.stop()
-    try:
-        pygame.mixer.music.unload()  # Datei entladen, damit sie freigegeben wird
-    except Exception:
-        pass
-
-def play_loop_segment(file_path, start_sec, duration_sec):
-    """Spielt einen Audioabschnitt in Schleife ab"""
-    global _current_timer, _current_file
+    """Stoppt die Wiedergabe auf allen Ebenen"""
+    mixer.stop_all()
 
+def pause_playback():
+    """Pausiert die Wiedergabe auf allen Ebenen"""
+    mixer.pause_all()
+
+def resume_playback():
+    """Setzt eine pausierte Wiedergabe fort"""
+    mixer.resume_all()
+
+def set_layer_volume(layer, volume, persist=True):
+    """Setzt die Lautstärke einer Ebene (0.0 - 1.0) und merkt sie sich.
+    Mit persist=False nur im Mixer (z.B. für MIDI-Fader, die sehr oft senden)."""
+    mixer.set_layer_volume(layer, volume)
+    if persist:
+        volumes = dict(get_setting("layer_volumes"))
+        volumes[layer] = volume
+        set_setting("layer_volumes", volumes)
+
+def save_layer_volumes():
+    """Merkt sich die aktuellen Lautstärken aller Ebenen"""
+    set_setting("layer_volumes", {layer: mixer.get_layer_volume(layer) for layer in LAYER_LABELS})
+
+def get_layer_volume(layer):
+    return mixer.get_layer_volume(layer)
+
+def get_position(layer=LAYER_AMBIENCE):
+    """Wiedergabe-Uhr der Ebene: (Position in Sekunden, Durchläufe, Schleifenlänge) oder None.
+    Billig genug, um vom UI-Timer aus abgefragt zu werden."""
+    return mixer.get_position(layer)
+
+def loudness_gain(loudness):
+    """Lineare Verstärkung, die eine Szene der gemessenen Lautheit auf die Ziel-Lautheit bringt.
+    Ohne Messwert oder bei ausgeschalteter Angleichung 1.0. SDL kann nicht über 0 dB
+    verstärken, deshalb werden leise Szenen höchstens auf Originalpegel gebracht."""
+    if loudness is None or not get_setting("normalize_loudness"):
+        return 1.0
+    gain_db = get_setting("target_loudness") - loudness
+    return min(1.0, 10 ** (gain_db / 20))
+
+def _check_file(file_path):
     # Prüfe ob Datei existiert
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Audiodatei nicht gefunden: {file_path}")
@@ -47,21 +129,39 @@ def play_loop_segment(file_path, start_sec, duration_sec):
     if not os.access(file_path, os.R_OK):
         raise PermissionError(f"Keine Leserechte für: {file_path}")
 
-    def loop():
-        try:
-            pygame.mixer.music.load(file_path)
-            pygame.mixer.music.play(start=start_sec)
-            global _current_timer
-            _current_timer = threading.Timer(duration_sec, loop)
-            _current_timer.daemon = True  # Timer wird beendet wenn Hauptprogramm endet
-            _current_timer.start()
-        except Exception as e:
-            print(f"Fehler beim Abspielen: {e}")
-            stop_playback()
-
-    stop_playback()  # Stoppe vorherige Wiedergabe
-    _current_file = file_path
-    loop()
+def play_loop_segment(file_path, start_sec, duration_sec, layer=LAYER_AMBIENCE, crossfade_sec=0.0,
+                      loudness=None, gain=1.0):
+    """Spielt einen Audioabschnitt lückenlos in Schleife auf der angegebenen Ebene ab.
+    Der Abschnitt wird einmal dekodiert, jeder Umlauf kostet weder Dateizugriff noch Dekodierung.
+    Kürzlich genutzte Abschnitte kommen direkt aus dem Segment-Cache.
+    Mit crossfade_sec wird die laufende Schleife der Ebene übergeblendet; beide Abschnitte
+    liegen dabei bereits dekodiert im Speicher.
+    loudness ist die vorab gemessene Lautheit der Szene (LUFS) für die Pegelangleichung,
+    gain ein zusätzlicher Faktor nur für diesen Sound (z.B. MIDI-Anschlagstärke)."""
+    _check_file(file_path)
+    sound = load_segment(file_path, start_sec, duration_sec)
+    # Angleichung und Anschlagstärke liegen auf dem Kanal, nicht auf dem geteilten Sound aus dem Cache
+    # loops=-1: SDL mixer springt am Pufferende ohne Lücke an den Anfang zurück
+    mixer.play_loop(layer, sound, tag=file_path, fade_sec=crossfade_sec,
+                    gain=loudness_gain(loudness) * gain)
+
+def play_oneshot(file_path, start_sec, duration_sec, loudness=None, gain=1.0):
+    """Spielt einen Abschnitt einmalig als Effekt über den laufenden Schleifen ab"""
+    _check_file(file_path)
+    sound = load_segment(file_path, start_sec, duration_sec)
+    mixer.play_oneshot(sound, loudness_gain(loudness) * gain)
+
+def play_preview(file_path, start_sec, duration_sec):
+    """Spielt einen kurzen Ausschnitt zur Vorschau (z.B. beim Scrubben) auf einem eigenen Kanal;
+    jeder Schnipsel ersetzt den vorherigen. Vorschau-Schnipsel gehen am Segment-Cache vorbei,
+    damit sie ihn nicht verdrängen."""
+    _check_file(file_path)
+    pcm = decode_segment(file_path, start_sec, duration_sec)
+    mixer.play_preview(pygame.mixer.Sound(buffer=pcm))
+
+def stop_preview():
+    mixer.stop_preview()
 
 # Beispielnutzung:
 # play_loop_segment("assets/ambient.mp3", start_sec=60, duration_sec=30)
+# play_oneshot("assets/schwert.mp3", start_sec=0, duration_sec=2)
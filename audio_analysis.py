@@ -0,0 +1,360 @@
+# Datei: audio_analysis.py
+import os
+import struct
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from config import ASSET_DIR, CACHE_DIR
+from audio_decode import stream_pcm
+from track_store import get_track_store, TRACK_EXTENSIONS
+from settings import get_setting
+
+ANALYSIS_DIR = os.path.join(CACHE_DIR, "analysis")
+
+SAMPLE_RATE = 48000
+CHANNELS = 2
+BASE_BLOCK = 256           # Samples pro Wert in der feinsten Peak-Stufe
+LEVEL_FACTOR = 4           # Jede Stufe fasst 4 Werte der vorherigen zusammen
+MIN_LEVEL_BLOCKS = 512     # Gröbste Stufe hat mindestens so viele Werte
+POWER_BLOCK = 4800         # 100 ms bei 48 kHz (Lautheitsmessung)
+GATE_BLOCKS = 4            # 400 ms Messfenster mit 75 % Überlappung
+ABSOLUTE_GATE = -70.0      # LUFS
+RELATIVE_GATE = -10.0      # LU unter dem ungegateten Mittel
+LOUDNESS_FLOOR = -70.0     # Ergebnis für Stille
+# Blöcke sind ein gemeinsames Vielfaches von BASE_BLOCK und POWER_BLOCK
+CHUNK_FRAMES = 38400 * 10
+
+# Sidecar-Format: Kopf, Blockleistungen (float32), dann je Stufe Anzahl + Peaks + RMS (uint8)
+MAGIC = b"SBA1"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHIQIHffII")
+LEVEL_HEADER = struct.Struct("<I")
+
+def _k_weighting_response(n):
+    """|H(f)|² des K-Filters (ITU-R BS.1770, 48 kHz) für die rfft-Bins eines n-Sample-Blocks"""
+    stages = (
+        ((1.53512485958697, -2.69169618940638, 1.19839281085285), (1.0, -1.69065929318241, 0.73248077421585)),
+        ((1.0, -2.0, 1.0), (1.0, -1.99004745483398, 0.99007225036621)),
+    )
+    z = np.exp(-1j * np.pi * np.arange(n // 2 + 1) / (n // 2))
+    response = np.ones(n // 2 + 1)
+    for b, a in stages:
+        h = (b[0] + b[1] * z + b[2] * z ** 2) / (a[0] + a[1] * z + a[2] * z ** 2)
+        response *= np.abs(h) ** 2
+    return response
+
+def _power_weights(n):
+    # Parseval für rfft: Rand-Bins einfach, alle anderen doppelt; / n² ergibt den Mittelwert
+    weights = _k_weighting_response(n) * 2.0
+    weights[0] /= 2.0
+    weights[-1] /= 2.0
+    return weights / (n * n)
+
+_WEIGHTS = None
+
+def block_powers(frames):
+    """K-gewichtete mittlere Leistung je 100-ms-Block, über die Kanäle summiert.
+    Der Filter wird im Frequenzbereich angewendet (ein rfft je Block, vollständig vektorisiert)."""
+    global _WEIGHTS
+    if _WEIGHTS is None:
+        _WEIGHTS = _power_weights(POWER_BLOCK)
+    count = len(frames) // POWER_BLOCK
+    blocks = frames[:count * POWER_BLOCK].reshape(count, POWER_BLOCK, -1)
+    spectrum = np.fft.rfft(blocks, axis=1)
+    power = (spectrum.real ** 2 + spectrum.imag ** 2) * _WEIGHTS[None, :, None]
+    return power.sum(axis=(1, 2))
+
+def gated_loudness(powers):
+    """Integrierte Lautheit (LUFS) aus 100-ms-Blockleistungen mit absolutem und relativem Gate"""
+    if len(powers) < GATE_BLOCKS:
+        return LOUDNESS_FLOOR
+    # 400-ms-Fenster im 100-ms-Raster als gleitender Mittelwert
+    windows = np.convolve(powers, np.full(GATE_BLOCKS, 1.0 / GATE_BLOCKS), mode="valid")
+    with np.errstate(divide="ignore"):
+        loudness = -0.691 + 10 * np.log10(windows)
+    gated = windows[loudness > ABSOLUTE_GATE]
+    if len(gated) == 0:
+        return LOUDNESS_FLOOR
+    threshold = -0.691 + 10 * np.log10(gated.mean()) + RELATIVE_GATE
+    gated = windows[loudness > max(threshold, ABSOLUTE_GATE)]
+    if len(gated) == 0:
+        return LOUDNESS_FLOOR
+    return float(-0.691 + 10 * np.log10(gated.mean()))
+
+def _reduce(peaks, squares):
+    pad = (-len(peaks)) % LEVEL_FACTOR
+    if pad:
+        peaks = np.concatenate([peaks, np.zeros(pad, peaks.dtype)])
+        squares = np.concatenate([squares, np.zeros(pad, squares.dtype)])
+    return (peaks.reshape(-1, LEVEL_FACTOR).max(axis=1),
+            squares.reshape(-1, LEVEL_FACTOR).mean(axis=1))
+
+def _quantize(values):
+    return np.round(np.clip(values, 0.0, 1.0) * 255).astype(np.uint8)
+
+class TrackAnalysis:
+    """Analyse eines Tracks: Dauer, Peak/RMS-Stufen für die Wellenform und Lautheit"""
+
+    __slots__ = ("sample_rate", "frames", "loudness", "peak", "powers", "levels")
+
+    def __init__(self, sample_rate, frames, loudness, peak, powers, levels):
+        self.sample_rate = sample_rate
+        self.frames = frames
+        self.loudness = loudness  # integrierte Lautheit in LUFS
+        self.peak = peak          # Spitzenpegel 0.0 - 1.0
+        self.powers = powers      # K-gewichtete Leistung je 100 ms (float32)
+        self.levels = levels      # [(Samples pro Wert, Peaks uint8, RMS uint8)], fein -> grob
+
+    @property
+    def duration(self):
+        return self.frames / self.sample_rate
+
+    def level_for(self, samples_per_pixel):
+        """Gröbste Stufe, die bei dieser Zoomstufe noch mindestens einen Wert pro Pixel liefert"""
+        best = self.levels[0]
+        for level in self.levels:
+            if level[0] <= samples_per_pixel:
+                best = level
+        return best
+
+    def segment_loudness(self, start_sec, duration_sec):
+        """Lautheit (LUFS) eines Abschnitts aus den gespeicherten Blockleistungen"""
+        first = int(start_sec * 10)
+        last = int(np.ceil((start_sec + duration_sec) * 10))
+        return gated_loudness(self.powers[first:last].astype(np.float64))
+
+def analyze_pcm(chunks):
+    """Analysiert f32le-Stereo-PCM (48 kHz) aus einem Iterator von Byte-Blöcken"""
+    carry = np.zeros((0, CHANNELS), np.float32)
+    peaks, squares, powers = [], [], []
+    frames = 0
+
+    def process(block):
+        mono_peak = np.abs(block).max(axis=1)
+        mono_square = np.square(block).mean(axis=1)
+        pad = (-len(block)) % BASE_BLOCK
+        if pad:
+            mono_peak = np.concatenate([mono_peak, np.zeros(pad, np.float32)])
+            mono_square = np.concatenate([mono_square, np.zeros(pad, np.float32)])
+        peaks.append(mono_peak.reshape(-1, BASE_BLOCK).max(axis=1))
+        squares.append(mono_square.reshape(-1, BASE_BLOCK).mean(axis=1))
+        powers.append(block_powers(block))
+
+    for chunk in chunks:
+        samples = np.frombuffer(chunk, dtype="<f4")
+        samples = samples[:len(samples) - len(samples) % CHANNELS].reshape(-1, CHANNELS)
+        frames += len(samples)
+        carry = np.concatenate([carry, samples]) if len(carry) else samples
+        usable = len(carry) - len(carry) % CHUNK_FRAMES
+        if usable:
+            process(carry[:usable])
+            carry = carry[usable:]
+    if len(carry):
+        process(carry)
+
+    if frames == 0:
+        raise ValueError("Keine Audiodaten dekodiert")
+
+    peak_values = np.concatenate(peaks)
+    square_values = np.concatenate(squares)
+    levels = []
+    block = BASE_BLOCK
+    while True:
+        levels.append((block, _quantize(peak_values), _quantize(np.sqrt(square_values))))
+        if len(peak_values) <= MIN_LEVEL_BLOCKS:
+            break
+        peak_values, square_values = _reduce(peak_values, square_values)
+        block *= LEVEL_FACTOR
+
+    power_values = np.concatenate(powers)
+    return TrackAnalysis(SAMPLE_RATE, frames, gated_loudness(power_values), float(np.concatenate(peaks).max()),
+                         power_values.astype(np.float32), levels)
+
+def write_sidecar(path, analysis):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, analysis.sample_rate, analysis.frames, BASE_BLOCK,
+                            len(analysis.levels), analysis.loudness, analysis.peak,
+                            len(analysis.powers), POWER_BLOCK))
+        f.write(analysis.powers.astype("<f4").tobytes())
+        for _, peaks, rms in analysis.levels:
+            f.write(LEVEL_HEADER.pack(len(peaks)))
+            f.write(peaks.tobytes())
+            f.write(rms.tobytes())
+    os.replace(tmp_path, path)
+
+def read_sidecar(path):
+    """Liest eine Analyse-Datei; None, wenn sie fehlt, veraltet oder beschädigt ist
+    (dann wird neu analysiert)"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) < HEADER.size:
+        return None
+    (magic, version, sample_rate, frames, base_block, level_count, loudness, peak,
+     power_count, _power_block) = HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        return None
+    offset = HEADER.size
+    try:
+        powers = np.frombuffer(data, dtype="<f4", count=power_count, offset=offset)
+        offset += power_count * 4
+        levels = []
+        block = base_block
+        for _ in range(level_count):
+            (count,) = LEVEL_HEADER.unpack_from(data, offset)
+            offset += LEVEL_HEADER.size
+            peaks = np.frombuffer(data, dtype=np.uint8, count=count, offset=offset)
+            rms = np.frombuffer(data, dtype=np.uint8, count=count, offset=offset + count)
+            offset += 2 * count
+            levels.append((block, peaks, rms))
+            block *= LEVEL_FACTOR
+    except (ValueError, struct.error):
+        # Abgeschnitten, z.B. nach einem Absturz oder einer unvollständigen Kopie
+        return None
+    if offset != len(data) or not levels:
+        return None
+    return TrackAnalysis(sample_rate, frames, loudness, peak, powers, levels)
+
+def analyze_file(track_path, sidecar_path):
+    """Läuft im Worker-Prozess: dekodiert den Track im Datenstrom, analysiert ihn und
+    schreibt die Analyse-Datei. Liefert (Dauer, Lautheit)."""
+    chunks = stream_pcm(track_path, SAMPLE_RATE, CHANNELS, "f32le", chunk_bytes=CHUNK_FRAMES * CHANNELS * 4,
+                        low_priority=True)
+    analysis = analyze_pcm(chunks)
+    write_sidecar(sidecar_path, analysis)
+    return analysis.duration, analysis.loudness
+
+class AnalysisService:
+    """Analysiert Tracks im Hintergrund in einem Prozess-Pool (alle CPU-Kerne).
+    Ergebnisse liegen als Analyse-Datei unter cache/analysis, benannt nach dem
+    Inhalts-Hash des Tracks – ändert sich der Inhalt, wird automatisch neu analysiert."""
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or get_setting("analysis_workers") or os.cpu_count() or 2
+        self._pool = None
+        self._pending = {}  # digest -> Future
+        self._failed = set()  # digests, deren Analyse fehlschlug; bis zum Neustart nicht erneut
+        self._cache = OrderedDict()  # digest -> TrackAnalysis
+        self._lock = threading.Lock()
+        os.makedirs(ANALYSIS_DIR, exist_ok=True)
+
+    @staticmethod
+    def sidecar_path(digest):
+        return os.path.join(ANALYSIS_DIR, digest + ".sba")
+
+    def submit(self, filename):
+        """Stellt einen Track zur Analyse an, falls noch keine aktuelle Analyse existiert.
+        Solange der Track-Index noch aufgebaut wird, passiert nichts (scan() holt es nach).
+        Fehlgeschlagene Analysen werden nicht erneut angestellt."""
+        store = get_track_store(wait=False)
+        digest = store.digest_of(filename) if store else None
+        if not digest:
+            return None
+        sidecar = self.sidecar_path(digest)
+        with self._lock:
+            if digest in self._failed:
+                return None
+            if digest in self._pending or os.path.exists(sidecar):
+                return self._pending.get(digest)
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            future = self._pool.submit(analyze_file, os.path.join(ASSET_DIR, filename), sidecar)
+            self._pending[digest] = future
+        future.add_done_callback(lambda f: self._on_done(digest, filename, f))
+        return future
+
+    def scan(self):
+        """Stellt alle Tracks ohne aktuelle Analyse an"""
+        get_track_store()
+        for filename in sorted(os.listdir(ASSET_DIR)):
+            if filename.lower().endswith(TRACK_EXTENSIONS):
+                self.submit(filename)
+
+    def scan_in_background(self):
+        """Baut beim Start den Track-Index auf und stellt fehlende Analysen an, ohne den
+        GUI-Thread zu blockieren (bei großen Bibliotheken dauert das Hashen lange)"""
+        threading.Thread(target=self._scan_safely, name="track-index", daemon=True).start()
+
+    def _scan_safely(self):
+        try:
+            self.scan()
+        except Exception as e:
+            print(f"[WARN] Track-Index konnte nicht aufgebaut werden: {e}")
+
+    def get(self, filename, wait=False):
+        """Analyse eines Tracks oder None, solange sie (oder der Track-Index) noch nicht vorliegt.
+        Mit wait wird auf eine laufende Analyse gewartet."""
+        store = get_track_store(wait=False)
+        digest = store.digest_of(filename) if store else None
+        if not digest:
+            return None
+        with self._lock:
+            if digest in self._cache:
+                self._cache.move_to_end(digest)
+                return self._cache[digest]
+            future = self._pending.get(digest)
+        if future is not None:
+            if not wait:
+                return None
+            try:
+                future.result()
+            except Exception:
+                return None
+        sidecar = self.sidecar_path(digest)
+        analysis = read_sidecar(sidecar)
+        if analysis is None and os.path.exists(sidecar):
+            # Veraltet oder beschädigt: entfernen, damit submit() den Track neu analysiert
+            try:
+                os.remove(sidecar)
+            except OSError:
+                pass
+        if analysis is not None:
+            with self._lock:
+                self._cache[digest] = analysis
+                while len(self._cache) > get_setting("analysis_cache_entries"):
+                    self._cache.popitem(last=False)
+        return analysis
+
+    def failed(self, filename):
+        """True, wenn die Analyse des Tracks (in seinem aktuellen Inhalt) fehlgeschlagen ist"""
+        store = get_track_store(wait=False)
+        digest = store.digest_of(filename) if store else None
+        with self._lock:
+            return digest in self._failed
+
+    def scene_loudness(self, filename, start_sec, duration_sec):
+        """Lautheit (LUFS) eines Szenen-Abschnitts oder None, solange die Analyse fehlt"""
+        analysis = self.get(filename)
+        if analysis is None:
+            return None
+        return round(analysis.segment_loudness(start_sec, duration_sec), 2)
+
+    def _on_done(self, digest, filename, future):
+        error = None if future.cancelled() else future.exception()
+        with self._lock:
+            self._pending.pop(digest, None)
+            if error is not None:
+                self._failed.add(digest)
+        if error is not None:
+            print(f"[WARN] Analyse von {filename} fehlgeschlagen: {error}")
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+_service = None
+_service_lock = threading.Lock()
+
+def get_analysis_service():
+    """Prozessweiter Analyse-Dienst (wird beim ersten Zugriff angelegt)"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = AnalysisService()
+        return _service
@@ -0,0 +1,76 @@
+# Datei: audio_decode.py
+import os
+import shutil
+import subprocess
+from config import FFMPEG_DIR
+
+# Unter Windows kein Konsolenfenster für FFmpeg öffnen
+_CREATIONFLAGS = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+_LOW_PRIORITY_FLAGS = getattr(subprocess, "BELOW_NORMAL_PRIORITY_CLASS", 0)
+
+def find_ffmpeg():
+    """Sucht FFmpeg im assets/ffmpeg Ordner, sonst im PATH"""
+    for name in ("ffmpeg.exe", "ffmpeg"):
+        path = os.path.join(FFMPEG_DIR, name)
+        if os.path.exists(path):
+            return path
+    return shutil.which("ffmpeg")
+
+def _lower_priority():
+    # Läuft im Kindprozess (nur POSIX)
+    os.nice(10)
+
+def _pcm_command(ffmpeg, file_path, start_sec, duration_sec, sample_rate, channels, sample_format):
+    cmd = [ffmpeg, "-v", "error", "-nostdin"]
+    if start_sec:
+        cmd += ["-ss", f"{start_sec:.6f}"]
+    cmd += ["-i", file_path]
+    if duration_sec:
+        cmd += ["-t", f"{duration_sec:.6f}"]
+    cmd += ["-vn", "-f", sample_format, "-ac", str(channels), "-ar", str(sample_rate), "-"]
+    return cmd
+
+def _process_kwargs(low_priority):
+    kwargs = {'creationflags': _CREATIONFLAGS}
+    if low_priority:
+        if os.name == "nt":
+            kwargs['creationflags'] |= _LOW_PRIORITY_FLAGS
+        else:
+            kwargs['preexec_fn'] = _lower_priority
+    return kwargs
+
+def decode_pcm(file_path, start_sec, duration_sec, sample_rate, channels, sample_format="s16le",
+               low_priority=False):
+    """Dekodiert einen Abschnitt per FFmpeg in rohe PCM-Daten.
+    Mit low_priority läuft FFmpeg mit niedriger Prozesspriorität (Vorab-Dekodierung).
+    Gibt None zurück, wenn kein FFmpeg verfügbar ist."""
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg:
+        return None
+
+    cmd = _pcm_command(ffmpeg, file_path, start_sec, duration_sec, sample_rate, channels, sample_format)
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, **_process_kwargs(low_priority))
+    if result.returncode != 0:
+        raise RuntimeError(f"FFmpeg-Fehler: {result.stderr.decode(errors='replace').strip()}")
+    return result.stdout
+
+def stream_pcm(file_path, sample_rate, channels, sample_format="f32le", chunk_bytes=1024 * 1024,
+               low_priority=False):
+    """Dekodiert eine ganze Datei per FFmpeg und liefert die PCM-Daten blockweise.
+    Der Speicherbedarf bleibt unabhängig von der Länge des Tracks."""
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg:
+        raise FileNotFoundError("FFmpeg nicht gefunden. Bitte FFmpeg im assets/ffmpeg Ordner installieren.")
+
+    cmd = _pcm_command(ffmpeg, file_path, 0, 0, sample_rate, channels, sample_format)
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, **_process_kwargs(low_priority))
+    try:
+        for chunk in iter(lambda: proc.stdout.read(chunk_bytes), b""):
+            yield chunk
+        error = proc.stderr.read()
+        if proc.wait() != 0:
+            raise RuntimeError(f"FFmpeg-Fehler: {error.decode(errors='replace').strip()}")
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
@@ -0,0 +1,287 @@
+# Datei: audio_mixer.py
+import itertools
+import math
+import threading
+import time
+import pygame
+
+# Ebenen des Mixers
+LAYER_AMBIENCE = "ambience"
+LAYER_MUSIC = "music"
+LAYER_SFX = "sfx"
+
+LOOP_LAYERS = (LAYER_AMBIENCE, LAYER_MUSIC)
+LAYER_LABELS = {
+    LAYER_AMBIENCE: "Ambiente",
+    LAYER_MUSIC: "Musik",
+    LAYER_SFX: "Effekte",
+}
+
+# Schrittweite der Überblend-Rampen
+FADE_STEP_SEC = 0.01
+
+class LoopLayer:
+    """Schleifen-Ebene (Ambiente/Musik) auf zwei reservierten Kanälen.
+    Beim Überblenden läuft die neue Schleife auf dem jeweils anderen Kanal an.
+    Kanal-Lautstärke = Ebenen-Lautstärke × Verstärkung der laufenden Schleife; die Sounds
+    selbst bleiben bei 1.0, weil sie aus dem Segment-Cache geteilt werden."""
+
+    def __init__(self, name, channels, volume=1.0):
+        self.name = name
+        self.channels = channels
+        self.volume = volume
+        self.sound = None
+        self.tag = None  # Kennung des aktuell laufenden Inhalts (z.B. Dateipfad)
+        self.gain = 1.0  # Verstärkung der laufenden Schleife (Pegelangleichung, Anschlagstärke)
+        self._active = 0
+        self._fade = None  # (alter Kanal, Startzeit, Dauer, Verstärkung des alten Kanals)
+        # Wiedergabe-Uhr: Startzeitpunkt, Beginn einer Pause, aufsummierte Pausen
+        self._started_at = None
+        self._paused_at = None
+        self._paused_total = 0.0
+
+    @property
+    def channel(self):
+        return self.channels[self._active]
+
+    @property
+    def fading(self):
+        return self._fade is not None
+
+    def play(self, sound, tag=None, fade_sec=0.0, gain=1.0):
+        old = self.channel
+        old_gain = self.gain
+        # Eine pausierte Schleife wird hart ersetzt, nicht aus der Pause übergeblendet
+        paused = self._paused_at is not None
+        self.sound = sound
+        self.tag = tag
+        self.gain = gain
+        self._started_at = time.monotonic()
+        self._paused_at = None
+        self._paused_total = 0.0
+        if fade_sec > 0 and old.get_busy() and not paused:
+            self.finish_fade()
+            self._active = 1 - self._active
+            self.channel.play(sound, loops=-1)
+            self.channel.set_volume(0.0)
+            self._fade = (old, time.monotonic(), fade_sec, old_gain)
+        else:
+            self._fade = None
+            for channel in self.channels:
+                channel.stop()
+            self.channel.play(sound, loops=-1)
+            self.channel.set_volume(self.volume * gain)
+
+    def step_fade(self, now):
+        """Equal-Power-Rampe: cos für die alte, sin für die neue Schleife"""
+        old, start, duration, old_gain = self._fade
+        t = min(1.0, (now - start) / duration)
+        old.set_volume(self.volume * old_gain * math.cos(t * math.pi / 2))
+        self.channel.set_volume(self.volume * self.gain * math.sin(t * math.pi / 2))
+        if t >= 1.0:
+            old.stop()
+            self._fade = None
+
+    def finish_fade(self):
+        """Bricht eine laufende Überblendung ab und springt auf ihr Ende"""
+        if self._fade:
+            self._fade[0].stop()
+            self._fade = None
+            self.channel.set_volume(self.volume * self.gain)
+
+    def stop(self):
+        self._fade = None
+        for channel in self.channels:
+            channel.stop()
+        self.sound = None
+        self.tag = None
+        self._started_at = None
+
+    def pause(self):
+        self.finish_fade()
+        self.channel.pause()
+        if self._started_at is not None and self._paused_at is None:
+            self._paused_at = time.monotonic()
+
+    def resume(self):
+        self.channel.unpause()
+        if self._paused_at is not None:
+            self._paused_total += time.monotonic() - self._paused_at
+            self._paused_at = None
+
+    def position(self):
+        """Liefert (Position in der Schleife, abgeschlossene Durchläufe, Schleifenlänge) oder None.
+        Die Länge stammt aus dem PCM-Puffer, die Zeit aus einer monotonen Uhr ohne Pausen."""
+        if self.sound is None or self._started_at is None:
+            return None
+        now = self._paused_at if self._paused_at is not None else time.monotonic()
+        elapsed = max(0.0, now - self._started_at - self._paused_total)
+        length = self.sound.get_length()
+        if length <= 0:
+            return None
+        loops, position = divmod(elapsed, length)
+        return position, int(loops), length
+
+    def set_volume(self, volume):
+        self.volume = volume
+        if not self._fade:
+            self.channel.set_volume(volume * self.gain)
+
+    def is_busy(self):
+        return any(channel.get_busy() for channel in self.channels)
+
+class VoicePool:
+    """Polyphone One-Shot-Ebene mit fester Kanalanzahl.
+    Ist der Pool voll, wird die älteste Stimme gestohlen.
+    Jede Stimme hat ihre eigene Verstärkung; Kanal-Lautstärke = Ebenen-Lautstärke × Verstärkung."""
+
+    def __init__(self, channels, volume=1.0):
+        self.channels = channels
+        self.volume = volume
+        self._started = [0] * len(channels)  # Startreihenfolge je Kanal
+        self._gains = [1.0] * len(channels)
+        self._counter = itertools.count(1)
+
+    def play(self, sound, gain=1.0):
+        index = self._allocate()
+        channel = self.channels[index]
+        channel.play(sound)
+        channel.set_volume(self.volume * gain)
+        self._gains[index] = gain
+        self._started[index] = next(self._counter)
+        return channel
+
+    def _allocate(self):
+        for index, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return index
+        # Alle Stimmen belegt: die am längsten laufende wird überschrieben
+        return min(range(len(self.channels)), key=self._started.__getitem__)
+
+    def stop(self):
+        for channel in self.channels:
+            channel.stop()
+
+    def pause(self):
+        for channel in self.channels:
+            channel.pause()
+
+    def resume(self):
+        for channel in self.channels:
+            channel.unpause()
+
+    def set_volume(self, volume):
+        self.volume = volume
+        for channel, gain in zip(self.channels, self._gains):
+            channel.set_volume(volume * gain)
+
+class AudioMixer:
+    """Mehrspur-Mixer: Ambiente- und Musik-Schleife plus polyphone Effekte"""
+
+    def __init__(self, sfx_voices=8, volumes=None):
+        volumes = volumes or {}
+        # Kanäle 0..n für die Ebenen reservieren, damit pygame sie nicht anderweitig vergibt;
+        # der letzte gehört der Vorschau im Szenen-Editor
+        loop_channels = 2 * len(LOOP_LAYERS)
+        total = loop_channels + sfx_voices + 1
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), total))
+        pygame.mixer.set_reserved(total)
+
+        self.layers = {}
+        for index, name in enumerate(LOOP_LAYERS):
+            channels = [pygame.mixer.Channel(2 * index), pygame.mixer.Channel(2 * index + 1)]
+            self.layers[name] = LoopLayer(name, channels, volumes.get(name, 1.0))
+        sfx_channels = [pygame.mixer.Channel(loop_channels + i) for i in range(sfx_voices)]
+        self.sfx = VoicePool(sfx_channels, volumes.get(LAYER_SFX, 1.0))
+        self.preview = pygame.mixer.Channel(total - 1)
+
+        self._lock = threading.RLock()
+        self._fader = None
+        self.paused = False
+
+    def play_loop(self, layer, sound, tag=None, fade_sec=0.0, gain=1.0):
+        """Startet eine Schleife auf der Ebene und ersetzt deren bisherigen Inhalt.
+        Mit fade_sec wird die laufende Schleife per Equal-Power-Kurve übergeblendet.
+        gain gilt nur für diese Schleife, nicht für die Ebene.
+        War alles pausiert, laufen die übrigen Ebenen und Effekte mit der neuen Szene weiter."""
+        with self._lock:
+            if self.paused:
+                for name, other in self.layers.items():
+                    if name != layer:
+                        other.resume()
+                self.sfx.resume()
+                self.paused = False
+            self.layers[layer].play(sound, tag, fade_sec, gain)
+            if self.layers[layer].fading:
+                self._start_fader()
+
+    def _start_fader(self):
+        # Aufrufer hält self._lock
+        if self._fader is None:
+            self._fader = threading.Thread(target=self._run_fades, name="crossfade", daemon=True)
+            self._fader.start()
+
+    def _run_fades(self):
+        while True:
+            with self._lock:
+                fading = [layer for layer in self.layers.values() if layer.fading]
+                if not fading:
+                    self._fader = None
+                    return
+                now = time.monotonic()
+                for layer in fading:
+                    layer.step_fade(now)
+            time.sleep(FADE_STEP_SEC)
+
+    def play_preview(self, sound):
+        """Spielt einen Vorschau-Schnipsel; ersetzt den vorherigen, ohne Effekt-Stimmen zu belegen"""
+        self.preview.play(sound)
+
+    def stop_preview(self):
+        self.preview.stop()
+
+    def play_oneshot(self, sound, gain=1.0):
+        """Spielt einen Effekt einmalig, ohne laufende Schleifen zu berühren;
+        gain gilt nur für diese Stimme"""
+        return self.sfx.play(sound, gain)
+
+    def set_layer_volume(self, layer, volume):
+        with self._lock:
+            if layer == LAYER_SFX:
+                self.sfx.set_volume(volume)
+            else:
+                self.layers[layer].set_volume(volume)
+
+    def get_layer_volume(self, layer):
+        if layer == LAYER_SFX:
+            return self.sfx.volume
+        return self.layers[layer].volume
+
+    def stop_all(self):
+        with self._lock:
+            for layer in self.layers.values():
+                layer.stop()
+            self.sfx.stop()
+            self.paused = False
+
+    def pause_all(self):
+        with self._lock:
+            for layer in self.layers.values():
+                layer.pause()
+            self.sfx.pause()
+            self.paused = True
+
+    def resume_all(self):
+        with self._lock:
+            for layer in self.layers.values():
+                layer.resume()
+            self.sfx.resume()
+            self.paused = False
+
+    def get_position(self, layer):
+        with self._lock:
+            return self.layers[layer].position()
+
+    def is_busy(self):
+        """True, solange eine Schleife läuft (auch pausiert)"""
+        return any(layer.is_busy() for layer in self.layers.values())
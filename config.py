@@ -18,6 +18,8 @@ ICON_DIR = os.path.join(ASSET_DIR, "icon")
 HELP_DIR = os.path.join(ASSET_DIR, "hilfe")
 MAPPING_DIR = os.path.join(BASE_DIR, "mappings")
 FFMPEG_DIR = os.path.join(ASSET_DIR, "ffmpeg")
+CACHE_DIR = os.path.join(BASE_DIR, "cache")
+THUMBNAIL_DIR = os.path.join(CACHE_DIR, "thumbnails")
 
 APP_TITLE = "D&D Soundboard"
 WINDOW_WIDTH = 600
@@ -25,5 +27,5 @@ WINDOW_HEIGHT = 400
 
 def ensure_dirs():
     """Erstellt nötige Ordner falls sie fehlen – aber NICHT aus _internal oder sonstwas."""
-    for path in [ASSET_DIR, ICON_DIR, HELP_DIR, MAPPING_DIR, FFMPEG_DIR]:
+    for path in [ASSET_DIR, ICON_DIR, HELP_DIR, MAPPING_DIR, FFMPEG_DIR, CACHE_DIR, THUMBNAIL_DIR]:
         os.makedirs(path, exist_ok=True)
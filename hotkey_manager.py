@@ -1,11 +1,16 @@
-from PySide6.QtCore import QObject, Signal
+from PySide6.QtCore import QObject, Signal, QTimer
 from PySide6.QtGui import QKeySequence, QShortcut
 import json
 import os
+import time
 from config import MAPPING_DIR
+from mapper import make_scene_id, split_scene_id
+from audio import set_layer_volume
+from audio_mixer import LAYER_LABELS
 
 class HotkeyManager(QObject):
     scene_triggered = Signal(str, str)  # mapping_file, scene_name
+    bindings_changed = Signal()  # Hotkeys wurden gesetzt oder entfernt
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -57,6 +62,7 @@ class HotkeyManager(QObject):
         self.hotkeys[mapping_file][scene_name] = key
         self.save_hotkeys()
         self.update_shortcuts()
+        self.bindings_changed.emit()
         
     def remove_hotkey(self, mapping_file, scene_name):
         """Entfernt einen Hotkey für eine Szene"""
@@ -65,15 +71,84 @@ class HotkeyManager(QObject):
                 del self.hotkeys[mapping_file][scene_name]
                 self.save_hotkeys()
                 self.update_shortcuts()
+                self.bindings_changed.emit()
+
+    def bound_scenes(self):
+        """Alle (mapping_file, scene_name)-Paare mit gesetztem Hotkey"""
+        return [
+            (mapping_file, scene_name)
+            for mapping_file, scenes in self.hotkeys.items()
+            for scene_name, key in scenes.items() if key
+        ]
+
+MIDI_NOTE_ON = 0x90
+MIDI_NOTE_OFF = 0x80
+MIDI_CONTROL_CHANGE = 0xB0
+MIDI_CHANNELS = 16
+LED_FRAME_MS = 16  # LED-Änderungen werden pro Frame gesammelt und als Differenz gesendet
+LEARN_TIMEOUT_MS = 10000
+# Anschlagstärke der Rückmelde-Noten; Controller zeigen damit meist Helligkeit/Farbe an
+LED_VELOCITY = {"bound": 1, "active": 127, "paused": 64}
+
+def parse_midi_binding(binding):
+    """Gespeicherte Belegung -> (Kanal oder None für alle Kanäle, Note).
+    Ältere Einträge sind nur eine Notennummer."""
+    if isinstance(binding, dict):
+        return binding.get("channel"), int(binding["note"])
+    return None, int(binding)
+
+def format_midi_binding(binding):
+    """Belegung für die Anzeige, z.B. Kanal 10, Note 36"""
+    channel, note = parse_midi_binding(binding)
+    if channel is None:
+        return f"Note {note}"
+    return f"Kanal {channel + 1}, Note {note}"
 
-# TODO: MIDI-Support
 class MidiManager(QObject):
+    """MIDI-Eingang: Noten lösen Szenen aus, Controller steuern die Lautstärke der Ebenen.
+    rtmidi ruft den Callback im eigenen Eingangs-Thread auf; dort wird nur in vorberechneten
+    Tabellen nachgeschlagen und direkt an den InputDispatcher bzw. den Mixer weitergegeben.
+    Als Quelle genügt alles mit set_callback()/close_port() wie rtmidi.MidiIn (zum Testen ein Fake),
+    als Ausgang alles mit send_message() wie rtmidi.MidiOut.
+    Rückmeldung: Pads gebundener Szenen leuchten schwach, die aktive Szene hell; gesendet wird
+    höchstens einmal pro Frame und nur, was sich gegenüber dem Gerät geändert hat.
+    Mit "velocity_volume" bestimmt die Anschlagstärke die Lautstärke des ausgelösten Sounds;
+    die Ebenen-Lautstärke bleibt den Fadern vorbehalten.
+    midi_controls.json: {"input_port": Name oder null, "velocity_volume": bool, "feedback": bool,
+    "led_velocity": {"bound", "active", "paused"}, "faders": {Ebene: {"channel": 0-15, "control": 0-127}}}"""
     scene_triggered = Signal(str, str)  # mapping_file, scene_name
+    layer_volume_changed = Signal(str, float)  # Ebene, Lautstärke (per Fader)
+    bindings_changed = Signal()  # MIDI-Belegungen wurden gesetzt oder entfernt
+    learn_finished = Signal(str, str, object)  # mapping_file, scene_name, Belegung oder None
+    _learned = Signal(str, str, int, int)  # Vom Eingangs-Thread in den GUI-Thread
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, dispatcher=None):
         super().__init__(parent)
         self.parent = parent
+        self.dispatcher = dispatcher
         self.midi_mappings = {}  # mapping_file -> {scene_name -> midi_note}
+        self.controls = self.load_controls()
+        self.note_table = {}   # (Kanal, Note) -> Szenen-ID
+        self.fader_table = {}  # (Kanal, Controller) -> Ebene
+        self.port = None
+        self.port_name = None
+        self.output = None
+        self.learning = None  # (mapping_file, scene_name), solange auf eine Note gewartet wird
+        self._learned.connect(self._finish_learn)
+        self._learn_timer = QTimer(self)
+        self._learn_timer.setSingleShot(True)
+        self._learn_timer.setInterval(LEARN_TIMEOUT_MS)
+        self._learn_timer.timeout.connect(self.cancel_learn)
+        # LED-Rückmeldung: gewünschter und zuletzt gesendeter Zustand, (Kanal, Note) -> Anschlag
+        self.led_targets = {}  # Szenen-ID -> [(Kanal, Note)]
+        self.active_scene_id = None
+        self.paused = False
+        self._leds_wanted = {}
+        self._leds_sent = {}
+        self._led_timer = QTimer(self)
+        self._led_timer.setSingleShot(True)
+        self._led_timer.setInterval(LED_FRAME_MS)
+        self._led_timer.timeout.connect(self.flush_leds)
         self.load_midi_mappings()
         
     def load_midi_mappings(self):
@@ -85,12 +160,56 @@ class MidiManager(QObject):
                     self.midi_mappings = json.load(f)
             except Exception:
                 self.midi_mappings = {}
+        self.build_tables()
                 
     def save_midi_mappings(self):
         """Speichert MIDI-Mappings in der JSON-Datei"""
         midi_file = os.path.join(MAPPING_DIR, "midi.json")
         with open(midi_file, 'w', encoding='utf-8') as f:
             json.dump(self.midi_mappings, f, indent=4)
+
+    def load_controls(self):
+        """Lädt Port, Fader-Belegung und Anschlagstärke-Option"""
+        controls = {"input_port": None, "velocity_volume": True, "faders": {}}
+        controls_file = os.path.join(MAPPING_DIR, "midi_controls.json")
+        if os.path.exists(controls_file):
+            try:
+                with open(controls_file, 'r', encoding='utf-8') as f:
+                    controls.update(json.load(f))
+            except Exception as e:
+                print(f"[WARN] midi_controls.json konnte nicht geladen werden: {e}")
+        return controls
+
+    def save_controls(self):
+        controls_file = os.path.join(MAPPING_DIR, "midi_controls.json")
+        with open(controls_file, 'w', encoding='utf-8') as f:
+            json.dump(self.controls, f, indent=4)
+
+    def build_tables(self):
+        """Berechnet die Nachschlage-Tabellen neu. Sie werden als Ganzes ersetzt, damit der
+        Eingangs-Thread nie eine halb gefüllte Tabelle sieht."""
+        notes = {}
+        targets = {}
+        for mapping_file, scenes in self.midi_mappings.items():
+            for scene_name, binding in scenes.items():
+                try:
+                    channel, note = parse_midi_binding(binding)
+                except (KeyError, TypeError, ValueError):
+                    print(f"[WARN] Ungültige MIDI-Belegung für {scene_name}: {binding}")
+                    continue
+                scene_id = make_scene_id(mapping_file, scene_name)
+                for ch in range(MIDI_CHANNELS) if channel is None else (channel,):
+                    notes[(ch, note)] = scene_id
+                # Ohne festen Kanal leuchtet das Pad auf Kanal 1
+                targets.setdefault(scene_id, []).append((channel or 0, note))
+        faders = {}
+        for layer, control in self.controls.get("faders", {}).items():
+            if layer in LAYER_LABELS:
+                faders[(control.get("channel", 0), control["control"])] = layer
+        self.note_table = notes
+        self.fader_table = faders
+        self.led_targets = targets
+        self.update_leds()
             
     def set_midi_mapping(self, mapping_file, scene_name, midi_note):
         """Setzt eine neue MIDI-Note für eine Szene"""
@@ -98,6 +217,8 @@ class MidiManager(QObject):
             self.midi_mappings[mapping_file] = {}
         self.midi_mappings[mapping_file][scene_name] = midi_note
         self.save_midi_mappings()
+        self.build_tables()
+        self.bindings_changed.emit()
         
     def remove_midi_mapping(self, mapping_file, scene_name):
         """Entfernt eine MIDI-Note für eine Szene"""
@@ -105,6 +226,188 @@ class MidiManager(QObject):
             if scene_name in self.midi_mappings[mapping_file]:
                 del self.midi_mappings[mapping_file][scene_name]
                 self.save_midi_mappings()
+                self.build_tables()
+                self.bindings_changed.emit()
+
+    def bound_scenes(self):
+        """Alle (mapping_file, scene_name)-Paare mit MIDI-Belegung"""
+        return [
+            (mapping_file, scene_name)
+            for mapping_file, scenes in self.midi_mappings.items()
+            for scene_name in scenes
+        ]
+
+    @staticmethod
+    def available_ports():
+        """Namen der MIDI-Eingänge (leer, wenn rtmidi fehlt)"""
+        try:
+            import rtmidi
+            return rtmidi.MidiIn().get_ports()
+        except Exception as e:
+            print(f"[WARN] MIDI nicht verfügbar: {e}")
+            return []
+
+    def open_port(self, port_name=None, source=None, output=None):
+        """Öffnet einen MIDI-Eingang (ohne Namen: den gespeicherten, sonst den ersten) und den
+        gleichnamigen Ausgang für die LED-Rückmeldung, falls es ihn gibt.
+        Mit source/output werden statt rtmidi eigene Objekte angeschlossen."""
+        self.close_port()
+        if source is None:
+            try:
+                import rtmidi
+                source = rtmidi.MidiIn()
+                ports = source.get_ports()
+                port_name = port_name or self.controls.get("input_port")
+                if not ports:
+                    return False, "Kein MIDI-Eingang gefunden"
+                index = ports.index(port_name) if port_name in ports else 0
+                source.open_port(index)
+                source.ignore_types(sysex=True, timing=True, active_sense=True)
+                port_name = ports[index]
+                if output is None and self.controls.get("feedback", True):
+                    output = self._open_output(rtmidi, port_name)
+            except Exception as e:
+                return False, f"MIDI-Fehler: {e}"
+        source.set_callback(self._on_midi_message)
+        self.port = source
+        self.port_name = port_name
+        self.output = output
+        self._leds_sent = {}
+        self.update_leds()
+        return True, f"MIDI-Eingang: {port_name}"
+
+    @staticmethod
+    def _open_output(rtmidi, port_name):
+        """Ausgang desselben Geräts: gleicher Name, notfalls ohne die angehängte Portnummer"""
+        output = rtmidi.MidiOut()
+        ports = output.get_ports()
+        device = port_name.rsplit(" ", 1)[0]
+        for index, name in enumerate(ports):
+            if name == port_name or name.rsplit(" ", 1)[0] == device:
+                output.open_port(index)
+                return output
+        return None
+
+    def close_port(self):
+        if self.output is not None:
+            # Controller nicht mit leuchtenden Pads zurücklassen
+            self._leds_wanted = {}
+            self.flush_leds()
+            try:
+                self.output.close_port()
+            except Exception:
+                pass
+            self.output = None
+        if self.port is not None:
+            try:
+                self.port.cancel_callback()
+                self.port.close_port()
+            except Exception:
+                pass
+            self.port = None
+
+    def select_port(self, port_name):
+        """Wählt einen Eingang dauerhaft aus"""
+        self.controls["input_port"] = port_name
+        self.save_controls()
+        return self.open_port(port_name)
+
+    def _on_midi_message(self, event, data=None):
+        """rtmidi-Callback (Eingangs-Thread); event = (Bytes, Delta-Zeit)"""
+        pressed_at = time.perf_counter()
+        message = event[0]
+        if len(message) < 3:
+            return
+        kind, channel = message[0] & 0xF0, message[0] & 0x0F
+        learning = self.learning
+        if learning and kind == MIDI_NOTE_ON and message[2] > 0:
+            self.learning = None
+            self._learned.emit(learning[0], learning[1], channel, message[1])
+            return
+        if kind == MIDI_NOTE_ON and message[2] > 0:
+            scene_id = self.note_table.get((channel, message[1]))
+            if scene_id:
+                self._trigger(scene_id, message[2], pressed_at)
+        elif kind == MIDI_CONTROL_CHANGE:
+            layer = self.fader_table.get((channel, message[1]))
+            if layer:
+                self._set_volume(layer, message[2] / 127)
+
+    def _trigger(self, scene_id, velocity, pressed_at):
+        # Anschlagstärke nur für diesen Sound, nicht für die Ebene (und nie gespeichert)
+        gain = velocity / 127 if self.controls.get("velocity_volume") else 1.0
+        if self.dispatcher:
+            self.dispatcher.push(scene_id, pressed_at, gain)
+        else:
+            self.scene_triggered.emit(*split_scene_id(scene_id))
+
+    def _set_volume(self, layer, volume):
+        # Nur im Mixer; gespeichert wird gesammelt vom GUI-Thread
+        set_layer_volume(layer, volume, persist=False)
+        self.layer_volume_changed.emit(layer, volume)
+
+    def start_learn(self, mapping_file, scene_name):
+        """Die nächste gespielte Note wird der Szene zugewiesen (statt sie auszulösen)"""
+        self.learning = (mapping_file, scene_name)
+        self._learn_timer.start()
+
+    def cancel_learn(self):
+        if self.learning:
+            mapping_file, scene_name = self.learning
+            self.learning = None
+            self.learn_finished.emit(mapping_file, scene_name, None)
+
+    def _finish_learn(self, mapping_file, scene_name, channel, note):
+        self._learn_timer.stop()
+        # Eine Note löst immer nur eine Szene aus: bisherige Belegung derselben Note entfernen
+        previous = self.note_table.get((channel, note))
+        if previous and previous != make_scene_id(mapping_file, scene_name):
+            old_file, old_scene = split_scene_id(previous)
+            self.midi_mappings.get(old_file, {}).pop(old_scene, None)
+        binding = {"channel": channel, "note": note}
+        self.set_midi_mapping(mapping_file, scene_name, binding)
+        self.learn_finished.emit(mapping_file, scene_name, binding)
+
+    def set_active(self, scene_id, paused=False):
+        """Aktive Szene für die LED-Rückmeldung"""
+        self.active_scene_id = scene_id
+        self.paused = paused
+        self.update_leds()
+
+    def update_leds(self):
+        """Gewünschten LED-Zustand neu berechnen; gesendet wird gesammelt im nächsten Frame"""
+        velocity = dict(LED_VELOCITY, **self.controls.get("led_velocity", {}))
+        wanted = {}
+        for scene_id, targets in self.led_targets.items():
+            if scene_id == self.active_scene_id:
+                value = velocity["paused"] if self.paused else velocity["active"]
+            else:
+                value = velocity["bound"]
+            for target in targets:
+                wanted[target] = max(value, wanted.get(target, 0))
+        self._leds_wanted = wanted
+        if self.output is not None and not self._led_timer.isActive():
+            self._led_timer.start()
+
+    def flush_leds(self):
+        """Sendet nur die Noten, deren LED sich seit dem letzten Senden geändert hat"""
+        if self.output is None:
+            return
+        wanted, sent = self._leds_wanted, self._leds_sent
+        for target in sent.keys() - wanted.keys():
+            channel, note = target
+            self._send([MIDI_NOTE_OFF | channel, note, 0])
+        for target, value in wanted.items():
+            if sent.get(target) != value:
+                channel, note = target
+                self._send([MIDI_NOTE_ON | channel, note, value])
+        self._leds_sent = dict(wanted)
+
+    def _send(self, message):
+        try:
+            self.output.send_message(message)
+        except Exception as e:
+            print(f"[WARN] MIDI-Ausgabe fehlgeschlagen: {e}")
 
 # TODO: StreamDeck-Support
 class StreamDeckManager(QObject):
@@ -0,0 +1,190 @@
+# Datei: import_pipeline.py
+import os
+import queue
+import subprocess
+import threading
+import time
+from audio_decode import find_ffmpeg, _CREATIONFLAGS
+
+# Stufen eines Eintrags für die Fortschrittsmeldung
+STAGE_QUEUED = "queued"
+STAGE_DOWNLOAD = "download"
+STAGE_TRANSCODE = "transcode"
+STAGE_DONE = "done"
+STAGE_ERROR = "error"
+STAGE_CANCELLED = "cancelled"
+
+class ImportCancelled(Exception):
+    """Import wurde vom Benutzer abgebrochen"""
+
+def ffmpeg_transcode(src, dest, cancel_event):
+    """Konvertiert src per FFmpeg nach MP3 (192 kbit/s); bricht bei cancel_event ab"""
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg:
+        raise FileNotFoundError("FFmpeg nicht gefunden. Bitte FFmpeg im assets/ffmpeg Ordner installieren.")
+    cmd = [ffmpeg, "-v", "error", "-nostdin", "-y", "-i", src, "-vn",
+           "-codec:a", "libmp3lame", "-b:a", "192k", "-f", "mp3", dest]
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                            creationflags=_CREATIONFLAGS)
+    while proc.poll() is None:
+        if cancel_event.is_set():
+            proc.kill()
+            proc.wait()
+            raise ImportCancelled()
+        time.sleep(0.1)
+    if proc.returncode != 0:
+        raise RuntimeError(f"FFmpeg-Fehler: {proc.stderr.read().decode(errors='replace').strip()}")
+
+def _default_ydl_factory(opts):
+    import yt_dlp
+    return yt_dlp.YoutubeDL(opts)
+
+class BulkImportPipeline:
+    """Zweistufiger Bulk-Import: Download- und Transcode-Stufe mit eigenen Worker-Zahlen,
+    verbunden über eine begrenzte Queue. Läuft ohne Qt und lässt sich mit einer
+    YoutubeDL-Attrappe (ydl_factory) und einem Fake-Transcoder offline testen."""
+
+    def __init__(self, links, output_dir, download_workers=3, transcode_workers=2, queue_size=4,
+                 ydl_factory=_default_ydl_factory, transcoder=ffmpeg_transcode,
+                 on_progress=None, on_track=None):
+        self.links = list(links)
+        self.output_dir = output_dir
+        self.download_workers = max(1, download_workers)
+        self.transcode_workers = max(1, transcode_workers)
+        self.ydl_factory = ydl_factory
+        self.transcoder = transcoder
+        self.on_progress = on_progress or (lambda index, stage, percent: None)
+        self.on_track = on_track or (lambda path: None)  # wird für jede fertige MP3 aufgerufen
+        self.results = [None] * len(self.links)  # (ok, link, fehler)
+        self._links = queue.Queue()
+        self._downloaded = queue.Queue(maxsize=queue_size)
+        self._cancel = threading.Event()
+        self._names_lock = threading.Lock()
+        self._reserved = set()  # bereits vergebene Zielnamen
+
+    def cancel(self):
+        """Bricht laufende und ausstehende Einträge ab"""
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def run(self):
+        """Führt den Import aus und liefert [(ok, link, fehler)] in Eingabereihenfolge"""
+        for index, link in enumerate(self.links):
+            self.on_progress(index, STAGE_QUEUED, 0)
+            self._links.put((index, link))
+        for _ in range(self.download_workers):
+            self._links.put(None)
+
+        downloaders = [threading.Thread(target=self._download_loop, name=f"yt-download-{i}", daemon=True)
+                       for i in range(self.download_workers)]
+        transcoders = [threading.Thread(target=self._transcode_loop, name=f"yt-transcode-{i}", daemon=True)
+                       for i in range(self.transcode_workers)]
+        for thread in downloaders + transcoders:
+            thread.start()
+        for thread in downloaders:
+            thread.join()
+        # Alle Downloads sind durch: Transcoder-Stufe beenden
+        for _ in range(self.transcode_workers):
+            self._downloaded.put(None)
+        for thread in transcoders:
+            thread.join()
+        return self.results
+
+    def _finish(self, index, stage, error=None):
+        ok = stage == STAGE_DONE
+        self.results[index] = (ok, self.links[index], error)
+        self.on_progress(index, stage, 100 if ok else 0)
+
+    def _download_loop(self):
+        while True:
+            job = self._links.get()
+            if job is None:
+                return
+            index, link = job
+            if self.cancelled:
+                self._finish(index, STAGE_CANCELLED, "Abgebrochen")
+                continue
+            try:
+                raw_path = self._download(index, link)
+                # Blockiert, solange die Transcoder hinterherhängen (Gegendruck)
+                self._downloaded.put((index, raw_path))
+            except ImportCancelled:
+                self._finish(index, STAGE_CANCELLED, "Abgebrochen")
+            except Exception as e:
+                self._finish(index, STAGE_ERROR, str(e))
+
+    def _download(self, index, link):
+        def hook(d):
+            if self.cancelled:
+                raise ImportCancelled()
+            if d['status'] == 'downloading':
+                total_bytes = d.get('total_bytes') or d.get('total_bytes_estimate')
+                downloaded_bytes = d.get('downloaded_bytes')
+                if total_bytes and downloaded_bytes:
+                    self.on_progress(index, STAGE_DOWNLOAD, int(downloaded_bytes / total_bytes * 100))
+
+        ydl_opts = {
+            'format': 'bestaudio/best',
+            # ID im Namen, damit parallele Downloads gleichnamiger Videos nicht kollidieren
+            'outtmpl': os.path.join(self.output_dir, '%(title)s [%(id)s].%(ext)s'),
+            'progress_hooks': [hook],
+            'noplaylist': True,
+            'quiet': True,
+        }
+        self.on_progress(index, STAGE_DOWNLOAD, 0)
+        with self.ydl_factory(ydl_opts) as ydl:
+            info = ydl.extract_info(link, download=True)
+            raw_path = ydl.prepare_filename(info)
+        if self.cancelled:
+            self._remove(raw_path)
+            raise ImportCancelled()
+        return raw_path
+
+    def _transcode_loop(self):
+        while True:
+            job = self._downloaded.get()
+            if job is None:
+                return
+            index, raw_path = job
+            mp3_path = self._target_path(raw_path)
+            try:
+                if self.cancelled:
+                    raise ImportCancelled()
+                self.on_progress(index, STAGE_TRANSCODE, 0)
+                if os.path.splitext(raw_path)[1].lower() == ".mp3":
+                    os.replace(raw_path, mp3_path)
+                else:
+                    self.transcoder(raw_path, mp3_path, self._cancel)
+                self.on_track(mp3_path)
+                self._finish(index, STAGE_DONE)
+            except ImportCancelled:
+                self._remove(mp3_path)
+                self._finish(index, STAGE_CANCELLED, "Abgebrochen")
+            except Exception as e:
+                self._remove(mp3_path)
+                self._finish(index, STAGE_ERROR, str(e))
+            finally:
+                if raw_path != mp3_path:
+                    self._remove(raw_path)
+
+    def _target_path(self, raw_path):
+        # "Titel [id].webm" -> "Titel.mp3", bei Namenskonflikt mit ID
+        base = os.path.splitext(raw_path)[0]
+        with self._names_lock:
+            if base.endswith("]") and " [" in base:
+                short = base[:base.rindex(" [")] + ".mp3"
+                if short not in self._reserved and not os.path.exists(short):
+                    self._reserved.add(short)
+                    return short
+            return base + ".mp3"
+
+    @staticmethod
+    def _remove(path):
+        try:
+            if path and os.path.exists(path):
+                os.remove(path)
+        except Exception as e:
+            print(f"[WARN] Konnte {path} nicht löschen: {e}")
@@ -0,0 +1,125 @@
+# Datei: input_dispatch.py
+import bisect
+import threading
+import time
+from collections import deque
+from PySide6.QtCore import QObject, Signal
+
+# Obergrenzen der Latenz-Fächer in Millisekunden; alles darüber landet im letzten Fach
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+class LatencyHistogram:
+    """Zählt Latenzen in festen Fächern; threadsicher"""
+
+    def __init__(self, buckets_ms=LATENCY_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.counts = [0] * (len(buckets_ms) + 1)
+        self.total = 0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        ms = seconds * 1000
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets_ms, ms)] += 1
+            self.total += 1
+            self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, fraction):
+        """Obergrenze (ms) des Fachs, in das das Perzentil fällt; None ohne Messwerte"""
+        with self._lock:
+            if not self.total:
+                return None
+            rank = fraction * self.total
+            seen = 0
+            for index, count in enumerate(self.counts):
+                seen += count
+                if count and seen >= rank:
+                    return self.buckets_ms[index] if index < len(self.buckets_ms) else self.max_ms
+        return self.max_ms
+
+    def summary(self):
+        """Mehrzeilige Übersicht für die Anzeige"""
+        with self._lock:
+            counts, total, max_ms = list(self.counts), self.total, self.max_ms
+        if not total:
+            return "Noch keine Auslösungen gemessen"
+        lines = []
+        lower = 0
+        for upper, count in zip(self.buckets_ms + (None,), counts):
+            label = f"{lower}-{upper} ms" if upper is not None else f"> {lower} ms"
+            lines.append(f"{label:>14}: {count}")
+            lower = upper
+        lines.append(f"Median ≤ {self.percentile(0.5)} ms, 95 % ≤ {self.percentile(0.95)} ms, "
+                     f"Maximum {max_ms:.1f} ms ({total} Auslösungen)")
+        return "\n".join(lines)
+
+class InputDispatcher(QObject):
+    """Nimmt Szenen-Auslöser von Eingabegeräten aus beliebigen Threads entgegen und startet sie
+    im eigenen Thread direkt über die Audio-Engine, ohne auf die Qt-Ereignisschleife zu warten.
+    Die Warteschlange ist eine deque (append/popleft sind atomar), ein Event weckt den Thread.
+    start_audio(entry, gain) startet den Ton und liefert die ausgeführte Aktion; die Oberfläche
+    wird danach per Signal triggered(scene_id, action) im GUI-Thread nachgezogen, ein Fehler
+    beim Starten per failed(scene_id, Meldung)."""
+
+    triggered = Signal(str, str)  # Szenen-ID, Aktion
+    failed = Signal(str, str)  # Szenen-ID, Fehlermeldung
+
+    def __init__(self, catalog, start_audio, parent=None):
+        super().__init__(parent)
+        self.catalog = catalog
+        self.start_audio = start_audio
+        self.latency = LatencyHistogram()
+        self._queue = deque()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="input-dispatch", daemon=True)
+        self._thread.start()
+
+    def push(self, scene_id, pressed_at=None, gain=1.0):
+        """Szene auslösen; aus jedem Thread aufrufbar, blockiert nie.
+        gain gilt nur für den ausgelösten Sound (z.B. MIDI-Anschlagstärke)."""
+        self._queue.append((scene_id, pressed_at or time.perf_counter(), gain))
+        self._wakeup.set()
+
+    def wait_idle(self, timeout=None):
+        """Wartet, bis die Warteschlange abgearbeitet ist (für Tests)"""
+        deadline = time.monotonic() + (timeout or 0)
+        while self._queue or self._wakeup.is_set():
+            if timeout is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+    def shutdown(self):
+        self._stopped = True
+        self._wakeup.set()
+        self._thread.join(timeout=2)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            if self._stopped:
+                return
+            while self._queue:
+                scene_id, pressed_at, gain = self._queue.popleft()
+                self._dispatch(scene_id, pressed_at, gain)
+            self._wakeup.clear()
+            # Zwischen leerem Lesen und clear() kann ein neuer Auslöser gekommen sein
+            if self._queue:
+                self._wakeup.set()
+
+    def _dispatch(self, scene_id, pressed_at, gain):
+        entry = self.catalog.get_by_id(scene_id)
+        if entry is None:
+            print(f"[WARN] Unbekannte Szene ausgelöst: {scene_id}")
+            return
+        try:
+            action = self.start_audio(entry, gain)
+        except Exception as e:
+            print(f"[WARN] Szene {scene_id} konnte nicht gestartet werden: {e}")
+            self.failed.emit(scene_id, str(e))
+            return
+        self.latency.record(time.perf_counter() - pressed_at)
+        if action:
+            self.triggered.emit(scene_id, action)
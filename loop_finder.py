@@ -0,0 +1,92 @@
+# Datei: loop_finder.py
+import numpy as np
+from audio_decode import decode_pcm
+
+SAMPLE_RATE = 48000
+SEARCH_SEC = 0.5        # Suchbereich um das gewählte Ende (±)
+MATCH_SEC = 0.1         # Länge des verglichenen Ausschnitts um den Schnittpunkt
+ZERO_SNAP_SEC = 0.005   # Höchstens so weit wird auf einen Nulldurchgang verschoben
+MIN_GAIN_SEC = 0.001    # Kleinere Verschiebungen werden nicht vorgeschlagen
+
+class LoopSuggestion:
+    """Vorgeschlagener Schleifenabschnitt mit Güte der Übereinstimmung (-1.0 - 1.0)"""
+
+    __slots__ = ("start", "duration", "score")
+
+    def __init__(self, start, duration, score):
+        self.start = start
+        self.duration = duration
+        self.score = score
+
+def _decode(track_path, start_sec, duration_sec):
+    pcm = decode_pcm(track_path, start_sec, duration_sec, SAMPLE_RATE, 1, "f32le")
+    if pcm is None:
+        raise FileNotFoundError("FFmpeg nicht gefunden. Bitte FFmpeg im assets/ffmpeg Ordner installieren.")
+    return np.frombuffer(pcm, dtype="<f4").astype(np.float64)
+
+def rising_zero_crossings(samples):
+    """Indizes i mit samples[i-1] < 0 <= samples[i]"""
+    return np.flatnonzero((samples[:-1] < 0) & (samples[1:] >= 0)) + 1
+
+def snap_to_zero_crossing(samples, index, max_distance):
+    """Nächster steigender Nulldurchgang um index (oder index selbst, wenn keiner nah genug ist)"""
+    crossings = rising_zero_crossings(samples)
+    if len(crossings) == 0:
+        return index
+    nearest = crossings[np.argmin(np.abs(crossings - index))]
+    return int(nearest) if abs(nearest - index) <= max_distance else index
+
+def normalized_cross_correlation(template, signal):
+    """Normierte Kreuzkorrelation des Musters an jeder Position im Signal (per FFT).
+    Ergebnis[i] vergleicht template mit signal[i:i+len(template)]."""
+    n, m = len(signal), len(template)
+    size = 1 << int(np.ceil(np.log2(n + m)))
+    template = template - template.mean()
+    corr = np.fft.irfft(np.fft.rfft(signal, size) * np.conj(np.fft.rfft(template, size)), size)[:n - m + 1]
+    # Gleitende Energie und Mittelwert des Signals über Kumulativsummen
+    cumsum = np.concatenate([[0.0], np.cumsum(signal)])
+    cumsq = np.concatenate([[0.0], np.cumsum(signal * signal)])
+    window_sum = cumsum[m:] - cumsum[:-m]
+    window_energy = cumsq[m:] - cumsq[:-m] - window_sum ** 2 / m
+    denominator = np.sqrt(np.maximum(window_energy, 1e-12) * max(np.dot(template, template), 1e-12))
+    return corr / denominator
+
+def find_loop_points(track_path, start_sec, duration_sec, search_sec=SEARCH_SEC):
+    """Sucht nahe an Start und Ende des gewählten Abschnitts den saubersten Schnittpunkt.
+    Der Start wird auf einen steigenden Nulldurchgang gelegt; danach wird im Bereich
+    ±search_sec um das Ende die Stelle gesucht, an der das Signal dem Signal direkt am
+    Start am ähnlichsten ist (Kreuzkorrelation Ende gegen Anfang), und wieder auf einen
+    Nulldurchgang gelegt. Dekodiert werden nur die beiden kurzen Bereiche an den Rändern.
+    Liefert LoopSuggestion oder None, wenn sich nichts Besseres findet."""
+    if duration_sec <= 2 * (search_sec + MATCH_SEC):
+        return None
+    match = int(MATCH_SEC * SAMPLE_RATE)
+    snap = int(ZERO_SNAP_SEC * SAMPLE_RATE)
+
+    # Kopf: Start auf Nulldurchgang, Muster = Signal ab dem Start
+    head_offset = max(0.0, start_sec - ZERO_SNAP_SEC)
+    head = _decode(track_path, head_offset, ZERO_SNAP_SEC * 2 + MATCH_SEC)
+    start_index = snap_to_zero_crossing(head, int(round((start_sec - head_offset) * SAMPLE_RATE)), snap)
+    template = head[start_index:start_index + match]
+    if len(template) < match or not np.any(template):
+        return None
+    new_start = head_offset + start_index / SAMPLE_RATE
+
+    # Schwanz: Bereich um das gewählte Ende, in dem das Muster gesucht wird
+    end_sec = start_sec + duration_sec
+    tail_offset = max(new_start + MATCH_SEC, end_sec - search_sec)
+    tail = _decode(track_path, tail_offset, end_sec + search_sec + MATCH_SEC - tail_offset)
+    if len(tail) < 2 * match:
+        return None
+    scores = normalized_cross_correlation(template, tail)
+    best = int(np.argmax(scores))
+    end_index = snap_to_zero_crossing(tail, best, snap)
+    score = float(scores[min(end_index, len(scores) - 1)])
+    new_end = tail_offset + end_index / SAMPLE_RATE
+
+    # Vergleich mit dem unveränderten Schnitt
+    original_index = int(round((end_sec - tail_offset) * SAMPLE_RATE))
+    original_score = float(scores[min(max(original_index, 0), len(scores) - 1)])
+    if score <= original_score or (abs(new_start - start_sec) < MIN_GAIN_SEC and abs(new_end - end_sec) < MIN_GAIN_SEC):
+        return None
+    return LoopSuggestion(round(new_start, 6), round(new_end - new_start, 6), score)
@@ -1,6 +1,7 @@
 # Datei: main.py
 from PySide6.QtWidgets import QApplication
 from PySide6.QtGui import QIcon
+import multiprocessing
 import os
 from config import ensure_dirs
 
@@ -23,6 +24,8 @@ def set_application_icon(app):
         print("Warnung: Kein Icon gefunden!")
 
 if __name__ == "__main__":
+    # Im PyInstaller-Build starten die Analyse-Prozesse sonst je ein weiteres Fenster
+    multiprocessing.freeze_support()
     ensure_dirs()
     app = QApplication([])
     app.setStyle("Fusion")
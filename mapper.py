@@ -6,6 +6,15 @@ MAPPING_DIR = "mappings"
 
 os.makedirs(MAPPING_DIR, exist_ok=True)
 
+def make_scene_id(mapping_file, scene_name):
+    """Eindeutige Szenen-ID aus Mapping-Datei und Szenenname"""
+    return f"{mapping_file}::{scene_name}"
+
+def split_scene_id(scene_id):
+    """Zerlegt eine Szenen-ID in (mapping_file, scene_name)"""
+    mapping_file, _, scene_name = scene_id.partition("::")
+    return mapping_file, scene_name
+
 def list_all_track_mappings():
     return [f for f in os.listdir(MAPPING_DIR) if f.endswith(".json")]
 
@@ -4,43 +4,51 @@ from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QLabel, QLineEdit, QPushButton,
     QHBoxLayout, QComboBox, QGridLayout, QButtonGroup, QToolButton, QMessageBox, QWidget, QSizePolicy, QScrollArea, QFileDialog
 )
-from PySide6.QtGui import QPixmap, QIcon
-from PySide6.QtCore import QSize, Qt
+from PySide6.QtGui import QIcon
+from PySide6.QtCore import QSize, QTimer
 import os
-import json
-from config import MAPPING_DIR, ICON_DIR
+from config import ICON_DIR, ASSET_DIR
+from scene_catalog import get_catalog
+from thumbnail_cache import thumbnails
+from audio_mixer import LAYER_AMBIENCE, LAYER_LABELS
+from audio_analysis import get_analysis_service
+from waveform_widget import WaveformWidget
 from PIL import Image
 
 def parse_time_input(text):
     """Konvertiert Zeit-String in Sekunden.
-    Unterstützt: Sekunden, mm:ss, hh:mm:ss"""
-    text = text.strip()
+    Unterstützt: Sekunden, mm:ss, hh:mm:ss (Sekunden auch mit Nachkommastellen)"""
+    text = text.strip().replace(",", ".")
     
     # Wenn nur Zahlen, dann Sekunden
-    if text.isdigit():
+    if text.replace(".", "", 1).isdigit():
         return float(text)
     
     # Prüfe auf mm:ss oder hh:mm:ss Format
     if ":" in text:
         parts = text.split(":")
-        if len(parts) == 2:  # mm:ss
-            minutes, seconds = map(int, parts)
-            return minutes * 60 + seconds
-        elif len(parts) == 3:  # hh:mm:ss
-            hours, minutes, seconds = map(int, parts)
-            return hours * 3600 + minutes * 60 + seconds
+        try:
+            seconds = float(parts[-1])
+            if len(parts) == 2:  # mm:ss
+                return int(parts[0]) * 60 + seconds
+            elif len(parts) == 3:  # hh:mm:ss
+                return int(parts[0]) * 3600 + int(parts[1]) * 60 + seconds
+        except ValueError:
+            pass
     
     raise ValueError("Ungültiges Zeitformat. Erlaubt sind: Sekunden, mm:ss, hh:mm:ss")
 
 def format_seconds(seconds):
-    """Formatiert Sekunden in lesbares Format"""
-    seconds = int(seconds)
+    """Formatiert Sekunden in lesbares Format (Millisekunden nur, wenn vorhanden)"""
+    millis = int(round(seconds * 1000)) % 1000
+    seconds = int(round(seconds * 1000)) // 1000
+    fraction = f".{millis:03}" if millis else ""
     if seconds >= 3600:
-        return f"{seconds // 3600:02}:{(seconds % 3600) // 60:02}:{seconds % 60:02}"
+        return f"{seconds // 3600:02}:{(seconds % 3600) // 60:02}:{seconds % 60:02}{fraction}"
     elif seconds >= 60:
-        return f"{seconds // 60:02}:{seconds % 60:02}"
+        return f"{seconds // 60:02}:{seconds % 60:02}{fraction}"
     else:
-        return str(seconds)
+        return f"{seconds}{fraction}"
 
 class IconGridWidget(QWidget):
     def __init__(self, icons, default_icon="", parent=None):
@@ -70,10 +78,9 @@ class IconGridWidget(QWidget):
                 icon_path = os.path.join(ICON_DIR, icon)
                 if not os.path.isfile(icon_path):
                     continue
-                pix = QPixmap(icon_path)
+                pix = thumbnails.get_pixmap(icon_path, size)
                 if pix.isNull():
                     raise Exception(f"Icon {icon} konnte nicht geladen werden!")
-                pix = pix.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
                 btn = QToolButton()
                 btn.setIcon(QIcon(pix))
                 btn.setIconSize(QSize(size, size))
@@ -136,27 +143,24 @@ class IconUploadDialog(QDialog):
         self.accept()
 
 class MappingDialog(QDialog):
-    def __init__(self, default_name="", default_start=0.0, default_duration=60.0, default_icon=""):
+    def __init__(self, default_name="", default_start=0.0, default_duration=60.0, default_icon="",
+                 default_layer=LAYER_AMBIENCE, default_crossfade=None):
         super().__init__()
         self.selected_icon = default_icon
         self.setWindowTitle("Szene hinzufügen")
-        self.setMinimumWidth(400)
+        self.setMinimumWidth(640)
 
         layout = QVBoxLayout()
 
         # Track-Auswahl
         self.track_combo = QComboBox()
         self.track_map = {}
-        for f in os.listdir(MAPPING_DIR):
-            if f.endswith(".json"):
-                try:
-                    with open(os.path.join(MAPPING_DIR, f), 'r', encoding='utf-8') as mf:
-                        data = json.load(mf)
-                        track = data.get('track', '')
-                        if isinstance(track, str) and track.lower().endswith('.mp3'):
-                            self.track_map[os.path.splitext(f)[0]] = f
-                except Exception:
-                    pass
+        self.track_duration = 0
+        self.catalog = get_catalog()
+        for f in self.catalog.mapping_files():
+            track = self.catalog.get_mapping(f).get('track', '')
+            if isinstance(track, str) and track.lower().endswith('.mp3'):
+                self.track_map[os.path.splitext(f)[0]] = f
         self.track_combo.addItems(self.track_map.keys())
         self.track_combo.currentTextChanged.connect(self.on_track_changed)
         layout.addWidget(QLabel("Track:"))
@@ -177,6 +181,7 @@ class MappingDialog(QDialog):
         self.start_input = QLineEdit()
         self.start_input.setText(format_seconds(default_start))
         self.start_input.setPlaceholderText("Sekunden oder mm:ss oder hh:mm:ss")
+        self.start_input.editingFinished.connect(self.on_time_edited)
         layout.addWidget(QLabel("Startzeit:"))
         layout.addWidget(self.start_input)
 
@@ -184,9 +189,49 @@ class MappingDialog(QDialog):
         self.duration_input = QLineEdit()
         self.duration_input.setText(format_seconds(default_duration))
         self.duration_input.setPlaceholderText("Sekunden oder mm:ss")
+        self.duration_input.editingFinished.connect(self.on_time_edited)
         layout.addWidget(QLabel("Dauer:"))
         layout.addWidget(self.duration_input)
 
+        # Tracklänge aus der Analyse
+        self.track_length_label = QLabel()
+        self.track_length_label.setStyleSheet("color: #666;")
+        layout.addWidget(self.track_length_label)
+
+        # Wellenform: Auswahl ziehen, Mausrad zoomt, Doppelklick zoomt auf die Auswahl
+        self.waveform = WaveformWidget()
+        self.waveform.selection_changed.connect(self.on_waveform_selection)
+        layout.addWidget(self.waveform)
+        zoom_row = QHBoxLayout()
+        zoom_fit_btn = QPushButton("Ganzer Track")
+        zoom_fit_btn.clicked.connect(self.waveform.zoom_to_fit)
+        zoom_sel_btn = QPushButton("Auf Auswahl zoomen")
+        zoom_sel_btn.clicked.connect(self.waveform.zoom_to_selection)
+        zoom_row.addWidget(zoom_fit_btn)
+        zoom_row.addWidget(zoom_sel_btn)
+        zoom_row.addStretch()
+        layout.addLayout(zoom_row)
+        # Solange die Analyse noch läuft, regelmäßig nachsehen
+        self.analysis_timer = QTimer(self)
+        self.analysis_timer.setInterval(500)
+        self.analysis_timer.timeout.connect(lambda: self.on_track_changed(self.track_combo.currentText()))
+
+        # Mixer-Ebene (Ambiente/Musik als Schleife, Effekte einmalig)
+        self.layer_combo = QComboBox()
+        for layer, label in LAYER_LABELS.items():
+            self.layer_combo.addItem(label, layer)
+        self.layer_combo.setCurrentIndex(max(0, self.layer_combo.findData(default_layer)))
+        layout.addWidget(QLabel("Ebene:"))
+        layout.addWidget(self.layer_combo)
+
+        # Überblendung beim Wechsel auf diese Szene (leer = globale Einstellung)
+        self.crossfade_input = QLineEdit()
+        if default_crossfade is not None:
+            self.crossfade_input.setText(str(default_crossfade))
+        self.crossfade_input.setPlaceholderText("Standard (global)")
+        layout.addWidget(QLabel("Überblendung (Sekunden):"))
+        layout.addWidget(self.crossfade_input)
+
         # Icon-Auswahl als Grid + Upload-Button (nur rechts!)
         layout.addWidget(QLabel("Icon (optional):"))
         self.icon_row = QHBoxLayout()
@@ -220,14 +265,44 @@ class MappingDialog(QDialog):
         if not track_name:
             return
             
-        mapping_file = os.path.join(MAPPING_DIR, self.track_map[track_name])
+        data = self.catalog.get_mapping(self.track_map[track_name])
+        track = data.get('track', '')
+        # Länge aus der Track-Analyse; ältere Mappings haben ggf. ein 'duration'-Feld
+        service = get_analysis_service()
+        analysis = service.get(track)
+        failed = analysis is None and service.failed(track)
+        self.track_duration = analysis.duration if analysis else data.get('duration', 0)
+        if self.track_duration:
+            text = f"Tracklänge: {format_seconds(self.track_duration)}"
+            self.track_length_label.setText(text + (" (Analyse fehlgeschlagen)" if failed else ""))
+        elif failed:
+            self.track_length_label.setText("Analyse fehlgeschlagen")
+        else:
+            self.track_length_label.setText("Tracklänge: wird noch analysiert...")
+
+        # Nach einem Fehler nicht weiter nachsehen, sonst würde alle 500 ms neu angestellt
+        if analysis is None and not failed:
+            service.submit(track)
+            self.analysis_timer.start()
+        else:
+            self.analysis_timer.stop()
+        if analysis is not self.waveform.analysis:
+            self.waveform.set_track(analysis, os.path.join(ASSET_DIR, track))
+            self.on_time_edited()
+
+    def on_waveform_selection(self, start, duration):
+        """Überträgt die in der Wellenform gezogene Auswahl in die Zeitfelder"""
+        self.start_input.setText(format_seconds(start))
+        self.duration_input.setText(format_seconds(duration))
+
+    def on_time_edited(self):
+        """Überträgt die Zeitfelder in die Wellenform"""
         try:
-            with open(mapping_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.track_duration = data.get('duration', 0)
-        except Exception as e:
-            print(f"Fehler beim Laden der Track-Länge: {e}")
-            self.track_duration = 0
+            start = parse_time_input(self.start_input.text())
+            duration = parse_time_input(self.duration_input.text())
+        except ValueError:
+            return
+        self.waveform.set_selection(start, duration)
 
     def refresh_icon_grid(self, default_icon=None):
         icons = [
@@ -250,6 +325,12 @@ class MappingDialog(QDialog):
         self.icon_grid.update()
         self.update()
 
+    def done(self, result):
+        # Läuft bei OK, Abbrechen und Schließen: Vorschau-Thread nicht zurücklassen
+        self.analysis_timer.stop()
+        self.waveform.scrub.stop()
+        super().done(result)
+
     def open_icon_upload(self):
         dlg = IconUploadDialog(self)
         if dlg.exec() and dlg.success:
@@ -268,5 +349,24 @@ class MappingDialog(QDialog):
             QMessageBox.warning(self, "Fehler", str(e))
             raise
 
+        if self.track_duration and start >= self.track_duration:
+            QMessageBox.warning(self, "Fehler", "Die Startzeit liegt hinter dem Ende des Tracks.")
+            raise ValueError("Startzeit hinter Trackende")
+        if self.track_duration:
+            duration = min(duration, self.track_duration - start)
+
         icon = self.icon_grid.get_selected_icon()
         return mapping_file, name, start, duration, icon
+
+    def get_options(self):
+        """Zusätzliche Szenen-Felder, die direkt ins Mapping übernommen werden"""
+        options = {
+            "layer": self.layer_combo.currentData()
+        }
+        crossfade = self.crossfade_input.text().strip().replace(",", ".")
+        if crossfade:
+            try:
+                options["crossfade"] = max(0.0, float(crossfade))
+            except ValueError:
+                QMessageBox.warning(self, "Fehler", "Ungültige Überblendzeit, globale Einstellung wird verwendet.")
+        return options
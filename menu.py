@@ -1,5 +1,5 @@
 # menu.py
-from PySide6.QtWidgets import QMenuBar, QMenu, QMessageBox
+from PySide6.QtWidgets import QMenuBar, QMenu, QMessageBox, QInputDialog
 from PySide6.QtGui import QAction
 from track_manager import upload_track, delete_track
 from scene_manager import create_scene, edit_scene, delete_scene
@@ -10,6 +10,8 @@ from config import FFMPEG_DIR
 from yt_importer import YoutubeImportDialog, YoutubeBulkImportDialog
 from scene_exporter import export_scenes, import_scenes
 from streamdeck_config import StreamDeckConfigDialog
+from settings import get_setting, set_setting
+from segment_cache import segment_cache
 
 class MenuBar(QMenuBar):
     def __init__(self, parent=None):
@@ -66,6 +68,44 @@ def bulk_youtube_import(parent):
     dlg = YoutubeBulkImportDialog(parent)
     dlg.exec()
 
+def configure_segment_cache(parent):
+    """Fragt das Speicherbudget des Segment-Caches ab und zeigt die Cache-Statistik"""
+    stats = segment_cache.stats()
+    budget, ok = QInputDialog.getInt(
+        parent,
+        "Audio-Cache",
+        f"Belegt: {stats['used_mb']:.0f} MB in {stats['entries']} Abschnitten\n"
+        f"Treffer: {stats['hits']}  Fehlschläge: {stats['misses']}  Verdrängt: {stats['evictions']}\n\n"
+        "Speicherbudget (MB):",
+        get_setting("segment_cache_mb"), 16, 16384
+    )
+    if ok:
+        set_setting("segment_cache_mb", budget)
+        segment_cache.set_budget(budget)
+
+def configure_crossfade(parent):
+    """Fragt die globale Standard-Überblendung zwischen Szenen ab"""
+    seconds, ok = QInputDialog.getDouble(
+        parent,
+        "Überblendung",
+        "Standard-Überblendung zwischen Szenen (Sekunden, 0 = harter Schnitt):",
+        get_setting("crossfade_sec"), 0.0, 30.0, 1
+    )
+    if ok:
+        set_setting("crossfade_sec", seconds)
+
+def configure_target_loudness(parent):
+    """Fragt die Ziel-Lautheit ab, auf die alle Szenen angeglichen werden"""
+    lufs, ok = QInputDialog.getDouble(
+        parent,
+        "Ziel-Lautheit",
+        "Ziel-Lautheit aller Szenen (LUFS, z.B. -20 für Hintergrund, -14 für laute Wiedergabe):\n"
+        "Gilt ab der nächsten gestarteten Szene.",
+        get_setting("target_loudness"), -40.0, 0.0, 1
+    )
+    if ok:
+        set_setting("target_loudness", lufs)
+
 def create_menu(parent):
     menubar = QMenuBar(parent)
     
@@ -86,6 +126,10 @@ def create_menu(parent):
     export_action.triggered.connect(lambda: export_scenes(parent))
     file_menu.addAction(export_action)
     
+    incremental_action = QAction("Szenen inkrementell exportieren...", parent)
+    incremental_action.triggered.connect(lambda: export_scenes(parent, incremental=True))
+    file_menu.addAction(incremental_action)
+    
     import_action = QAction("Szenen importieren...", parent)
     import_action.triggered.connect(lambda: import_scenes(parent))
     file_menu.addAction(import_action)
@@ -122,6 +166,34 @@ def create_menu(parent):
     config_action = QAction("StreamDeck konfigurieren...", parent)
     config_action.triggered.connect(lambda: StreamDeckConfigDialog(parent).exec())
     streamdeck_menu.addAction(config_action)
+
+    auto_layout_action = QAction("Layout automatisch erstellen", parent)
+    auto_layout_action.triggered.connect(parent.auto_layout_streamdeck)
+    streamdeck_menu.addAction(auto_layout_action)
+
+    latency_action = QAction("Eingabe-Latenz...", parent)
+    latency_action.triggered.connect(parent.show_input_latency)
+    streamdeck_menu.addAction(latency_action)
+    
+    # Einstellungen-Menü
+    settings_menu = menubar.addMenu("Einstellungen")
+    cache_action = QAction("Audio-Cache...", parent)
+    cache_action.triggered.connect(lambda: configure_segment_cache(parent))
+    settings_menu.addAction(cache_action)
+    midi_action = QAction("MIDI-Eingang...", parent)
+    midi_action.triggered.connect(parent.select_midi_port)
+    settings_menu.addAction(midi_action)
+    crossfade_action = QAction("Überblendung...", parent)
+    crossfade_action.triggered.connect(lambda: configure_crossfade(parent))
+    settings_menu.addAction(crossfade_action)
+    normalize_action = QAction("Lautheit angleichen", parent)
+    normalize_action.setCheckable(True)
+    normalize_action.setChecked(get_setting("normalize_loudness"))
+    normalize_action.toggled.connect(lambda checked: set_setting("normalize_loudness", checked))
+    settings_menu.addAction(normalize_action)
+    loudness_action = QAction("Ziel-Lautheit...", parent)
+    loudness_action.triggered.connect(lambda: configure_target_loudness(parent))
+    settings_menu.addAction(loudness_action)
     
     # Hilfe-Menü
     help_menu = menubar.addMenu("Hilfe")
@@ -0,0 +1,85 @@
+# Datei: prefetcher.py
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import audio
+from config import ASSET_DIR
+from scene_catalog import get_catalog
+from settings import get_setting
+
+# Solange eine Szene läuft, hat der Mixer Vorrang: dann dekodiert höchstens ein Job zur Zeit,
+# und zwischen zwei Dekodierungen liegen mindestens BACKOFF_SEC
+BACKOFF_SEC = 1.0
+
+class ScenePrefetcher:
+    """Dekodiert gebundene Szenen (Hotkeys, StreamDeck) im Hintergrund in den Segment-Cache"""
+
+    def __init__(self, max_workers=None):
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers or get_setting("prefetch_workers"),
+            thread_name_prefix="prefetch"
+        )
+        self._catalog = get_catalog()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stop = threading.Event()
+        self._throttle = threading.Lock()
+        self._last_decode = 0.0
+
+    def schedule(self, scenes):
+        """Plant (mapping_file, scene_name)-Paare zur Vorab-Dekodierung ein und kehrt sofort zurück"""
+        with self._lock:
+            if self._closed:
+                return
+            for scene in scenes:
+                if scene in self._pending:
+                    continue
+                self._pending.add(scene)
+                self._pool.submit(self._prefetch, *scene)
+
+    def shutdown(self):
+        """Beendet den Pool, offene Jobs werden verworfen"""
+        with self._lock:
+            self._closed = True
+        self._stop.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _prefetch(self, mapping_file, scene_name):
+        try:
+            if self._closed:
+                return
+            entry = self._catalog.get(mapping_file, scene_name)
+            if not entry:
+                return
+            scene = entry.scene
+            path = os.path.join(ASSET_DIR, entry.track)
+            if not os.path.exists(path):
+                return
+            if audio.is_segment_cached(path, scene["start"], scene["duration"]):
+                return
+            if not audio.is_playing():
+                audio.load_segment(path, scene["start"], scene["duration"], low_priority=True)
+                return
+            with self._throttle:
+                if not self._wait_for_turn():
+                    return
+                audio.load_segment(path, scene["start"], scene["duration"], low_priority=True)
+                self._last_decode = time.monotonic()
+        except Exception as e:
+            print(f"[WARN] Vorab-Dekodierung von '{scene_name}' fehlgeschlagen: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard((mapping_file, scene_name))
+
+    def _wait_for_turn(self):
+        """Wartet (mit gehaltenem _throttle), bis BACKOFF_SEC seit der letzten Dekodierung
+        vergangen sind oder nichts mehr läuft. False, wenn inzwischen beendet wurde."""
+        while audio.is_playing():
+            remaining = self._last_decode + BACKOFF_SEC - time.monotonic()
+            if remaining <= 0:
+                break
+            if self._stop.wait(remaining):
+                return False
+        return not self._stop.is_set()
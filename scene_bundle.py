@@ -0,0 +1,177 @@
+# Datei: scene_bundle.py
+import hashlib
+import json
+import os
+import time
+import zipfile
+
+BUNDLE_EXTENSION = ".sbz"
+BUNDLE_FORMAT = 1
+EXPORT_JSON = "soundboard_export.json"
+MANIFEST_JSON = "manifest.json"
+CHUNK_SIZE = 1024 * 1024
+
+# Bereits komprimierte Formate werden unverändert abgelegt
+STORED_EXTENSIONS = (".mp3", ".mp4", ".webp", ".png", ".jpg", ".jpeg")
+
+class BundleError(Exception):
+    """Bundle ist ungültig oder beschädigt"""
+
+def _compression_for(arcname):
+    if arcname.lower().endswith(STORED_EXTENSIONS):
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+def _copy_stream(src, dst, sha, progress=None):
+    size = 0
+    for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+        if progress:
+            progress.check()
+        sha.update(chunk)
+        dst.write(chunk)
+        size += len(chunk)
+        if progress:
+            progress.add_bytes(len(chunk))
+    return size
+
+class BundleWriter:
+    """Schreibt ein Szenen-Bundle (ZIP) eintragsweise im Datenstrom.
+    Der Speicherbedarf ist unabhängig von der Größe der Tracks.
+    Geschrieben wird in eine .part-Datei, die erst beim Schließen umbenannt wird."""
+
+    def __init__(self, path, progress=None):
+        self.path = path
+        self.progress = progress  # optional: TransferProgress für Fortschritt und Abbruch
+        self.entries = {}  # arcname -> {"sha256", "size"}
+        self._tmp_path = path + ".part"
+        self._zip = zipfile.ZipFile(self._tmp_path, 'w', allowZip64=True)
+
+    def add_file(self, arcname, src_path):
+        """Kopiert eine Datei blockweise ins Bundle und merkt sich ihre Prüfsumme"""
+        with open(src_path, 'rb') as src:
+            return self.add_stream(arcname, src)
+
+    def add_stream(self, arcname, src):
+        info = zipfile.ZipInfo(arcname, date_time=time.localtime()[:6])
+        info.compress_type = _compression_for(arcname)
+        sha = hashlib.sha256()
+        with self._zip.open(info, 'w', force_zip64=True) as dst:
+            size = _copy_stream(src, dst, sha, self.progress)
+        self.entries[arcname] = {"sha256": sha.hexdigest(), "size": size}
+        return self.entries[arcname]
+
+    def add_json(self, arcname, data):
+        payload = json.dumps(data, indent=4).encode('utf-8')
+        info = zipfile.ZipInfo(arcname, date_time=time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        self._zip.writestr(info, payload)
+        self.entries[arcname] = {"sha256": hashlib.sha256(payload).hexdigest(), "size": len(payload)}
+
+    def close(self, extra_manifest=None):
+        """Schreibt das Manifest mit allen Prüfsummen und schließt das Archiv"""
+        manifest = {
+            "format": BUNDLE_FORMAT,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "entries": self.entries,
+        }
+        manifest.update(extra_manifest or {})
+        info = zipfile.ZipInfo(MANIFEST_JSON, date_time=time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        self._zip.writestr(info, json.dumps(manifest, indent=4).encode('utf-8'))
+        self._zip.close()
+        os.replace(self._tmp_path, self.path)
+        return manifest
+
+    def abort(self):
+        """Schließt das Archiv und löscht die unvollständige Datei"""
+        try:
+            self._zip.close()
+        finally:
+            if os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+
+class BundleReader:
+    """Liest ein Szenen-Bundle. Über das ZIP-Inhaltsverzeichnis wird jeder Eintrag
+    einzeln gelesen, geprüft und entpackt – ohne das ganze Archiv zu lesen.
+    extract darf aus mehreren Threads gleichzeitig aufgerufen werden."""
+
+    def __init__(self, path, progress=None):
+        self.path = path
+        self.progress = progress
+        try:
+            self._zip = zipfile.ZipFile(path, 'r')
+        except zipfile.BadZipFile as e:
+            raise BundleError(f"Kein gültiges Bundle: {e}")
+        self.manifest = self.read_json(MANIFEST_JSON)
+        if self.manifest.get("format") != BUNDLE_FORMAT:
+            raise BundleError("Nicht unterstütztes Bundle-Format!")
+        self.entries = self.manifest.get("entries", {})
+
+    def read_json(self, arcname):
+        with self._open(arcname) as f:
+            try:
+                return json.load(f)
+            except ValueError as e:
+                raise BundleError(f"Ungültiger Eintrag {arcname}: {e}")
+
+    def _open(self, arcname):
+        try:
+            return self._zip.open(arcname)
+        except KeyError:
+            raise BundleError(f"Eintrag fehlt im Bundle: {arcname}")
+
+    def _expected(self, arcname):
+        expected = self.entries.get(arcname)
+        if expected is None:
+            raise BundleError(f"Eintrag fehlt im Manifest: {arcname}")
+        return expected
+
+    def read_export(self):
+        """Export-Daten (version, tracks, mappings), gegen das Manifest geprüft"""
+        self.verify(EXPORT_JSON)
+        return self.read_json(EXPORT_JSON)
+
+    def has(self, arcname):
+        return arcname in self.entries
+
+    def digest(self, arcname):
+        return self.entries[arcname]["sha256"]
+
+    def verify(self, arcname):
+        """Prüft einen Eintrag blockweise gegen seine Prüfsumme im Manifest"""
+        expected = self._expected(arcname)
+        sha = hashlib.sha256()
+        with self._open(arcname) as src:
+            for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                sha.update(chunk)
+        if sha.hexdigest() != expected["sha256"]:
+            raise BundleError(f"Prüfsumme stimmt nicht: {arcname}")
+
+    def extract(self, arcname, dest_path):
+        """Entpackt einen Eintrag über eine temporäre Datei; bei falscher Prüfsumme
+        bleibt nichts zurück"""
+        expected = self._expected(arcname)
+        tmp_path = dest_path + ".part"
+        sha = hashlib.sha256()
+        try:
+            with self._open(arcname) as src, open(tmp_path, 'wb') as dst:
+                _copy_stream(src, dst, sha, self.progress)
+            if sha.hexdigest() != expected["sha256"]:
+                raise BundleError(f"Prüfsumme stimmt nicht: {arcname}")
+            os.replace(tmp_path, dest_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return dest_path
+
+    def size(self, arcname):
+        return self.entries[arcname]["size"]
+
+    def close(self):
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
@@ -0,0 +1,150 @@
+# Datei: scene_catalog.py
+import copy
+import os
+from PySide6.QtCore import QObject, Signal, QFileSystemWatcher, QTimer
+from mapper import MAPPING_DIR, load_mapping, save_mapping, make_scene_id
+
+class SceneEntry:
+    """Eine Szene im Katalog"""
+    __slots__ = ("scene_id", "mapping_file", "name", "track", "scene")
+
+    def __init__(self, mapping_file, name, track, scene):
+        self.scene_id = make_scene_id(mapping_file, name)
+        self.mapping_file = mapping_file
+        self.name = name
+        self.track = track
+        self.scene = scene
+
+class SceneCatalog(QObject):
+    """Hält alle Mappings im Speicher und indiziert Szenen nach (mapping_file, scene_name).
+    Nur Dateien mit geänderter mtime werden neu eingelesen."""
+
+    # Szenen-IDs: hinzugefügt, entfernt, geändert
+    changed = Signal(set, set, set)
+
+    def __init__(self, mapping_dir=MAPPING_DIR, parent=None):
+        super().__init__(parent)
+        self.mapping_dir = mapping_dir
+        self._mtimes = {}    # mapping_file -> mtime
+        self._mappings = {}  # mapping_file -> data
+        self._scenes = {}    # scene_id -> SceneEntry
+
+        # Dateisystem-Watcher, Änderungen werden kurz gesammelt
+        self._watcher = QFileSystemWatcher([self.mapping_dir], self)
+        self._watcher.directoryChanged.connect(self._schedule_refresh)
+        self._watcher.fileChanged.connect(self._schedule_refresh)
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(200)
+        self._refresh_timer.timeout.connect(self.refresh)
+        self.refresh()
+
+    def refresh(self):
+        """Liest neue und geänderte Mapping-Dateien ein, entfernt gelöschte"""
+        old_scenes = self._scenes
+        files = {}
+        for filename in os.listdir(self.mapping_dir):
+            if filename.endswith(".json"):
+                try:
+                    files[filename] = os.path.getmtime(os.path.join(self.mapping_dir, filename))
+                except OSError:
+                    pass
+
+        for filename in list(self._mappings):
+            if filename not in files:
+                self._forget(filename)
+        for filename, mtime in files.items():
+            if self._mtimes.get(filename) != mtime:
+                try:
+                    self._index(filename, load_mapping(filename), mtime)
+                except Exception as e:
+                    print(f"[WARN] Mapping {filename} konnte nicht geladen werden: {e}")
+
+        self._watch_files()
+        self._emit_diff(old_scenes)
+
+    def save(self, mapping_file, data):
+        """Speichert ein Mapping und aktualisiert den Index ohne erneutes Einlesen"""
+        old_scenes = self._scenes
+        save_mapping(mapping_file, data)
+        path = os.path.join(self.mapping_dir, mapping_file)
+        self._index(mapping_file, copy.deepcopy(data), os.path.getmtime(path))
+        self._watch_files()
+        self._emit_diff(old_scenes)
+
+    def get(self, mapping_file, scene_name):
+        return self._scenes.get(make_scene_id(mapping_file, scene_name))
+
+    def get_by_id(self, scene_id):
+        return self._scenes.get(scene_id)
+
+    def scenes(self):
+        """Alle Szenen in stabiler Reihenfolge (Datei, dann Reihenfolge im Mapping)"""
+        return list(self._scenes.values())
+
+    def mapping_files(self):
+        return list(self._mappings)
+
+    def get_mapping(self, mapping_file):
+        """Kopie eines Mappings – darf vor catalog.save() verändert werden"""
+        return copy.deepcopy(self._mappings.get(mapping_file, {}))
+
+    def _index(self, filename, data, mtime):
+        self._mtimes[filename] = mtime
+        # Nur echte Track-Mappings, keine Konfigurationsdateien (hotkeys.json etc.)
+        if not isinstance(data, dict) or "track" not in data:
+            self._drop_scenes(filename)
+            self._mappings.pop(filename, None)
+            return
+        self._mappings[filename] = data
+        scenes = self._without(filename)
+        for name, scene in data.get("scenes", {}).items():
+            entry = SceneEntry(filename, name, data["track"], scene)
+            scenes[entry.scene_id] = entry
+        self._scenes = self._sorted(scenes)
+
+    def _forget(self, filename):
+        self._mtimes.pop(filename, None)
+        self._mappings.pop(filename, None)
+        self._drop_scenes(filename)
+
+    def _drop_scenes(self, filename):
+        self._scenes = self._without(filename)
+
+    def _without(self, filename):
+        return {sid: e for sid, e in self._scenes.items() if e.mapping_file != filename}
+
+    @staticmethod
+    def _sorted(scenes):
+        # dict bewahrt die Einfügereihenfolge; sorted() ist stabil innerhalb einer Datei
+        return dict(sorted(scenes.items(), key=lambda item: item[1].mapping_file))
+
+    def _watch_files(self):
+        paths = [os.path.join(self.mapping_dir, f) for f in self._mtimes]
+        watched = set(self._watcher.files())
+        missing = [p for p in paths if p not in watched and os.path.exists(p)]
+        if missing:
+            self._watcher.addPaths(missing)
+
+    def _schedule_refresh(self, *_):
+        self._refresh_timer.start()
+
+    def _emit_diff(self, old_scenes):
+        added = set(self._scenes) - set(old_scenes)
+        removed = set(old_scenes) - set(self._scenes)
+        modified = {
+            sid for sid in set(self._scenes) & set(old_scenes)
+            if self._scenes[sid].scene != old_scenes[sid].scene
+            or self._scenes[sid].track != old_scenes[sid].track
+        }
+        if added or removed or modified:
+            self.changed.emit(added, removed, modified)
+
+_catalog = None
+
+def get_catalog():
+    """Prozessweiter Szenen-Katalog (wird beim ersten Zugriff angelegt)"""
+    global _catalog
+    if _catalog is None:
+        _catalog = SceneCatalog()
+    return _catalog
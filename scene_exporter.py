@@ -1,126 +1,511 @@
 import os
 import json
-import shutil
-from PySide6.QtWidgets import QFileDialog, QMessageBox
+import hashlib
+import uuid
+from PySide6.QtWidgets import (QFileDialog, QMessageBox, QDialog, QVBoxLayout, QListWidget,
+                               QListWidgetItem, QDialogButtonBox, QLabel, QProgressDialog)
+from PySide6.QtCore import Qt, QThread, Signal, QEventLoop
 from config import ASSET_DIR, MAPPING_DIR, ICON_DIR
+from track_store import get_track_store, digest_file
+from scene_bundle import BundleWriter, BundleReader, BundleError, BUNDLE_EXTENSION, EXPORT_JSON
+from transfer import TransferProgress, TransferCancelled, copy_file
+from audio_analysis import get_analysis_service
 
-def export_scenes(parent):
-    """Exportiert alle Szenen, Tracks und Icons in ein ZIP-Archiv"""
-    export_dir = QFileDialog.getExistingDirectory(parent, "Export-Verzeichnis wählen")
-    if not export_dir:
-        return
-        
-    # Sammle alle benötigten Dateien
+EXPORT_VERSION = "2.0"
+BUNDLE_FILTER = f"Soundboard-Bundle (*{BUNDLE_EXTENSION})"
+LEGACY_FILTER = f"Export-Verzeichnis ({EXPORT_JSON})"
+STAGING_SUFFIX = ".import"
+MB = 1024 * 1024
+
+def _scene_icons(mapping):
+    return {scene.get("icon") for scene in mapping.get("scenes", {}).values() if scene.get("icon")}
+
+def collect_export():
+    """Sammelt alle Mappings mit ihren Tracks und Icons -> (export_data, icons)"""
     tracks_to_export = set()
     icons_to_export = set()
     mappings = {}
-    
-    # Durchsuche alle Mappings
+
     for filename in os.listdir(MAPPING_DIR):
         if not filename.endswith(".json"):
             continue
-            
+
         with open(os.path.join(MAPPING_DIR, filename), 'r', encoding='utf-8') as f:
             data = json.load(f)
-            track = data.get("track")
-            if track:
-                tracks_to_export.add(track)
-            mappings[filename] = data
-            
-            # Sammle Icons
-            for scene in data.get("scenes", {}).values():
-                icon = scene.get("icon")
-                if icon:
-                    icons_to_export.add(icon)
-    
-    # Erstelle Export-Struktur
+        track = data.get("track")
+        if not track:
+            continue  # z.B. settings.json
+        tracks_to_export.add(track)
+        mappings[filename] = data
+        icons_to_export |= _scene_icons(data)
+
     export_data = {
-        "version": "1.0",
-        "tracks": list(tracks_to_export),
+        "version": EXPORT_VERSION,
+        "tracks": sorted(tracks_to_export),
         "mappings": mappings
     }
-    
-    # Speichere Export-Daten
-    export_json = os.path.join(export_dir, "soundboard_export.json")
-    with open(export_json, 'w', encoding='utf-8') as f:
-        json.dump(export_data, f, indent=4)
-    
-    # Kopiere Tracks
-    tracks_dir = os.path.join(export_dir, "tracks")
-    os.makedirs(tracks_dir, exist_ok=True)
-    for track in tracks_to_export:
-        src = os.path.join(ASSET_DIR, track)
-        if os.path.exists(src):
-            shutil.copy2(src, os.path.join(tracks_dir, track))
-    
-    # Kopiere Icons
-    icons_dir = os.path.join(export_dir, "icons")
-    os.makedirs(icons_dir, exist_ok=True)
-    for icon in icons_to_export:
-        src = os.path.join(ICON_DIR, icon)
-        if os.path.exists(src):
-            shutil.copy2(src, os.path.join(icons_dir, icon))
-    
-    QMessageBox.information(parent, "Export erfolgreich", 
-        f"Export abgeschlossen!\n\n"
-        f"Verzeichnis: {export_dir}\n"
-        f"Tracks: {len(tracks_to_export)}\n"
-        f"Icons: {len(icons_to_export)}\n"
-        f"Mappings: {len(mappings)}")
+    return export_data, sorted(icons_to_export)
 
-def import_scenes(parent):
-    """Importiert Szenen aus einem Export-Verzeichnis"""
-    import_dir = QFileDialog.getExistingDirectory(parent, "Import-Verzeichnis wählen")
-    if not import_dir:
-        return
-        
-    # Prüfe Export-Datei
-    export_json = os.path.join(import_dir, "soundboard_export.json")
-    if not os.path.exists(export_json):
-        QMessageBox.critical(parent, "Fehler", "Keine gültige Export-Datei gefunden!")
-        return
-        
+def mapping_digest(data):
+    """Inhalts-Hash eines Mappings (unabhängig von Schlüsselreihenfolge und Einrückung)"""
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+
+def collect_state(export_data, icons):
+    """Inhaltsstand der Installation: Eintragsname -> SHA-256.
+    Track-Hashes kommen aus dem Track-Store und werden nur bei Änderung neu berechnet."""
+    store = get_track_store()
+    state = {}
+    for track in export_data["tracks"]:
+        digest = store.digest_of(track)
+        if digest:
+            state[f"tracks/{track}"] = digest
+    for icon in icons:
+        path = os.path.join(ICON_DIR, icon)
+        if os.path.exists(path):
+            state[f"icons/{icon}"] = digest_file(path)
+    for filename, data in export_data["mappings"].items():
+        state[f"mappings/{filename}"] = mapping_digest(data)
+    return state
+
+def make_delta(export_data, icons, state, base_state):
+    """Reduziert die Export-Daten auf alles, was sich seit base_state geändert hat"""
+    def changed(key):
+        return key in state and state[key] != base_state.get(key)
+
+    delta = {
+        "version": EXPORT_VERSION,
+        "delta": True,
+        "tracks": [track for track in export_data["tracks"] if changed(f"tracks/{track}")],
+        "mappings": {filename: data for filename, data in export_data["mappings"].items()
+                     if changed(f"mappings/{filename}")},
+        "removed": sorted(key[len("mappings/"):] for key in base_state
+                          if key.startswith("mappings/") and key not in state),
+    }
+    return delta, [icon for icon in icons if changed(f"icons/{icon}")]
+
+def write_bundle(path, export_data, icons, base_manifest=None, progress=None):
+    """Schreibt Export-Daten, Tracks und Icons als ein Bundle; liefert das Manifest.
+    Mit base_manifest (Manifest eines früheren Bundles) entsteht ein Delta-Bundle, das nur
+    geänderte Mappings und neue oder geänderte Tracks und Icons enthält.
+    Bei Abbruch über progress bleibt keine Teildatei zurück."""
+    progress = progress or TransferProgress()
+    state = collect_state(export_data, icons)
+    if base_manifest is not None:
+        export_data, icons = make_delta(export_data, icons, state, base_manifest.get("state", {}))
+
+    files = [(f"tracks/{track}", os.path.join(ASSET_DIR, track)) for track in export_data["tracks"]]
+    files += [(f"icons/{icon}", os.path.join(ICON_DIR, icon)) for icon in icons]
+    files = [(arcname, src) for arcname, src in files if os.path.exists(src)]
+    progress.set_totals(sum(os.path.getsize(src) for _, src in files), len(files))
+
+    # Ein ZIP ist ein einzelner Datenstrom: die Einträge werden nacheinander geschrieben
+    writer = BundleWriter(path, progress)
+    try:
+        writer.add_json(EXPORT_JSON, export_data)
+        for arcname, src in files:
+            writer.add_file(arcname, src)
+            progress.file_done()
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.close({
+        "id": uuid.uuid4().hex,
+        "base": base_manifest.get("id") if base_manifest else None,
+        "state": state,
+    })
+
+def _stage(progress, jobs, copy):
+    """Kopiert alle (Quelle, Staging-Pfad)-Paare parallel. Bei Fehler oder Abbruch werden
+    alle Staging-Dateien wieder entfernt, sodass die Installation unverändert bleibt."""
+    def run(job):
+        copy(*job)
+        progress.file_done()
+
+    try:
+        progress.run_parallel(run, jobs)
+        progress.check()
+    except BaseException:
+        for _, staging in jobs:
+            _remove(staging)
+        raise
+
+def _commit(staged_tracks, staged_icons, renamed, replace=False):
+    """Übernimmt die Staging-Dateien; liefert die Zahl neuer Tracks.
+    Mit replace (Delta-Bundle) ersetzen Tracks die gleichnamige Datei an Ort und Stelle."""
+    store = get_track_store()
+    tracks = 0
+    for track, staging, digest in staged_tracks:
+        if replace:
+            store.replace_file(staging, track, digest)
+            get_analysis_service().submit(track)
+            tracks += 1
+            continue
+        stored, dup = store.add_file(staging, track, move=True, digest=digest)
+        if not dup:
+            get_analysis_service().submit(stored)
+            tracks += 1
+        if stored != track:
+            renamed[track] = stored
+    for staging, dest in staged_icons:
+        os.replace(staging, dest)
+    return tracks
+
+def _checked_name(name, kind):
+    """Datei-Namen aus dem Bundle dürfen nur Namen sein, keine Pfade (sonst könnte ein
+    präpariertes Bundle außerhalb der Zielordner schreiben)"""
+    if not isinstance(name, str) or name in ("", ".", "..") or os.path.basename(name) != name \
+            or "/" in name or "\\" in name:
+        raise BundleError(f"Ungültiger {kind}-Name im Bundle: {name!r}")
+    return name
+
+def _check_mappings(mappings):
+    """Prüft alle Mapping-, Track- und Icon-Namen aus den (nicht vertrauenswürdigen) Export-Daten"""
+    for filename, data in mappings.items():
+        _checked_name(filename, "Mapping")
+        if data.get("track"):
+            _checked_name(data["track"], "Track")
+        for icon in _scene_icons(data):
+            _checked_name(icon, "Icon")
+
+def _remove(path):
     try:
-        with open(export_json, 'r', encoding='utf-8') as f:
-            export_data = json.load(f)
+        if os.path.exists(path):
+            os.remove(path)
     except Exception as e:
-        QMessageBox.critical(parent, "Fehler", f"Fehler beim Lesen der Export-Datei:\n{str(e)}")
-        return
-        
-    # Prüfe Version
-    if export_data.get("version") != "1.0":
-        QMessageBox.critical(parent, "Fehler", "Nicht unterstützte Export-Version!")
-        return
-        
-    # Kopiere Tracks
+        print(f"[WARN] Konnte {path} nicht löschen: {e}")
+
+def import_bundle(path, mapping_files=None, progress=None):
+    """Importiert ein Bundle. Mit mapping_files werden nur diese Mappings samt ihrer
+    Tracks und Icons entpackt; jeder Eintrag wird gegen das Manifest geprüft.
+    Ein Delta-Bundle wird auf die bestehende Installation angewendet: geänderte Mappings
+    werden überschrieben, entfernte gelöscht, geänderte Tracks unter ihrem Namen ersetzt.
+    Tracks, die nicht im Bundle liegen, werden über ihren Hash aus dem Manifest lokal gesucht.
+    Einträge werden parallel in Staging-Dateien entpackt und erst nach dem letzten
+    Abbruchpunkt übernommen. Liefert (neue oder aktualisierte Mappings, neue Tracks)."""
+    progress = progress or TransferProgress()
+    with BundleReader(path, progress) as reader:
+        export_data = reader.read_export()
+        if export_data.get("version") != EXPORT_VERSION:
+            raise BundleError("Nicht unterstützte Export-Version!")
+        is_delta = export_data.get("delta", False)
+        state = reader.manifest.get("state", {})
+
+        mappings = export_data.get("mappings", {})
+        _check_mappings(mappings)
+        # Entfernte Mappings werden gelöscht: nur reine .json-Namen zulassen
+        removed = export_data.get("removed", [])
+        for filename in removed:
+            if not str(filename).endswith(".json"):
+                raise BundleError(f"Ungültiger Mapping-Name im Bundle: {filename!r}")
+            _checked_name(filename, "Mapping")
+        if mapping_files is not None:
+            mappings = {name: data for name, data in mappings.items() if name in mapping_files}
+
+        # Tracks: gleicher Inhalt wird gar nicht erst entpackt
+        store = get_track_store()
+        renamed = {}        # Name im Bundle -> Name im Soundboard
+        missing = []
+        jobs = []           # (Eintrag im Bundle, Staging-Pfad)
+        staged_tracks = []  # (Name im Bundle, Staging-Pfad, Digest)
+        needed = {data.get("track") for data in mappings.values() if data.get("track")}
+        if is_delta:
+            # Geänderte Tracks liegen im Delta auch dann, wenn ihr Mapping unverändert ist
+            needed |= {_checked_name(track, "Track") for track in export_data.get("tracks", [])}
+        for track in sorted(needed):
+            arcname = f"tracks/{track}"
+            digest = reader.digest(arcname) if reader.has(arcname) else state.get(arcname)
+            stored = store.find(digest) if digest else None
+            if stored is None and reader.has(arcname):
+                staging = os.path.join(ASSET_DIR, track + STAGING_SUFFIX)
+                jobs.append((arcname, staging))
+                staged_tracks.append((track, staging, digest))
+            elif stored is None:
+                missing.append(track)
+            elif stored != track:
+                renamed[track] = stored
+        if is_delta and missing:
+            raise BundleError("Tracks fehlen – zuerst das Basis-Bundle importieren:\n"
+                              + "\n".join(missing))
+
+        # Icons nur, wenn sie noch nicht existieren (im Delta: wenn sie sich geändert haben)
+        icons = set().union(*(_scene_icons(data) for data in mappings.values()))
+        if is_delta:
+            icons |= {_checked_name(name[len("icons/"):], "Icon")
+                      for name in reader.entries if name.startswith("icons/")}
+        staged_icons = []  # (Staging-Pfad, Ziel)
+        for icon in icons:
+            arcname = f"icons/{icon}"
+            dest = os.path.join(ICON_DIR, icon)
+            if reader.has(arcname) and (is_delta or not os.path.exists(dest)):
+                jobs.append((arcname, dest + STAGING_SUFFIX))
+                staged_icons.append((dest + STAGING_SUFFIX, dest))
+
+        progress.set_totals(sum(reader.size(arcname) for arcname, _ in jobs), len(jobs))
+        _stage(progress, jobs, reader.extract)
+
+    # Ab hier kein Abbruch mehr: alles in einem Rutsch übernehmen
+    tracks = _commit(staged_tracks, staged_icons, renamed, replace=is_delta)
+    imported = _write_mappings(mappings, renamed, overwrite=is_delta)
+    if is_delta and mapping_files is None:
+        for filename in removed:
+            _remove(os.path.join(MAPPING_DIR, filename))
+    return imported, tracks
+
+def _mapping_track(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get("track")
+    except Exception:
+        return None
+
+def _mapping_dest(filename, track):
+    """Ziel für ein importiertes Mapping oder None, wenn es schon vorhanden ist.
+    Gehört ein gleichnamiges Mapping zu einem anderen Track (z.B. "Name (2).mp3" bei
+    anderem Inhalt), wird ein freier Name gewählt: "Name (2).json", "Name (3).json", ..."""
+    base, ext = os.path.splitext(filename)
+    candidate, counter = filename, 2
+    while True:
+        dest = os.path.join(MAPPING_DIR, candidate)
+        if not os.path.exists(dest):
+            return dest
+        if _mapping_track(dest) == track:
+            return None
+        candidate = f"{base} ({counter}){ext}"
+        counter += 1
+
+def _write_mappings(mappings, renamed, overwrite=False):
+    imported = 0
+    for filename, data in mappings.items():
+        if data.get("track") in renamed:
+            data["track"] = renamed[data["track"]]
+        if overwrite:
+            dest = os.path.join(MAPPING_DIR, filename)
+        else:
+            dest = _mapping_dest(filename, data.get("track"))
+        if dest:
+            with open(dest, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=4)
+            imported += 1
+    return imported
+
+def import_legacy_dir(import_dir, export_data, progress=None):
+    """Importiert ein altes Export-Verzeichnis (Version 1.0); Namen werden wie beim Bundle geprüft"""
+    progress = progress or TransferProgress()
+    mappings = export_data.get("mappings", {})
+    _check_mappings(mappings)
+    tracks = [_checked_name(track, "Track") for track in export_data.get("tracks", [])]
+    store = get_track_store()
+    renamed = {}
+    jobs = []
+    staged_tracks = []
     tracks_dir = os.path.join(import_dir, "tracks")
-    if os.path.exists(tracks_dir):
-        for track in export_data.get("tracks", []):
-            src = os.path.join(tracks_dir, track)
-            if os.path.exists(src):
-                dest = os.path.join(ASSET_DIR, track)
-                if not os.path.exists(dest):
-                    shutil.copy2(src, dest)
-    
-    # Kopiere Icons
+    for track in tracks:
+        src = os.path.join(tracks_dir, track)
+        if not os.path.exists(src):
+            continue
+        # Erst hashen: vorhandener Inhalt wird nicht noch einmal kopiert
+        digest = digest_file(src)
+        stored = store.find(digest)
+        if stored is None:
+            staging = os.path.join(ASSET_DIR, track + STAGING_SUFFIX)
+            jobs.append((src, staging))
+            staged_tracks.append((track, staging, digest))
+        elif stored != track:
+            renamed[track] = stored
+
+    staged_icons = []
     icons_dir = os.path.join(import_dir, "icons")
     if os.path.exists(icons_dir):
         for icon in os.listdir(icons_dir):
-            src = os.path.join(icons_dir, icon)
             dest = os.path.join(ICON_DIR, icon)
             if not os.path.exists(dest):
-                shutil.copy2(src, dest)
-    
-    # Importiere Mappings
-    imported = 0
-    for filename, data in export_data.get("mappings", {}).items():
-        dest = os.path.join(MAPPING_DIR, filename)
-        if not os.path.exists(dest):
-            with open(dest, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4)
-            imported += 1
-    
+                jobs.append((os.path.join(icons_dir, icon), dest + STAGING_SUFFIX))
+                staged_icons.append((dest + STAGING_SUFFIX, dest))
+
+    progress.set_totals(sum(os.path.getsize(src) for src, _ in jobs), len(jobs))
+    _stage(progress, jobs, lambda src, staging: copy_file(src, staging, progress))
+
+    tracks = _commit(staged_tracks, staged_icons, renamed)
+    return _write_mappings(mappings, renamed), tracks
+
+class TransferWorker(QThread):
+    """Führt einen Export oder Import (job(progress)) außerhalb des GUI-Threads aus"""
+    progress_changed = Signal(object, object, int, int)  # Bytes fertig/gesamt, Dateien fertig/gesamt
+
+    def __init__(self, job):
+        super().__init__(None)
+        self.job = job
+        self.result = None
+        self.error = None
+        self.progress = TransferProgress(on_change=self._on_change)
+
+    def cancel(self):
+        self.progress.cancel()
+
+    def _on_change(self, progress):
+        # Läuft in den Kopier-Threads; das Signal wird im Hauptthread zugestellt
+        self.progress_changed.emit(progress.bytes_done, progress.total_bytes,
+                                   progress.files_done, progress.total_files)
+
+    def run(self):
+        try:
+            self.result = self.job(self.progress)
+        except BaseException as e:
+            self.error = e
+
+def run_transfer(parent, title, job):
+    """Zeigt einen Fortschrittsdialog, während job im Hintergrund läuft.
+    Liefert das Ergebnis von job oder wirft dessen Fehler (TransferCancelled bei Abbruch)."""
+    dialog = QProgressDialog(title, "Abbrechen", 0, 1000, parent)
+    dialog.setWindowTitle(title)
+    dialog.setWindowModality(Qt.WindowModal)
+    dialog.setMinimumDuration(0)
+    dialog.setAutoClose(False)
+    dialog.setAutoReset(False)
+
+    def on_progress(bytes_done, total_bytes, files_done, total_files):
+        dialog.setValue(int(bytes_done * 1000 / total_bytes) if total_bytes else 0)
+        dialog.setLabelText(f"{title}\n{bytes_done / MB:.1f} / {total_bytes / MB:.1f} MB – "
+                            f"{files_done} / {total_files} Dateien")
+
+    def on_cancel():
+        dialog.setLabelText("Wird abgebrochen...")
+        worker.cancel()
+
+    worker = TransferWorker(job)
+    worker.progress_changed.connect(on_progress)
+    dialog.canceled.connect(on_cancel)
+    loop = QEventLoop()
+    worker.finished.connect(loop.quit)
+    worker.start()
+    loop.exec()
+    dialog.close()
+    if worker.error is not None:
+        raise worker.error
+    return worker.result
+
+class MappingSelectDialog(QDialog):
+    """Auswahl der Mappings, die aus einem Bundle importiert werden"""
+
+    def __init__(self, mappings, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Szenen importieren")
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("Welche Mappings sollen importiert werden?"))
+        self.list = QListWidget()
+        for filename, data in sorted(mappings.items()):
+            exists = os.path.exists(os.path.join(MAPPING_DIR, filename))
+            label = f"{filename} ({len(data.get('scenes', {}))} Szenen)"
+            if exists:
+                label += " – bereits vorhanden"
+            item = QListWidgetItem(label)
+            item.setData(Qt.UserRole, filename)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Unchecked if exists else Qt.Checked)
+            self.list.addItem(item)
+        layout.addWidget(self.list)
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def selected(self):
+        return {self.list.item(i).data(Qt.UserRole) for i in range(self.list.count())
+                if self.list.item(i).checkState() == Qt.Checked}
+
+def export_scenes(parent, incremental=False):
+    """Exportiert alle Szenen, Tracks und Icons in eine einzelne Bundle-Datei.
+    Inkrementell wird nur geschrieben, was sich seit einem früheren Bundle geändert hat."""
+    base_manifest = None
+    if incremental:
+        base_path, _ = QFileDialog.getOpenFileName(parent, "Vorheriges Bundle wählen", "", BUNDLE_FILTER)
+        if not base_path:
+            return
+        try:
+            with BundleReader(base_path) as reader:
+                base_manifest = reader.manifest
+        except BundleError as e:
+            QMessageBox.critical(parent, "Fehler", f"Ungültiges Bundle:\n{str(e)}")
+            return
+
+    default_name = "soundboard-delta" if incremental else "soundboard"
+    path, _ = QFileDialog.getSaveFileName(parent, "Bundle speichern", default_name + BUNDLE_EXTENSION,
+                                          BUNDLE_FILTER)
+    if not path:
+        return
+    if not path.endswith(BUNDLE_EXTENSION):
+        path += BUNDLE_EXTENSION
+
+    export_data, icons = collect_export()
+    try:
+        manifest = run_transfer(parent, "Exportiere Szenen...",
+                                lambda progress: write_bundle(path, export_data, icons, base_manifest, progress))
+    except TransferCancelled:
+        QMessageBox.information(parent, "Export abgebrochen", "Der Export wurde abgebrochen.")
+        return
+    except Exception as e:
+        QMessageBox.critical(parent, "Fehler", f"Fehler beim Export:\n{str(e)}")
+        return
+
+    entries = manifest["entries"]
+    size_mb = sum(entry["size"] for entry in entries.values()) / MB
+    QMessageBox.information(parent, "Export erfolgreich",
+        f"{'Inkrementeller ' if incremental else ''}Export abgeschlossen!\n\n"
+        f"Datei: {path}\n"
+        f"Tracks: {sum(1 for name in entries if name.startswith('tracks/'))}\n"
+        f"Icons: {sum(1 for name in entries if name.startswith('icons/'))}\n"
+        f"Mappings: {len(export_data['mappings']) if not incremental else '-'}\n"
+        f"Größe: {size_mb:.1f} MB")
+
+def import_scenes(parent):
+    """Importiert Szenen aus einem Bundle oder einem alten Export-Verzeichnis"""
+    path, _ = QFileDialog.getOpenFileName(parent, "Import wählen", "", f"{BUNDLE_FILTER};;{LEGACY_FILTER}")
+    if not path:
+        return
+
+    try:
+        if os.path.basename(path) == EXPORT_JSON:
+            with open(path, 'r', encoding='utf-8') as f:
+                export_data = json.load(f)
+            if export_data.get("version") != "1.0":
+                QMessageBox.critical(parent, "Fehler", "Nicht unterstützte Export-Version!")
+                return
+            import_dir = os.path.dirname(path)
+            imported, tracks = run_transfer(parent, "Importiere Szenen...",
+                                            lambda progress: import_legacy_dir(import_dir, export_data, progress))
+        else:
+            with BundleReader(path) as reader:
+                export_data = reader.read_export()
+            if export_data.get("delta"):
+                answer = QMessageBox.question(parent, "Delta-Bundle",
+                    f"Dieses Bundle enthält nur Änderungen und wird auf die bestehenden Szenen angewendet.\n\n"
+                    f"Geänderte Mappings: {len(export_data.get('mappings', {}))}\n"
+                    f"Entfernte Mappings: {len(export_data.get('removed', []))}\n\n"
+                    f"Fortfahren?")
+                if answer != QMessageBox.Yes:
+                    return
+                selected = None
+            else:
+                dlg = MappingSelectDialog(export_data.get("mappings", {}), parent)
+                if not dlg.exec():
+                    return
+                selected = dlg.selected()
+            imported, tracks = run_transfer(parent, "Importiere Szenen...",
+                                            lambda progress: import_bundle(path, selected, progress))
+    except TransferCancelled:
+        QMessageBox.information(parent, "Import abgebrochen",
+            "Der Import wurde abgebrochen. Es wurden keine Dateien übernommen.")
+        return
+    except BundleError as e:
+        QMessageBox.critical(parent, "Fehler", f"Ungültiges Bundle:\n{str(e)}")
+        return
+    except Exception as e:
+        QMessageBox.critical(parent, "Fehler", f"Fehler beim Import:\n{str(e)}")
+        return
+
     QMessageBox.information(parent, "Import erfolgreich",
         f"Import abgeschlossen!\n\n"
-        f"Neue Mappings: {imported}\n"
-        f"Tracks und Icons wurden nur kopiert, wenn sie noch nicht existierten.") 
\ No newline at end of file
+        f"Neue oder geänderte Mappings: {imported}\n"
+        f"Neue Tracks: {tracks}\n"
+        f"Tracks wurden nur übernommen, wenn ihr Inhalt noch nicht vorhanden war,\n"
+        f"Icons nur, wenn sie noch nicht existierten.")
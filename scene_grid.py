@@ -0,0 +1,198 @@
+# Datei: scene_grid.py
+import os
+from PySide6.QtWidgets import QListView, QStyledItemDelegate, QStyle, QAbstractItemView
+from PySide6.QtGui import QColor, QPen, QPainter
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, QRect, Signal
+from config import ICON_DIR
+from thumbnail_cache import thumbnails
+
+# Eigene Rollen des Szenen-Modells
+SceneIdRole = Qt.UserRole + 1
+DurationRole = Qt.UserRole + 2
+HotkeyRole = Qt.UserRole + 3
+StateRole = Qt.UserRole + 4
+IconRole = Qt.UserRole + 5
+
+STATE_IDLE = "idle"
+STATE_ACTIVE = "active"
+STATE_PAUSED = "paused"
+
+TILE_SIZE = QSize(180, 150)
+ICON_SIZE = 72
+
+class SceneListModel(QAbstractListModel):
+    """Listenmodell über dem Szenen-Katalog.
+    Icons werden erst geholt, wenn eine Kachel gezeichnet wird (über den Thumbnail-Cache)."""
+
+    def __init__(self, catalog, hotkey_for, parent=None):
+        super().__init__(parent)
+        self.catalog = catalog
+        self.hotkey_for = hotkey_for  # (mapping_file, scene_name) -> Tastenkürzel oder ""
+        self._ids = []    # Zeile -> scene_id
+        self._rows = {}   # scene_id -> Zeile
+        self._active_id = None
+        self._paused = False
+        self.sync()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._ids)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        scene_id = self._ids[index.row()]
+        entry = self.catalog.get_by_id(scene_id)
+        if entry is None:
+            return None
+        if role == Qt.DisplayRole:
+            return entry.name
+        if role == SceneIdRole:
+            return scene_id
+        if role == DurationRole:
+            return entry.scene.get("duration", 0)
+        if role == HotkeyRole:
+            return self.hotkey_for(entry.mapping_file, entry.name)
+        if role == StateRole:
+            if scene_id != self._active_id:
+                return STATE_IDLE
+            return STATE_PAUSED if self._paused else STATE_ACTIVE
+        if role == IconRole:
+            return self._icon(entry)
+        if role == Qt.ToolTipRole:
+            return f"{entry.name} ({entry.track})"
+        return None
+
+    def scene_id_at(self, index):
+        return self._ids[index.row()] if index.isValid() else None
+
+    def sync(self):
+        """Gleicht die Zeilen mit dem Katalog ab (z.B. beim Start)"""
+        current = {entry.scene_id for entry in self.catalog.scenes()}
+        known = set(self._rows)
+        self.apply_catalog_diff(current - known, known - current, set())
+
+    def apply_catalog_diff(self, added, removed, modified):
+        """Fügt nur neue Zeilen ein, entfernt nur gelöschte und meldet geänderte"""
+        for row in sorted((self._rows[sid] for sid in removed if sid in self._rows), reverse=True):
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._ids[row]
+            self.endRemoveRows()
+        if removed:
+            self._reindex()
+
+        if added:
+            # In Katalog-Reihenfolge einfügen; alles davor steht dann bereits an Ort und Stelle
+            order = [entry.scene_id for entry in self.catalog.scenes()]
+            for position, scene_id in enumerate(order):
+                if scene_id in added and scene_id not in self._rows:
+                    self.beginInsertRows(QModelIndex(), position, position)
+                    self._ids.insert(position, scene_id)
+                    self.endInsertRows()
+            self._reindex()
+
+        for scene_id in modified:
+            self.refresh(scene_id)
+
+    def refresh(self, scene_id):
+        """Meldet genau eine Zeile als geändert"""
+        row = self._rows.get(scene_id)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+
+    def set_active(self, scene_id, paused=False):
+        """Setzt die aktive Szene – nur alte und neue Zeile werden neu gezeichnet"""
+        previous = self._active_id
+        self._active_id = scene_id
+        self._paused = paused
+        for sid in {previous, scene_id}:
+            if sid:
+                self.refresh(sid)
+
+    def _reindex(self):
+        self._rows = {sid: row for row, sid in enumerate(self._ids)}
+
+    def _icon(self, entry):
+        icon_name = entry.scene.get("icon")
+        if not icon_name:
+            return None
+        icon_path = os.path.join(ICON_DIR, icon_name)
+        if not os.path.exists(icon_path):
+            return None
+        pixmap = thumbnails.get_pixmap(icon_path, ICON_SIZE)
+        return None if pixmap.isNull() else pixmap
+
+class SceneTileDelegate(QStyledItemDelegate):
+    """Zeichnet eine Szene als Kachel im Stil der bisherigen Szenen-Buttons"""
+
+    BORDER = {STATE_IDLE: "#444", STATE_ACTIVE: "#FFD700", STATE_PAUSED: "#FF8C00"}
+
+    def sizeHint(self, option, index):
+        return TILE_SIZE
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        state = index.data(StateRole)
+        hovered = bool(option.state & QStyle.State_MouseOver)
+        rect = option.rect.adjusted(4, 4, -4, -4)
+
+        # Hintergrund und Rahmen
+        if hovered:
+            background = "#606060"
+        else:
+            background = "#3c3c3c" if state == STATE_IDLE else "#4b4b4b"
+        border = self.BORDER[state]
+        if hovered and state == STATE_IDLE:
+            border = "#777"
+        painter.setPen(QPen(QColor(border), 2))
+        painter.setBrush(QColor(background))
+        painter.drawRoundedRect(rect, 10, 10)
+
+        # Icon
+        top = rect.top() + 10
+        pixmap = index.data(IconRole)
+        if pixmap is not None:
+            x = rect.left() + (rect.width() - pixmap.width()) // 2
+            painter.drawPixmap(x, top, pixmap)
+        top += ICON_SIZE + 4
+
+        # Name, Dauer und Hotkey
+        lines = [index.data(Qt.DisplayRole), f"({index.data(DurationRole)}s)"]
+        hotkey = index.data(HotkeyRole)
+        if hotkey:
+            lines.append(f"[{hotkey}]")
+        painter.setPen(QColor("white"))
+        text_rect = QRect(rect.left() + 4, top, rect.width() - 8, rect.bottom() - top - 4)
+        painter.drawText(text_rect, Qt.AlignHCenter | Qt.AlignTop | Qt.TextWordWrap, "\n".join(lines))
+        painter.restore()
+
+class SceneGridView(QListView):
+    """Virtualisiertes Szenen-Grid: nur sichtbare Kacheln werden gezeichnet"""
+
+    scene_clicked = Signal(str)               # scene_id
+    scene_context_requested = Signal(str, object)  # scene_id, globale Position
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setViewMode(QListView.IconMode)
+        self.setResizeMode(QListView.Adjust)
+        self.setMovement(QListView.Static)
+        self.setUniformItemSizes(True)
+        self.setSpacing(8)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setMouseTracking(True)
+        self.setItemDelegate(SceneTileDelegate(self))
+        self.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.clicked.connect(self._on_clicked)
+        self.customContextMenuRequested.connect(self._on_context_menu)
+
+    def _on_clicked(self, index):
+        scene_id = self.model().scene_id_at(index)
+        if scene_id:
+            self.scene_clicked.emit(scene_id)
+
+    def _on_context_menu(self, pos):
+        scene_id = self.model().scene_id_at(self.indexAt(pos))
+        if scene_id:
+            self.scene_context_requested.emit(scene_id, self.viewport().mapToGlobal(pos))
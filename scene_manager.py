@@ -1,35 +1,77 @@
 # scene_manager.py
 
 import os
-from PySide6.QtWidgets import QMessageBox, QInputDialog
-from mapper import load_mapping, save_mapping
-from mapping_ui import MappingDialog
-from config import MAPPING_DIR
+from PySide6.QtWidgets import QMessageBox, QInputDialog, QApplication
+from PySide6.QtCore import Qt
+from config import ASSET_DIR
+from mapping_ui import MappingDialog, format_seconds
+from scene_catalog import get_catalog
+from audio_mixer import LAYER_AMBIENCE, LAYER_SFX
+from loop_finder import find_loop_points
+from audio_analysis import get_analysis_service
+
+def _scene_choices():
+    """Auswahlliste 'Szene (aus Track)' -> (mapping_file, scene_name) aus dem Katalog"""
+    return {
+        f"{entry.name} (aus {entry.track})": (entry.mapping_file, entry.name)
+        for entry in get_catalog().scenes()
+    }
+
+def _suggest_loop_points(parent, data, start, duration, options):
+    """Bietet für Schleifen-Szenen einen sauberen Schnittpunkt nahe der gewählten Grenzen an.
+    Liefert (start, duration) – ggf. die übernommenen Vorschlagswerte."""
+    if options.get("layer") == LAYER_SFX or not data.get("track"):
+        return start, duration
+    QApplication.setOverrideCursor(Qt.WaitCursor)
+    try:
+        suggestion = find_loop_points(os.path.join(ASSET_DIR, data["track"]), start, duration)
+    except Exception as e:
+        print(f"[WARN] Schleifenpunkt-Suche fehlgeschlagen: {e}")
+        suggestion = None
+    finally:
+        QApplication.restoreOverrideCursor()
+    if suggestion is None:
+        return start, duration
+
+    answer = QMessageBox.question(parent, "Nahtlose Schleife",
+        f"In der Nähe der gewählten Grenzen gibt es einen saubereren Schnittpunkt:\n\n"
+        f"Start: {format_seconds(start)} → {format_seconds(suggestion.start)}\n"
+        f"Dauer: {format_seconds(duration)} → {format_seconds(suggestion.duration)}\n"
+        f"Übereinstimmung: {suggestion.score * 100:.0f} %\n\n"
+        f"Vorschlag übernehmen?")
+    if answer == QMessageBox.Yes:
+        return suggestion.start, suggestion.duration
+    return start, duration
+
+def _measure_loudness(data, start, duration, options):
+    """Übernimmt die Lautheit des Abschnitts aus der Track-Analyse in die Szenen-Felder"""
+    loudness = get_analysis_service().scene_loudness(data.get("track", ""), start, duration)
+    if loudness is not None:
+        options["loudness"] = loudness
 
 def create_scene(parent):
     dlg = MappingDialog()
     if dlg.exec():
         mapping_file, name, start, duration, icon = dlg.get_data()
-        data = load_mapping(mapping_file)
+        options = dlg.get_options()
+        catalog = get_catalog()
+        data = catalog.get_mapping(mapping_file)
+        start, duration = _suggest_loop_points(parent, data, start, duration, options)
+        _measure_loudness(data, start, duration, options)
         data["scenes"][name] = {
             "start": start,
             "duration": duration,
-            "icon": icon
+            "icon": icon,
+            **options
         }
-        save_mapping(mapping_file, data)
+        catalog.save(mapping_file, data)
         QMessageBox.information(parent, "Szene erstellt", f"Szene '{name}' wurde hinzugefügt.")
     if hasattr(parent, "load_all_scenes"):
         parent.load_all_scenes()
 
 
 def edit_scene(parent):
-    scene_map = {}
-    for filename in os.listdir(MAPPING_DIR):
-        if filename.endswith(".json"):
-            data = load_mapping(filename)
-            for scene_name in data.get("scenes", {}):
-                key = f"{scene_name} (aus {data.get('track', filename.replace('.json',''))})"
-                scene_map[key] = (filename, scene_name)
+    scene_map = _scene_choices()
 
     if not scene_map:
         QMessageBox.warning(parent, "Fehler", "Keine Szenen gefunden.")
@@ -40,28 +82,35 @@ def edit_scene(parent):
         return
 
     mapping_file, scene_name = scene_map[scene_label]
-    data = load_mapping(mapping_file)
+    catalog = get_catalog()
+    data = catalog.get_mapping(mapping_file)
     scene_data = data["scenes"][scene_name]
 
     dlg = MappingDialog(
         default_name=scene_name,
         default_start=scene_data.get("start", 0.0),
         default_duration=scene_data.get("duration", 60.0),
-        default_icon=scene_data.get("icon", "")
+        default_icon=scene_data.get("icon", ""),
+        default_layer=scene_data.get("layer", LAYER_AMBIENCE),
+        default_crossfade=scene_data.get("crossfade")
     )
     dlg.track_combo.setCurrentText(mapping_file.replace(".json", ""))
     dlg.track_combo.setEnabled(False)
 
     if dlg.exec():
         _, new_name, start, duration, icon = dlg.get_data()
+        options = dlg.get_options()
+        start, duration = _suggest_loop_points(parent, data, start, duration, options)
+        _measure_loudness(data, start, duration, options)
         if new_name != scene_name:
             del data["scenes"][scene_name]
         data["scenes"][new_name] = {
             "start": start,
             "duration": duration,
-            "icon": icon or scene_data.get("icon")
+            "icon": icon or scene_data.get("icon"),
+            **options
         }
-        save_mapping(mapping_file, data)
+        catalog.save(mapping_file, data)
         QMessageBox.information(parent, "Szene bearbeitet", f"Szene '{new_name}' wurde aktualisiert.")
     main_window = parent
     while main_window.parent():
@@ -72,13 +121,7 @@ def edit_scene(parent):
 
 
 def delete_scene(parent):
-    scene_map = {}
-    for filename in os.listdir(MAPPING_DIR):
-        if filename.endswith(".json"):
-            data = load_mapping(filename)
-            for scene_name in data.get("scenes", {}):
-                key = f"{scene_name} (aus {data.get('track', filename.replace('.json',''))})"
-                scene_map[key] = (filename, scene_name)
+    scene_map = _scene_choices()
 
     if not scene_map:
         QMessageBox.information(parent, "Keine Szenen", "Keine Szenen gefunden.")
@@ -89,43 +132,52 @@ def delete_scene(parent):
         return
 
     mapping_file, scene_name = scene_map[scene_label]
-    data = load_mapping(mapping_file)
+    catalog = get_catalog()
+    data = catalog.get_mapping(mapping_file)
     if scene_name in data.get("scenes", {}):
         del data["scenes"][scene_name]
-        save_mapping(mapping_file, data)
+        catalog.save(mapping_file, data)
         QMessageBox.information(parent, "Szene gelöscht", f"Szene '{scene_name}' wurde gelöscht.")
     if hasattr(parent, "load_all_scenes"):
         parent.load_all_scenes()
 
 def edit_specific_scene(parent, mapping_file, scene_name):
-    data = load_mapping(mapping_file)
+    catalog = get_catalog()
+    data = catalog.get_mapping(mapping_file)
     old = data["scenes"][scene_name]
     dlg = MappingDialog(
         default_name=scene_name,
         default_start=old.get("start", 0.0),
         default_duration=old.get("duration", 60.0),
-        default_icon=old.get("icon", "")
+        default_icon=old.get("icon", ""),
+        default_layer=old.get("layer", LAYER_AMBIENCE),
+        default_crossfade=old.get("crossfade")
     )
     dlg.track_combo.setCurrentText(mapping_file.replace(".json", ""))
     dlg.track_combo.setEnabled(False)
 
     if dlg.exec():
         _, new_name, start, duration, icon = dlg.get_data()
+        options = dlg.get_options()
+        start, duration = _suggest_loop_points(parent, data, start, duration, options)
+        _measure_loudness(data, start, duration, options)
         if new_name != scene_name:
             del data["scenes"][scene_name]
         data["scenes"][new_name] = {
             "start": start,
             "duration": duration,
-            "icon": icon or old.get("icon")
+            "icon": icon or old.get("icon"),
+            **options
         }
-        save_mapping(mapping_file, data)
+        catalog.save(mapping_file, data)
         QMessageBox.information(parent, "Szene bearbeitet", f"Szene '{new_name}' wurde aktualisiert.")
 
 
 def delete_specific_scene(parent, mapping_file, scene_name):
-    data = load_mapping(mapping_file)
+    catalog = get_catalog()
+    data = catalog.get_mapping(mapping_file)
     if scene_name in data.get("scenes", {}):
         del data["scenes"][scene_name]
-        save_mapping(mapping_file, data)
+        catalog.save(mapping_file, data)
         QMessageBox.information(parent, "Szene gelöscht", f"Szene '{scene_name}' wurde gelöscht.")
 
@@ -0,0 +1,91 @@
+# Datei: segment_cache.py
+import os
+import threading
+from collections import OrderedDict
+from settings import get_setting
+
+class SegmentCache:
+    """Prozessweiter LRU-Cache für dekodierte Szenen-Abschnitte mit Speicherbudget"""
+
+    def __init__(self, budget_mb):
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(file_path, start_sec, duration_sec):
+        """Schlüssel aus (Pfad, mtime, Start, Dauer) – eine geänderte Datei ergibt einen neuen Schlüssel"""
+        path = os.path.abspath(file_path)
+        return (path, os.path.getmtime(path), float(start_sec), float(duration_sec))
+
+    def get(self, key):
+        """Liefert den Eintrag oder None und zählt Treffer/Fehlschläge"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def put(self, key, value, size):
+        """Legt einen Eintrag ab und verdrängt die am längsten ungenutzten Einträge"""
+        with self._lock:
+            if size > self.budget_bytes:
+                return  # Passt nie ins Budget, nicht cachen
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.used_bytes -= old[1]
+            self._entries[key] = (value, size)
+            self.used_bytes += size
+            self._evict()
+
+    def get_or_load(self, key, loader):
+        """Liefert den Eintrag; bei Fehlschlag liefert loader() ein (value, size)-Paar"""
+        value = self.get(key)
+        if value is not None:
+            return value
+        value, size = loader()
+        self.put(key, value, size)
+        return value
+
+    def set_budget(self, budget_mb):
+        """Ändert das Speicherbudget und verdrängt ggf. sofort"""
+        with self._lock:
+            self.budget_bytes = int(budget_mb * 1024 * 1024)
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.used_bytes = 0
+
+    def stats(self):
+        """Zähler und Belegung für Anzeige/Diagnose"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'used_mb': self.used_bytes / (1024 * 1024),
+                'budget_mb': self.budget_bytes / (1024 * 1024),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    def _evict(self):
+        # Aufrufer hält self._lock
+        while self.used_bytes > self.budget_bytes and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.used_bytes -= size
+            self.evictions += 1
+
+segment_cache = SegmentCache(get_setting("segment_cache_mb"))
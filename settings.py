@@ -0,0 +1,55 @@
+# settings.py
+import json
+import os
+from config import MAPPING_DIR
+
+SETTINGS_FILE = os.path.join(MAPPING_DIR, "settings.json")
+
+# Standardwerte für alle App-Einstellungen
+DEFAULTS = {
+    "segment_cache_mb": 512,  # Speicherbudget für dekodierte Szenen-Abschnitte
+    "prefetch_workers": 2,    # Threads für die Vorab-Dekodierung gebundener Szenen
+    "sfx_voices": 8,          # Gleichzeitige One-Shot-Effekte
+    "layer_volumes": {"ambience": 1.0, "music": 1.0, "sfx": 1.0},
+    "crossfade_sec": 0.0,     # Standard-Überblendung, wenn die Szene keine eigene hat
+    "import_download_workers": 3,   # Parallele YouTube-Downloads beim Bulk-Import
+    "import_transcode_workers": 0,  # Parallele FFmpeg-Konvertierungen (0 = Anzahl CPU-Kerne)
+    "transfer_workers": 4,    # Parallele Kopiervorgänge bei Export/Import
+    "analysis_workers": 0,    # Prozesse für die Track-Analyse (0 = Anzahl CPU-Kerne)
+    "analysis_cache_entries": 16,  # Im Speicher gehaltene Track-Analysen
+    "normalize_loudness": True,    # Szenen auf die Ziel-Lautheit angleichen
+    "target_loudness": -20.0,      # LUFS; lautere Szenen werden abgesenkt, leisere höchstens auf 0 dB
+}
+
+_settings = None
+
+def load_settings():
+    """Lädt die Einstellungen aus der JSON-Datei"""
+    global _settings
+    _settings = dict(DEFAULTS)
+    if os.path.exists(SETTINGS_FILE):
+        try:
+            with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
+                _settings.update(json.load(f))
+        except Exception as e:
+            print(f"[WARN] Einstellungen konnten nicht geladen werden: {e}")
+    return _settings
+
+def save_settings():
+    """Speichert die Einstellungen in der JSON-Datei"""
+    os.makedirs(MAPPING_DIR, exist_ok=True)
+    with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(_settings or DEFAULTS, f, indent=4)
+
+def get_setting(key):
+    """Liefert eine Einstellung (oder ihren Standardwert)"""
+    if _settings is None:
+        load_settings()
+    return _settings.get(key, DEFAULTS.get(key))
+
+def set_setting(key, value):
+    """Setzt eine Einstellung und speichert sie sofort"""
+    if _settings is None:
+        load_settings()
+    _settings[key] = value
+    save_settings()
@@ -0,0 +1,122 @@
+# Datei: streamdeck_layout.py
+import json
+import os
+import re
+from config import MAPPING_DIR
+
+LAYOUT_FILE = os.path.join(MAPPING_DIR, "streamdeck_layout.json")
+LAYOUT_VERSION = 2
+ROOT_FOLDER = "root"
+NAV_KEYS = 2  # Die letzten Tasten jeder Seite: Zurück/vorige Seite, nächste Seite
+
+class StreamDeckLayout:
+    """Ordner mit geordneten Einträgen; die Seiten ergeben sich erst aus der Tastenanzahl.
+    Eintrag: {"scene_id", "name", "icon"} (Szene), {"folder", "name", "icon"} (Unterordner)
+    oder None (leere Taste)."""
+
+    def __init__(self, folders=None):
+        self.folders = folders or {ROOT_FOLDER: {"name": "Start", "parent": None, "items": []}}
+
+    @classmethod
+    def load(cls, path=LAYOUT_FILE):
+        """Lädt das Layout; das alte flache Format {Taste: Szene} wird in den Hauptordner übernommen"""
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"[WARN] StreamDeck-Layout konnte nicht geladen werden: {e}")
+            return cls()
+        if data.get("version") == LAYOUT_VERSION:
+            return cls(data.get("folders"))
+        return cls.migrate(data)
+
+    @classmethod
+    def migrate(cls, flat):
+        """Altes Format: Taste n wird Eintrag n im Hauptordner"""
+        layout = cls()
+        for key, mapping in flat.items():
+            if str(key).isdigit() and mapping.get('scene_id'):
+                layout.set_item(ROOT_FOLDER, int(key), mapping)
+        return layout
+
+    @classmethod
+    def from_catalog(cls, entries):
+        """Automatisches Layout: ein Ordner pro Mapping-Datei mit allen Szenen, nach Namen sortiert"""
+        layout = cls()
+        groups = {}
+        for entry in entries:
+            groups.setdefault(entry.mapping_file, []).append(entry)
+        for mapping_file in sorted(groups, key=str.lower):
+            scenes = sorted(groups[mapping_file], key=lambda e: e.name.lower())
+            folder_id = layout.add_folder(os.path.splitext(mapping_file)[0], ROOT_FOLDER)
+            for entry in scenes:
+                layout.folders[folder_id]["items"].append({
+                    'scene_id': entry.scene_id,
+                    'name': entry.name,
+                    'icon': entry.scene.get('icon')
+                })
+        return layout
+
+    def save(self, path=LAYOUT_FILE):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"version": LAYOUT_VERSION, "folders": self.folders}, f, indent=4)
+
+    def add_folder(self, name, parent=ROOT_FOLDER):
+        """Legt einen Unterordner an und verlinkt ihn im Elternordner"""
+        base = re.sub(r"\W+", "_", name.lower()).strip("_") or "ordner"
+        folder_id, n = base, 2
+        while folder_id in self.folders:
+            folder_id, n = f"{base}_{n}", n + 1
+        self.folders[folder_id] = {"name": name, "parent": parent, "items": []}
+        self.folders[parent]["items"].append({'folder': folder_id, 'name': name, 'icon': None})
+        return folder_id
+
+    def parent(self, folder_id):
+        return self.folders.get(folder_id, {}).get("parent")
+
+    @staticmethod
+    def slots_per_page(key_count):
+        return max(1, key_count - NAV_KEYS)
+
+    def page_count(self, folder_id, key_count):
+        items = self.folders.get(folder_id, {}).get("items", [])
+        slots = self.slots_per_page(key_count)
+        return max(1, (len(items) + slots - 1) // slots)
+
+    def page_items(self, folder_id, page, key_count):
+        """Einträge einer Seite, immer genau slots_per_page lang"""
+        slots = self.slots_per_page(key_count)
+        items = self.folders.get(folder_id, {}).get("items", [])[page * slots:(page + 1) * slots]
+        return items + [None] * (slots - len(items))
+
+    def set_item(self, folder_id, index, item):
+        items = self.folders[folder_id]["items"]
+        if index >= len(items):
+            items.extend([None] * (index + 1 - len(items)))
+        items[index] = item
+
+    def remove_item(self, folder_id, index):
+        items = self.folders[folder_id]["items"]
+        if index < len(items):
+            items[index] = None
+            # Leere Einträge am Ende kosten sonst Seiten
+            while items and items[-1] is None:
+                items.pop()
+
+    def find_scene(self, scene_id):
+        """Alle (folder_id, index), auf denen die Szene liegt"""
+        return [
+            (folder_id, index)
+            for folder_id, folder in self.folders.items()
+            for index, item in enumerate(folder["items"])
+            if item and item.get('scene_id') == scene_id
+        ]
+
+    def scene_items(self):
+        """Alle Szenen-Einträge über alle Ordner"""
+        return [
+            item for folder in self.folders.values()
+            for item in folder["items"] if item and item.get('scene_id')
+        ]
@@ -1,19 +1,39 @@
 from PySide6.QtCore import QObject, Signal
 import json
 import os
-from PIL import Image
-import io
+import time
 from config import MAPPING_DIR, ICON_DIR
+from mapper import split_scene_id
+from streamdeck_renderer import (
+    KeyRenderer, KeyFace, STATE_IDLE, STATE_ACTIVE, STATE_PAUSED, quantize_progress,
+    KIND_FOLDER, KIND_PREV, KIND_NEXT
+)
+from streamdeck_layout import StreamDeckLayout, ROOT_FOLDER, NAV_KEYS
 from StreamDeck.DeviceManager import DeviceManager
 
+PROGRESS_INTERVAL_SEC = 0.5  # Fortschrittsring höchstens so oft senden
+
 class StreamDeckManager(QObject):
     button_pressed = Signal(str)  # Signal wenn ein StreamDeck-Button gedrückt wird
+    bindings_changed = Signal()  # Button-Mappings wurden geladen oder geändert
+    page_changed = Signal(str, int)  # Ordner, Seite
+    _key_pressed = Signal(int)  # Vom Lese-Thread des Geräts in den GUI-Thread
     
     def __init__(self):
         super().__init__()
         self.device = None
+        self.renderer = None  # Rendert und sendet Tastenbilder im Hintergrund
+        self.dispatcher = None  # InputDispatcher: Szenen starten ohne Umweg über den GUI-Thread
         self.config = self.load_config()
-        self.button_mappings = {}  # Speichert die Button-Mappings
+        self.layout = StreamDeckLayout()  # Ordner und Seiten mit den Button-Mappings
+        self.folder = ROOT_FOLDER  # Angezeigter Ordner
+        self.page = 0  # Angezeigte Seite im Ordner
+        self._key_pressed.connect(self._handle_key)
+        # Wiedergabezustand für die Tastenbilder
+        self.active_scene_id = None
+        self.paused = False
+        self.progress = None  # Fortschrittsstufe der aktiven Szene
+        self._progress_sent_at = 0.0
         
     def load_config(self):
         """Lädt die StreamDeck-Konfiguration"""
@@ -55,6 +75,12 @@ class StreamDeckManager(QObject):
             # Gerät initialisieren
             self.device.open()
             self.device.reset()
+            if self.device.is_visual():
+                self.renderer = KeyRenderer(
+                    self.device,
+                    show_icons=self.config.get('show_icons', True),
+                    show_names=self.config.get('show_names', True)
+                )
             
             # Button-Callback registrieren
             self.device.set_key_callback(self._on_button_pressed)
@@ -69,6 +95,9 @@ class StreamDeckManager(QObject):
             
     def disconnect_device(self):
         """Trennt die Verbindung zum StreamDeck"""
+        if self.renderer:
+            self.renderer.stop()
+            self.renderer = None
         if self.device:
             try:
                 self.device.reset()
@@ -78,91 +107,200 @@ class StreamDeckManager(QObject):
                 pass
                 
     def load_layout(self):
-        """Lädt das Button-Layout"""
+        """Lädt das Button-Layout (altes flaches Format wird übernommen) und zeigt den Hauptordner"""
         if not self.device:
             return
-            
-        # Layout-Datei laden
-        layout_file = os.path.join(MAPPING_DIR, "streamdeck_layout.json")
-        if os.path.exists(layout_file):
-            try:
-                with open(layout_file, 'r', encoding='utf-8') as f:
-                    self.button_mappings = json.load(f)
-            except Exception:
-                self.button_mappings = {}
-                
-        # Buttons aktualisieren
-        self.update_buttons()
+        self.layout = StreamDeckLayout.load()
+        self.show_page(ROOT_FOLDER, 0)
+        self.bindings_changed.emit()
         
     def save_layout(self):
         """Speichert das Button-Layout"""
-        layout_file = os.path.join(MAPPING_DIR, "streamdeck_layout.json")
-        with open(layout_file, 'w', encoding='utf-8') as f:
-            json.dump(self.button_mappings, f, indent=4)
-            
+        self.layout.save()
+
+    def apply_layout(self, layout):
+        """Ersetzt das Layout (z.B. automatisch aus dem Katalog erzeugt)"""
+        self.layout = layout
+        self.save_layout()
+        self.show_page(ROOT_FOLDER, 0)
+        self.bindings_changed.emit()
+
+    @property
+    def key_count(self):
+        return self.device.key_count() if self.device else 15
+
+    @property
+    def slots_per_page(self):
+        return self.layout.slots_per_page(self.key_count)
+
+    def show_page(self, folder_id, page):
+        """Zeigt eine Seite eines Ordners. Gesendet werden nur Tasten, deren Bild sich ändert;
+        danach werden die Nachbarseiten im Hintergrund vorgerendert."""
+        if folder_id not in self.layout.folders:
+            folder_id, page = ROOT_FOLDER, 0
+        self.folder = folder_id
+        self.page = min(max(0, page), self.layout.page_count(folder_id, self.key_count) - 1)
+        self.update_buttons()
+        self.page_changed.emit(self.folder, self.page)
+        if self.renderer:
+            self.renderer.prerender(self._neighbour_faces())
+
     def update_buttons(self):
-        """Aktualisiert alle StreamDeck-Buttons"""
-        if not self.device:
+        """Aktualisiert alle StreamDeck-Buttons der angezeigten Seite (nur geänderte Bilder werden gesendet)"""
+        if not self.renderer:
             return
-            
-        for key, mapping in self.button_mappings.items():
-            self._update_button(int(key), mapping)
+        self.renderer.set_keys(self._page_faces(self.folder, self.page))
+
+    def _page_faces(self, folder_id, page):
+        """{Taste: KeyFace} für eine ganze Seite, inklusive Navigationstasten"""
+        items = self.layout.page_items(folder_id, page, self.key_count)
+        faces = {key: self._key_face(item) if item else None for key, item in enumerate(items)}
+        faces.update(self._nav_faces(folder_id, page))
+        return faces
+
+    def _nav_faces(self, folder_id, page):
+        prev_key, next_key = self.key_count - NAV_KEYS, self.key_count - 1
+        pages = self.layout.page_count(folder_id, self.key_count)
+        faces = {prev_key: None, next_key: None}
+        if page > 0:
+            faces[prev_key] = KeyFace(None, f"{page}/{pages}", kind=KIND_PREV)
+        elif self.layout.parent(folder_id):
+            faces[prev_key] = KeyFace(None, "Zurück", kind=KIND_PREV)
+        if page < pages - 1:
+            faces[next_key] = KeyFace(None, f"{page + 2}/{pages}", kind=KIND_NEXT)
+        return faces
+
+    def _neighbour_faces(self):
+        """Tastenbilder, die als nächstes gebraucht werden könnten: übrige Seiten des Ordners,
+        erste Seite jedes Unterordners und die Seite des Elternordners"""
+        targets = [(self.folder, page) for page in range(self.layout.page_count(self.folder, self.key_count))
+                   if page != self.page]
+        for item in self.layout.folders[self.folder]["items"]:
+            if item and item.get('folder') in self.layout.folders:
+                targets.append((item['folder'], 0))
+        parent = self.layout.parent(self.folder)
+        if parent in self.layout.folders:
+            targets.append((parent, 0))
+        return [face for folder_id, page in targets for face in self._page_faces(folder_id, page).values()]
             
     def _update_button(self, key, mapping):
         """Aktualisiert einen einzelnen StreamDeck-Button"""
-        if not self.device:
+        if self.renderer:
+            self.renderer.set_key(key, self._key_face(mapping) if mapping else None)
+
+    def _key_face(self, mapping):
+        """Tasteninhalt zu einem Mapping, inklusive Wiedergabezustand"""
+        icon_path = os.path.join(ICON_DIR, mapping['icon']) if mapping.get('icon') else None
+        if mapping.get('folder'):
+            return KeyFace(icon_path, mapping.get('name', ''), kind=KIND_FOLDER)
+        state, progress = STATE_IDLE, None
+        if self.active_scene_id and mapping.get('scene_id') == self.active_scene_id:
+            state = STATE_PAUSED if self.paused else STATE_ACTIVE
+            progress = self.progress
+        return KeyFace(
+            icon_path or os.path.join(ICON_DIR, 'default.png'),
+            mapping.get('name', ''),
+            state,
+            progress
+        )
+
+    def _refresh_scenes(self, scene_ids):
+        """Zeichnet nur die Tasten der angezeigten Seite neu, auf denen eine der Szenen liegt"""
+        if not self.renderer:
             return
-            
-        try:
-            # Icon laden
-            icon_path = os.path.join(ICON_DIR, mapping.get('icon', 'default.png'))
-            if os.path.exists(icon_path):
-                image = Image.open(icon_path)
-            else:
-                # Fallback-Icon erstellen
-                image = Image.new('RGB', (72, 72), 'black')
-                
-            # Icon auf StreamDeck-Größe skalieren
-            image = image.resize((72, 72))
-            
-            # Text hinzufügen wenn aktiviert
-            if self.config.get('show_names', True):
-                from PIL import ImageDraw, ImageFont
-                draw = ImageDraw.Draw(image)
-                try:
-                    font = ImageFont.truetype("arial.ttf", 12)
-                except:
-                    font = ImageFont.load_default()
-                draw.text((5, 5), mapping.get('name', ''), 'white', font=font)
-                
-            # Bild auf StreamDeck setzen
-            self.device.set_key_image(key, image)
-            
-        except Exception as e:
-            print(f"Fehler beim Aktualisieren von Button {key}: {str(e)}")
+        items = self.layout.page_items(self.folder, self.page, self.key_count)
+        self.renderer.set_keys({
+            key: self._key_face(item) for key, item in enumerate(items)
+            if item and item.get('scene_id') in scene_ids
+        })
+
+    def set_active(self, scene_id, paused=False):
+        """Aktive/pausierte Szene hervorheben; gesendet werden nur die alte und die neue Taste"""
+        if scene_id == self.active_scene_id and paused == self.paused:
+            return
+        previous = self.active_scene_id
+        if scene_id != previous:
+            self.progress = None
+        self.active_scene_id = scene_id
+        self.paused = paused
+        self._refresh_scenes({previous, scene_id})
+
+    def set_progress(self, fraction):
+        """Schleifenfortschritt der aktiven Szene (0.0 - 1.0). Gesendet wird nur, wenn sich die
+        Stufe ändert, und höchstens alle PROGRESS_INTERVAL_SEC."""
+        if not self.active_scene_id:
+            return
+        step = quantize_progress(fraction)
+        now = time.monotonic()
+        if step == self.progress or now - self._progress_sent_at < PROGRESS_INTERVAL_SEC:
+            return
+        self.progress = step
+        self._progress_sent_at = now
+        self._refresh_scenes({self.active_scene_id})
             
     def _on_button_pressed(self, deck, key, state):
-        """Callback für StreamDeck-Button-Drücke"""
-        if state:  # Nur bei Button-Druck, nicht bei Loslassen
-            if str(key) in self.button_mappings:
-                scene_id = self.button_mappings[str(key)].get('scene_id')
-                if scene_id:
-                    self.button_pressed.emit(scene_id)
+        """Callback für StreamDeck-Button-Drücke (Lese-Thread des Geräts).
+        Szenen gehen direkt an den Dispatcher, Navigation in den GUI-Thread."""
+        if not state:  # Nur bei Button-Druck, nicht bei Loslassen
+            return
+        pressed_at = time.perf_counter()
+        scene_id = self._scene_at(key)
+        if scene_id and self.dispatcher:
+            self.dispatcher.push(scene_id, pressed_at)
+        else:
+            self._key_pressed.emit(key)
+
+    def _scene_at(self, key):
+        """Szenen-ID auf einer Taste der angezeigten Seite oder None"""
+        if key >= self.slots_per_page:
+            return None
+        items = self.layout.page_items(self.folder, self.page, self.key_count)
+        item = items[key] if key < len(items) else None
+        return item.get('scene_id') if item else None
+
+    def _handle_key(self, key):
+        """Szene auslösen, Ordner öffnen oder blättern"""
+        if key == self.key_count - NAV_KEYS:
+            if self.page > 0:
+                self.show_page(self.folder, self.page - 1)
+            elif self.layout.parent(self.folder):
+                self.show_page(self.layout.parent(self.folder), 0)
+            return
+        if key == self.key_count - 1:
+            self.show_page(self.folder, self.page + 1)
+            return
+        items = self.layout.page_items(self.folder, self.page, self.key_count)
+        item = items[key] if key < len(items) else None
+        if not item:
+            return
+        if item.get('folder'):
+            self.show_page(item['folder'], 0)
+        elif item.get('scene_id'):
+            self.button_pressed.emit(item['scene_id'])
                     
     def map_button(self, key, scene_id, name, icon):
-        """Mapped einen StreamDeck-Button auf eine Szene"""
-        self.button_mappings[str(key)] = {
+        """Mapped einen StreamDeck-Button der angezeigten Seite auf eine Szene"""
+        item = {
             'scene_id': scene_id,
             'name': name,
             'icon': icon
         }
-        self._update_button(key, self.button_mappings[str(key)])
+        self.layout.set_item(self.folder, self.page * self.slots_per_page + key, item)
+        self._update_button(key, item)
         self.save_layout()
+        self.bindings_changed.emit()
         
-    def unmap_button(self, key):
-        """Entfernt das Mapping eines StreamDeck-Buttons"""
-        if str(key) in self.button_mappings:
-            del self.button_mappings[str(key)]
-            if self.device:
-                self.device.set_key_image(key, None)
-            self.save_layout() 
\ No newline at end of file
+    def unmap_scene(self, scene_id):
+        """Entfernt eine Szene von allen Buttons"""
+        places = self.layout.find_scene(scene_id)
+        if not places:
+            return
+        for folder_id, index in places:
+            self.layout.remove_item(folder_id, index)
+        self.show_page(self.folder, self.page)
+        self.save_layout()
+        self.bindings_changed.emit()
+
+    def bound_scenes(self):
+        """Alle (mapping_file, scene_name)-Paare, die auf einem Button liegen"""
+        return [split_scene_id(item['scene_id']) for item in self.layout.scene_items()]
@@ -0,0 +1,218 @@
+# Datei: streamdeck_renderer.py
+import os
+import threading
+from collections import OrderedDict
+from PIL import Image, ImageDraw, ImageFont
+from StreamDeck.ImageHelpers import PILHelper
+from thumbnail_cache import thumbnails
+
+STATE_IDLE = "idle"
+STATE_ACTIVE = "active"
+STATE_PAUSED = "paused"
+
+KIND_SCENE = "scene"
+KIND_FOLDER = "folder"
+KIND_PREV = "prev"   # Vorige Seite bzw. zurück zum Elternordner
+KIND_NEXT = "next"
+
+CACHE_ENTRIES = 512  # Reicht für alle Seiten des offenen Ordners und seiner Nachbarn
+BORDER = {STATE_IDLE: None, STATE_ACTIVE: (255, 215, 0), STATE_PAUSED: (255, 140, 0)}
+BORDER_WIDTH = 4
+PROGRESS_STEPS = 16  # Fortschrittsring in so vielen Stufen; feiner lohnt das Senden nicht
+PROGRESS_WIDTH = 4
+FOLDER_BACKGROUND = (40, 60, 90)
+NAV_BACKGROUND = (30, 30, 30)
+BLANK = ("blank",)
+
+# Ab StreamDeck 0.9.5 heißt die Umwandlung to_native_key_format, davor to_native_format
+_to_native = getattr(PILHelper, "to_native_key_format", PILHelper.to_native_format)
+_fonts = {}
+
+def _font(size):
+    """Schrift einmal pro Größe laden"""
+    font = _fonts.get(size)
+    if font is None:
+        try:
+            font = ImageFont.truetype("arial.ttf", size)
+        except OSError:
+            font = ImageFont.load_default()
+        _fonts[size] = font
+    return font
+
+def quantize_progress(fraction):
+    """Fortschritt 0.0 - 1.0 als Stufe 0 - PROGRESS_STEPS"""
+    return min(PROGRESS_STEPS, max(0, int(fraction * PROGRESS_STEPS)))
+
+class KeyFace:
+    """Inhalt einer Taste: Art, Icon, Beschriftung, Wiedergabezustand und Fortschrittsstufe (oder None)"""
+
+    __slots__ = ("icon_path", "label", "state", "progress", "kind")
+
+    def __init__(self, icon_path=None, label="", state=STATE_IDLE, progress=None, kind=KIND_SCENE):
+        self.icon_path = icon_path
+        self.label = label or ""
+        self.state = state
+        self.progress = progress
+        self.kind = kind
+
+class KeyRenderer:
+    """Rendert Tastenbilder im Worker-Thread ins native Format des Geräts und sendet nur Änderungen.
+    Fertige Bilder liegen in einem LRU-Cache, Schlüssel (Art, Icon-Hash, Beschriftung, Zustand,
+    Fortschrittsstufe, Gerätetyp).
+    Pro Taste gewinnt der zuletzt gesetzte Inhalt; Zwischenstände werden nie gerendert.
+    prerender() füllt den Cache nachrangig vor, damit ein Seitenwechsel nur noch sendet.
+    deck braucht nur deck_type(), key_count(), key_image_format(), set_key_image() und
+    with-Sperre – ein Fake-Deck genügt zum Testen."""
+
+    def __init__(self, deck, show_icons=True, show_names=True, max_entries=CACHE_ENTRIES):
+        self.deck = deck
+        self.deck_type = deck.deck_type()
+        self.image_format = deck.key_image_format()
+        self.show_icons = show_icons
+        self.show_names = show_names
+        self.max_entries = max_entries
+        self.sent_count = 0
+        self._cache = OrderedDict()  # Cache-Schlüssel -> native Bilddaten
+        # Nach reset() sind alle Tasten leer
+        self._sent = {key: BLANK for key in range(deck.key_count())}  # Taste -> angezeigter Schlüssel
+        self._pending = {}  # Taste -> KeyFace oder None (leer)
+        self._prerender = []  # KeyFaces, die nur in den Cache sollen
+        self._busy = False
+        self._stopped = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="streamdeck-render", daemon=True)
+        self._thread.start()
+
+    def set_key(self, key, face):
+        """Taste neu belegen (face=None: leer); kehrt sofort zurück"""
+        with self._cond:
+            self._pending[key] = face
+            self._cond.notify()
+
+    def set_keys(self, faces):
+        """Mehrere Tasten auf einmal belegen ({Taste: KeyFace oder None})"""
+        with self._cond:
+            self._pending.update(faces)
+            self._cond.notify()
+
+    def prerender(self, faces):
+        """Rendert faces im Hintergrund in den Cache, ohne zu senden; ersetzt ältere Vorab-Aufträge.
+        Sendeaufträge haben immer Vorrang."""
+        with self._cond:
+            self._prerender = [face for face in faces if face is not None]
+            self._cond.notify()
+
+    def wait_idle(self, timeout=None):
+        """Wartet, bis alle angeforderten Tasten gesendet und vorgerendert sind"""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._pending and not self._prerender and not self._busy, timeout)
+
+    def stop(self):
+        """Worker beenden; offene Aufträge verfallen"""
+        with self._cond:
+            self._stopped = True
+            self._pending.clear()
+            self._cond.notify_all()
+        self._thread.join(timeout=2)
+
+    def cache_key(self, face):
+        if face is None:
+            return BLANK
+        icon_hash = None
+        if self.show_icons and face.icon_path and os.path.exists(face.icon_path):
+            icon_hash = thumbnails.source_hash(face.icon_path)
+        label = face.label if self.show_names else ""
+        return (face.kind, icon_hash, label, face.state, face.progress, self.deck_type)
+
+    def render(self, face, key=None):
+        """Natives Tastenbild (bytes) für face; aus dem Cache, wenn schon gerendert"""
+        key = key or self.cache_key(face)
+        native = self._cache.get(key)
+        if native is not None:
+            self._cache.move_to_end(key)
+            return key, native
+        native = _to_native(self.deck, self._draw(face, key))
+        self._cache[key] = native
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return key, native
+
+    def _draw(self, face, key):
+        width, height = self.image_format['size']
+        image = Image.new("RGB", (width, height), "black")
+        if face is None:
+            return image
+        kind, icon_hash, label, state, progress, _ = key
+        draw = ImageDraw.Draw(image)
+        if kind == KIND_FOLDER:
+            draw.rectangle((0, 0, width - 1, height - 1), fill=FOLDER_BACKGROUND)
+            if not icon_hash:
+                # Ordner-Symbol: Reiter und Mappe
+                w, h = width // 2, height // 3
+                x, y = (width - w) // 2, height // 5
+                draw.rectangle((x, y, x + w // 2, y + h // 4), fill=(230, 190, 90))
+                draw.rectangle((x, y + h // 5, x + w, y + h), fill=(230, 190, 90))
+        elif kind in (KIND_PREV, KIND_NEXT):
+            draw.rectangle((0, 0, width - 1, height - 1), fill=NAV_BACKGROUND)
+            cx, cy, r = width // 2, height * 2 // 5, min(width, height) // 5
+            points = ([(cx + r, cy - r), (cx + r, cy + r), (cx - r, cy)] if kind == KIND_PREV
+                      else [(cx - r, cy - r), (cx - r, cy + r), (cx + r, cy)])
+            draw.polygon(points, fill="white")
+        if icon_hash:
+            icon = thumbnails.get_image(face.icon_path, min(width, height))
+            image.paste(icon, ((width - icon.width) // 2, (height - icon.height) // 2), icon)
+        if label:
+            font = _font(12)
+            box = draw.textbbox((0, 0), label, font=font)
+            x = max(2, (width - (box[2] - box[0])) // 2)
+            draw.text((x, height - (box[3] - box[1]) - 6), label, fill="white", font=font,
+                      stroke_width=2, stroke_fill="black")
+        color = BORDER.get(state)
+        if color:
+            draw.rectangle((0, 0, width - 1, height - 1), outline=color, width=BORDER_WIDTH)
+        if color and progress:
+            # Ring im Uhrzeigersinn ab 12 Uhr, innerhalb des Rahmens
+            inset = BORDER_WIDTH + 1
+            draw.arc((inset, inset, width - 1 - inset, height - 1 - inset),
+                     -90, -90 + 360 * progress / PROGRESS_STEPS, fill=color, width=PROGRESS_WIDTH)
+        return image
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._prerender or self._stopped)
+                if self._stopped:
+                    return
+                jobs, self._pending = self._pending, {}
+                face = self._prerender.pop() if not jobs else None
+                self._busy = True
+            if face is not None:
+                # Nur ein Bild vorrendern, dann wieder nach Sendeaufträgen schauen
+                try:
+                    key = self.cache_key(face)
+                    if key not in self._cache:
+                        self.render(face, key)
+                except Exception as e:
+                    print(f"[WARN] StreamDeck-Tastenbild nicht vorgerendert: {e}")
+                finally:
+                    with self._cond:
+                        self._busy = False
+                        self._cond.notify_all()
+                continue
+            try:
+                for key, face in sorted(jobs.items()):
+                    try:
+                        cache_key, native = self.render(face)
+                        if self._sent.get(key) == cache_key:
+                            continue
+                        with self.deck:
+                            self.deck.set_key_image(key, native)
+                        self._sent[key] = cache_key
+                        self.sent_count += 1
+                    except Exception as e:
+                        print(f"[WARN] StreamDeck-Taste {key} nicht aktualisiert: {e}")
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
@@ -0,0 +1,30 @@
+# Gemeinsame Einrichtung der Tests: ohne Soundkarte und ohne Bildschirm lauffähig
+import os
+import sys
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+import pytest
+
+@pytest.fixture
+def mixer_init():
+    """Initialisiert pygame.mixer mit dem Dummy-Treiber"""
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
+    yield
+    pygame.mixer.stop()
+
+@pytest.fixture
+def tone(mixer_init):
+    """Eine Sekunde Stille als Sound"""
+    freq, fmt, channels = pygame.mixer.get_init()
+    return pygame.mixer.Sound(buffer=bytes(freq * channels * abs(fmt) // 8))
+
+@pytest.fixture(scope="session")
+def qapp():
+    """Eine QApplication für Signale und Widgets"""
+    from PySide6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
@@ -0,0 +1,71 @@
+import os
+import types
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+import audio_analysis
+from audio_analysis import AnalysisService
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setattr(audio_analysis, "ANALYSIS_DIR", str(tmp_path))
+    store = types.SimpleNamespace(digest_of=lambda filename: "abc123")
+    monkeypatch.setattr(audio_analysis, "get_track_store", lambda wait=True: store)
+    service = AnalysisService(max_workers=1)
+    service._pool = ThreadPoolExecutor(max_workers=1)
+    yield service
+    service.shutdown()
+
+def test_failed_analysis_is_not_resubmitted(service, monkeypatch):
+    calls = []
+    def broken(track_path, sidecar_path):
+        calls.append(track_path)
+        raise RuntimeError("FFmpeg nicht gefunden")
+    monkeypatch.setattr(audio_analysis, "analyze_file", broken)
+
+    future = service.submit("track.mp3")
+    with pytest.raises(RuntimeError):
+        future.result(timeout=5)
+    service._pool.shutdown(wait=True)  # Done-Callback ist gelaufen
+    service._pool = ThreadPoolExecutor(max_workers=1)
+
+    assert service.failed("track.mp3")
+    assert service.submit("track.mp3") is None
+    assert service.get("track.mp3") is None
+    assert len(calls) == 1
+
+def _analysis():
+    chunk = (np.sin(np.arange(48000 * 2) / 10.0).astype("<f4") * 0.5).tobytes()
+    return audio_analysis.analyze_pcm([chunk])
+
+def test_sidecar_roundtrip(tmp_path):
+    path = str(tmp_path / "track.sba")
+    audio_analysis.write_sidecar(path, _analysis())
+    analysis = audio_analysis.read_sidecar(path)
+    assert analysis is not None
+    assert analysis.duration == pytest.approx(1.0)
+
+@pytest.mark.parametrize("cut", [1, 10, 0.5])
+def test_truncated_sidecar_is_ignored(tmp_path, cut):
+    path = str(tmp_path / "track.sba")
+    audio_analysis.write_sidecar(path, _analysis())
+    with open(path, 'rb') as f:
+        data = f.read()
+    size = int(len(data) * cut) if cut < 1 else len(data) - cut
+    with open(path, 'wb') as f:
+        f.write(data[:max(size, audio_analysis.HEADER.size)])
+    assert audio_analysis.read_sidecar(path) is None
+
+def test_trailing_garbage_is_ignored(tmp_path):
+    path = str(tmp_path / "track.sba")
+    audio_analysis.write_sidecar(path, _analysis())
+    with open(path, 'ab') as f:
+        f.write(b"\0")
+    assert audio_analysis.read_sidecar(path) is None
+
+def test_broken_sidecar_is_removed_for_reanalysis(service):
+    sidecar = service.sidecar_path("abc123")
+    with open(sidecar, 'wb') as f:
+        f.write(b"SBA1")
+    assert service.get("track.mp3") is None
+    assert not os.path.exists(sidecar)
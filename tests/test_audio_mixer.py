@@ -0,0 +1,44 @@
+import pytest
+from audio_mixer import AudioMixer, LAYER_AMBIENCE, LAYER_MUSIC, LAYER_SFX
+
+def test_overlapping_oneshots_keep_their_own_gain(tone):
+    mixer = AudioMixer(sfx_voices=4, volumes={LAYER_SFX: 0.8})
+    soft = mixer.play_oneshot(tone, gain=0.5)
+    loud = mixer.play_oneshot(tone, gain=1.0)
+    assert soft is not loud
+    assert soft.get_volume() == pytest.approx(0.4, abs=0.01)
+    assert loud.get_volume() == pytest.approx(0.8, abs=0.01)
+    # Der geteilte Sound aus dem Cache bleibt unverändert
+    assert tone.get_volume() == pytest.approx(1.0)
+
+    # Die Ebenen-Lautstärke skaliert beide Stimmen, ohne ihre Verstärkung zu verlieren
+    mixer.set_layer_volume(LAYER_SFX, 0.5)
+    assert soft.get_volume() == pytest.approx(0.25, abs=0.01)
+    assert loud.get_volume() == pytest.approx(0.5, abs=0.01)
+
+def test_loop_gain_stays_on_the_channel(tone):
+    mixer = AudioMixer(sfx_voices=2, volumes={LAYER_AMBIENCE: 0.5})
+    mixer.play_loop(LAYER_AMBIENCE, tone, gain=0.5)
+    layer = mixer.layers[LAYER_AMBIENCE]
+    assert layer.channel.get_volume() == pytest.approx(0.25, abs=0.01)
+    assert tone.get_volume() == pytest.approx(1.0)
+
+    # Der nächste Auslöser ohne Anschlagstärke spielt wieder mit voller Verstärkung
+    mixer.play_loop(LAYER_AMBIENCE, tone)
+    assert layer.channel.get_volume() == pytest.approx(0.5, abs=0.01)
+
+def test_new_scene_after_pause_cuts_and_resumes(tone):
+    mixer = AudioMixer(sfx_voices=2)
+    mixer.play_loop(LAYER_AMBIENCE, tone)
+    mixer.play_loop(LAYER_MUSIC, tone)
+    mixer.play_oneshot(tone)
+    mixer.pause_all()
+
+    mixer.play_loop(LAYER_AMBIENCE, tone, fade_sec=2.0)
+    ambience = mixer.layers[LAYER_AMBIENCE]
+    # Keine Überblendung aus einem pausierten Kanal, sondern ein harter Schnitt
+    assert not ambience.fading
+    assert ambience.channel.get_busy()
+    assert not mixer.paused
+    # Die übrigen Ebenen bleiben nicht pausiert zurück
+    assert mixer.layers[LAYER_MUSIC]._paused_at is None
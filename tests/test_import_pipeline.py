@@ -0,0 +1,121 @@
+import os
+import threading
+import time
+import pytest
+from import_pipeline import BulkImportPipeline, ImportCancelled, STAGE_CANCELLED, STAGE_ERROR
+
+class FakeYoutubeDL:
+    """Attrappe für yt_dlp.YoutubeDL: "lädt" eine kleine Datei und ruft die Fortschritts-Hooks"""
+
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def __init__(self, opts):
+        self.opts = opts
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def extract_info(self, link, download=True):
+        if "kaputt" in link:
+            raise RuntimeError("Video nicht verfügbar")
+        with FakeYoutubeDL.lock:
+            FakeYoutubeDL.active += 1
+            FakeYoutubeDL.max_active = max(FakeYoutubeDL.max_active, FakeYoutubeDL.active)
+        try:
+            info = {"id": link.rsplit("=", 1)[1], "title": "Titel", "ext": "webm"}
+            for done in (0, 50, 100):
+                for hook in self.opts["progress_hooks"]:
+                    hook({"status": "downloading", "downloaded_bytes": done, "total_bytes": 100})
+                time.sleep(0.01)
+            with open(self.prepare_filename(info), "wb") as f:
+                f.write(b"webm")
+            return info
+        finally:
+            with FakeYoutubeDL.lock:
+                FakeYoutubeDL.active -= 1
+
+    def prepare_filename(self, info):
+        return self.opts["outtmpl"].replace("%(title)s", info["title"]).replace(
+            "%(id)s", info["id"]).replace("%(ext)s", info["ext"])
+
+def fake_transcode(src, dest, cancel_event):
+    with open(dest, "wb") as f:
+        f.write(b"mp3")
+
+@pytest.fixture(autouse=True)
+def reset_counters():
+    FakeYoutubeDL.active = FakeYoutubeDL.max_active = 0
+
+def _links(count):
+    return [f"https://youtube.com/watch?v=id{n}" for n in range(count)]
+
+def test_imports_all_links_in_parallel(tmp_path):
+    tracks = []
+    pipeline = BulkImportPipeline(_links(8) + ["https://youtube.com/watch?v=kaputt"], str(tmp_path),
+                                  download_workers=3, ydl_factory=FakeYoutubeDL,
+                                  transcoder=fake_transcode, on_track=tracks.append)
+    results = pipeline.run()
+    assert [ok for ok, _, _ in results] == [True] * 8 + [False]
+    assert results[-1][2] == "Video nicht verfügbar"
+    assert len(tracks) == 8
+    # Erster Titel ohne ID, gleichnamige danach mit ID; keine Rohdateien übrig
+    assert os.path.exists(tmp_path / "Titel.mp3")
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(path) for path in tracks)
+    assert 1 < FakeYoutubeDL.max_active <= 3
+
+def test_cancel_during_transcode_stops_everything(tmp_path):
+    started = threading.Event()
+
+    def slow_transcode(src, dest, cancel_event):
+        with open(dest, "wb") as f:
+            f.write(b"halb")
+        started.set()
+        if cancel_event.wait(5):
+            raise ImportCancelled()
+
+    stages = {}
+    pipeline = BulkImportPipeline(_links(10), str(tmp_path), download_workers=2, transcode_workers=1,
+                                  queue_size=1, ydl_factory=FakeYoutubeDL, transcoder=slow_transcode,
+                                  on_progress=lambda index, stage, percent: stages.__setitem__(index, stage))
+    runner = threading.Thread(target=pipeline.run)
+    runner.start()
+    assert started.wait(5)
+    pipeline.cancel()
+    runner.join(5)
+    assert not runner.is_alive()
+
+    assert all(result is not None and not result[0] for result in pipeline.results)
+    assert set(stages.values()) == {STAGE_CANCELLED}
+    # Weder halbe MP3s noch Rohdateien bleiben liegen
+    assert os.listdir(tmp_path) == []
+
+def test_cancel_during_download(tmp_path):
+    pipeline = None
+
+    class CancellingYoutubeDL(FakeYoutubeDL):
+        def extract_info(self, link, download=True):
+            pipeline.cancel()
+            return super().extract_info(link, download)
+
+    pipeline = BulkImportPipeline(_links(3), str(tmp_path), ydl_factory=CancellingYoutubeDL,
+                                  transcoder=fake_transcode)
+    results = pipeline.run()
+    assert [result[2] for result in results] == ["Abgebrochen"] * 3
+    assert os.listdir(tmp_path) == []
+
+def test_transcode_error_is_reported_per_item(tmp_path):
+    def broken(src, dest, cancel_event):
+        raise RuntimeError("FFmpeg-Fehler")
+
+    stages = {}
+    pipeline = BulkImportPipeline(_links(2), str(tmp_path), ydl_factory=FakeYoutubeDL, transcoder=broken,
+                                  on_progress=lambda index, stage, percent: stages.__setitem__(index, stage))
+    results = pipeline.run()
+    assert [result[2] for result in results] == ["FFmpeg-Fehler"] * 2
+    assert stages == {0: STAGE_ERROR, 1: STAGE_ERROR}
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,64 @@
+import threading
+import time
+import types
+import pytest
+from input_dispatch import InputDispatcher, LatencyHistogram
+
+def _catalog(*scene_ids):
+    entries = {scene_id: types.SimpleNamespace(scene_id=scene_id) for scene_id in scene_ids}
+    return types.SimpleNamespace(get_by_id=entries.get)
+
+def test_triggers_start_in_push_order(qapp):
+    scene_ids = [f"m.json::{n}" for n in range(200)]
+    started = []
+    dispatcher = InputDispatcher(_catalog(*scene_ids), lambda entry, gain: started.append(entry.scene_id))
+    try:
+        # Zwei Geräte-Threads gleichzeitig: je Thread bleibt die Reihenfolge erhalten
+        threads = [threading.Thread(target=lambda ids=scene_ids[i::2]: [dispatcher.push(s) for s in ids])
+                   for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert dispatcher.wait_idle(2)
+    finally:
+        dispatcher.shutdown()
+    assert sorted(started) == sorted(scene_ids)
+    for i in range(2):
+        own = [s for s in started if s in scene_ids[i::2]]
+        assert own == scene_ids[i::2]
+    assert dispatcher.latency.total == len(scene_ids)
+
+def test_unknown_scene_is_skipped(qapp):
+    started = []
+    dispatcher = InputDispatcher(_catalog("m.json::a"), lambda entry, gain: started.append(entry.scene_id))
+    try:
+        dispatcher.push("m.json::fehlt")
+        dispatcher.push("m.json::a")
+        assert dispatcher.wait_idle(2)
+    finally:
+        dispatcher.shutdown()
+    assert started == ["m.json::a"]
+    assert dispatcher.latency.total == 1
+
+def test_latency_is_measured_from_the_press(qapp):
+    dispatcher = InputDispatcher(_catalog("m.json::a"), lambda entry, gain: "play")
+    try:
+        dispatcher.push("m.json::a", pressed_at=time.perf_counter() - 0.03)
+        assert dispatcher.wait_idle(2)
+    finally:
+        dispatcher.shutdown()
+    assert dispatcher.latency.max_ms >= 30
+    assert dispatcher.latency.percentile(0.5) >= 50
+
+def test_histogram_buckets_and_percentiles():
+    histogram = LatencyHistogram(buckets_ms=(1, 10, 100))
+    assert histogram.percentile(0.5) is None
+    for seconds in (0.0005, 0.0005, 0.005, 0.05, 0.5):
+        histogram.record(seconds)
+    assert histogram.counts == [2, 1, 1, 1]
+    assert histogram.percentile(0.4) == 1
+    assert histogram.percentile(0.6) == 10
+    # Über dem letzten Fach zählt das gemessene Maximum
+    assert histogram.percentile(1.0) == pytest.approx(500)
+    assert "5 Auslösungen" in histogram.summary()
@@ -0,0 +1,77 @@
+import types
+import pytest
+import audio
+from audio_mixer import LAYER_AMBIENCE, LAYER_MUSIC
+from hotkey_manager import MidiManager, MIDI_NOTE_ON, MIDI_CONTROL_CHANGE
+from input_dispatch import InputDispatcher
+from mapper import make_scene_id
+
+SCENE_ID = make_scene_id("wald.json", "Nacht")
+
+class FakeSource:
+    """Ersetzt rtmidi.MidiIn: Nachrichten werden direkt in den Callback gespielt"""
+
+    def __init__(self):
+        self.callback = None
+
+    def set_callback(self, callback):
+        self.callback = callback
+
+    def close_port(self):
+        self.callback = None
+
+    def send(self, *message):
+        self.callback((list(message), 0.0))
+
+@pytest.fixture
+def midi(qapp):
+    started = []
+    entry = types.SimpleNamespace(scene_id=SCENE_ID, scene={'layer': LAYER_AMBIENCE})
+    catalog = types.SimpleNamespace(get_by_id=lambda scene_id: entry if scene_id == SCENE_ID else None)
+    dispatcher = InputDispatcher(catalog, lambda entry, gain: started.append(gain) or "play")
+    manager = MidiManager(dispatcher=dispatcher)
+    manager.controls = {"velocity_volume": True, "feedback": False,
+                        "faders": {LAYER_MUSIC: {"channel": 0, "control": 7}}}
+    manager.midi_mappings = {"wald.json": {"Nacht": {"channel": 1, "note": 36}}}
+    manager.build_tables()
+    source = FakeSource()
+    manager.open_port("Fake", source=source)
+    yield manager, source, dispatcher, started
+    manager.close_port()
+    dispatcher.shutdown()
+
+def test_velocity_scales_only_the_triggered_sound(midi):
+    manager, source, dispatcher, started = midi
+    volume = audio.get_layer_volume(LAYER_AMBIENCE)
+    changed = []
+    manager.layer_volume_changed.connect(lambda layer, value: changed.append(layer))
+
+    source.send(MIDI_NOTE_ON | 1, 36, 127)
+    source.send(MIDI_NOTE_ON | 1, 36, 32)
+    manager.controls["velocity_volume"] = False
+    source.send(MIDI_NOTE_ON | 1, 36, 32)
+    assert dispatcher.wait_idle(2)
+
+    assert started == pytest.approx([1.0, 32 / 127, 1.0])
+    assert audio.get_layer_volume(LAYER_AMBIENCE) == volume
+    assert changed == []
+
+def test_unbound_notes_and_note_off_are_ignored(midi):
+    manager, source, dispatcher, started = midi
+    source.send(MIDI_NOTE_ON | 0, 36, 100)  # falscher Kanal
+    source.send(MIDI_NOTE_ON | 1, 37, 100)  # andere Note
+    source.send(MIDI_NOTE_ON | 1, 36, 0)    # Note-on mit Anschlag 0 = Note-off
+    assert dispatcher.wait_idle(2)
+    assert started == []
+
+def test_fader_sets_layer_volume_without_saving(midi, monkeypatch):
+    manager, source, dispatcher, started = midi
+    saved = []
+    monkeypatch.setattr(audio, "set_setting", lambda key, value: saved.append(key))
+    previous = audio.get_layer_volume(LAYER_MUSIC)
+    try:
+        source.send(MIDI_CONTROL_CHANGE | 0, 7, 64)
+        assert audio.get_layer_volume(LAYER_MUSIC) == pytest.approx(64 / 127)
+        assert saved == []
+    finally:
+        audio.set_layer_volume(LAYER_MUSIC, previous, persist=False)
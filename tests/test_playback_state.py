@@ -0,0 +1,60 @@
+import threading
+import wave
+import types
+import pytest
+from audio_mixer import LAYER_AMBIENCE
+from input_dispatch import InputDispatcher
+import audio
+import ui
+
+def _entry(track):
+    return types.SimpleNamespace(scene_id=f"test.json::{track}", name=track, track=track,
+                                 mapping_file="test.json",
+                                 scene={'layer': LAYER_AMBIENCE, 'start': 0, 'duration': 1, 'loudness': None})
+
+def _app():
+    app = types.SimpleNamespace(playback_lock=threading.RLock(), current_scene_id="test.json::alt",
+                                current_playing=True, is_paused=False, current_track="alt.mp3")
+    return app
+
+def test_failed_start_keeps_previous_scene():
+    app = _app()
+    with pytest.raises(FileNotFoundError):
+        ui.SoundboardApp.start_scene_audio(app, _entry("fehlt.mp3"))
+    assert app.current_scene_id == "test.json::alt"
+    assert app.current_track == "alt.mp3"
+    assert app.current_playing
+
+def test_dispatcher_reports_failed_start(qapp):
+    entry = _entry("fehlt.mp3")
+    catalog = types.SimpleNamespace(get_by_id=lambda scene_id: entry)
+    def start_audio(entry, gain):
+        raise FileNotFoundError("fehlt.mp3")
+    dispatcher = InputDispatcher(catalog, start_audio)
+    failed, triggered = [], []
+    dispatcher.failed.connect(lambda scene_id, message: failed.append(scene_id))
+    dispatcher.triggered.connect(lambda scene_id, action: triggered.append(scene_id))
+    try:
+        dispatcher.push(entry.scene_id)
+        assert dispatcher.wait_idle(2)
+        qapp.processEvents()
+    finally:
+        dispatcher.shutdown()
+    assert failed == [entry.scene_id]
+    assert triggered == []
+    assert dispatcher.latency.total == 0
+
+def test_trigger_does_not_read_the_analysis(tmp_path):
+    path = tmp_path / "ton.wav"
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(44100)
+        f.writeframes(bytes(4 * 44100))
+    entry = _entry(str(path))
+    del entry.scene['loudness']
+    app = _app()
+    app.analysis = None  # Jeder Zugriff auf die Analyse würde hier scheitern
+    assert ui.SoundboardApp.start_scene_audio(app, entry) == ui.ACTION_PLAY
+    assert app.current_track == str(path)
+    audio.stop_playback()
@@ -0,0 +1,89 @@
+import json
+import zipfile
+import pytest
+from scene_bundle import BundleWriter, BundleReader, BundleError, EXPORT_JSON, MANIFEST_JSON
+
+EXPORT = {"version": "2.0", "tracks": ["wald.mp3"], "mappings": {}}
+
+def _bundle(tmp_path, name="test.sbz"):
+    track = tmp_path / "wald.mp3"
+    track.write_bytes(b"ID3" + bytes(1000))
+    path = str(tmp_path / name)
+    writer = BundleWriter(path)
+    writer.add_json(EXPORT_JSON, EXPORT)
+    writer.add_file("tracks/wald.mp3", str(track))
+    writer.close()
+    return path
+
+def _rewrite(path, replace):
+    """Schreibt das Bundle neu und ersetzt dabei einzelne Einträge (None: weglassen)"""
+    with zipfile.ZipFile(path) as src:
+        entries = {name: src.read(name) for name in src.namelist()}
+    for name, data in replace.items():
+        if data is None:
+            entries.pop(name, None)
+        else:
+            entries[name] = data
+    with zipfile.ZipFile(path, 'w') as dst:
+        for name, data in entries.items():
+            dst.writestr(name, data)
+
+def _manifest(path):
+    with zipfile.ZipFile(path) as src:
+        return json.loads(src.read(MANIFEST_JSON))
+
+def test_valid_bundle_roundtrip(tmp_path):
+    path = _bundle(tmp_path)
+    with BundleReader(path) as reader:
+        assert reader.read_export() == EXPORT
+        dest = tmp_path / "out.mp3"
+        reader.extract("tracks/wald.mp3", str(dest))
+    assert dest.read_bytes() == (tmp_path / "wald.mp3").read_bytes()
+
+def test_tampered_track_is_rejected_and_leaves_nothing(tmp_path):
+    path = _bundle(tmp_path)
+    _rewrite(path, {"tracks/wald.mp3": b"ID3" + bytes(999) + b"x"})
+    dest = tmp_path / "out.mp3"
+    with BundleReader(path) as reader:
+        with pytest.raises(BundleError):
+            reader.extract("tracks/wald.mp3", str(dest))
+    assert list(tmp_path.glob("out.mp3*")) == []
+
+def test_tampered_export_is_rejected(tmp_path):
+    path = _bundle(tmp_path)
+    _rewrite(path, {EXPORT_JSON: json.dumps(dict(EXPORT, tracks=["../x.mp3"]))})
+    with BundleReader(path) as reader:
+        with pytest.raises(BundleError):
+            reader.read_export()
+
+def test_entry_missing_from_manifest_is_rejected(tmp_path):
+    path = _bundle(tmp_path)
+    manifest = _manifest(path)
+    del manifest["entries"][EXPORT_JSON]
+    del manifest["entries"]["tracks/wald.mp3"]
+    _rewrite(path, {MANIFEST_JSON: json.dumps(manifest)})
+    with BundleReader(path) as reader:
+        with pytest.raises(BundleError):
+            reader.read_export()
+        with pytest.raises(BundleError):
+            reader.extract("tracks/wald.mp3", str(tmp_path / "out.mp3"))
+
+def test_entry_missing_from_archive_is_rejected(tmp_path):
+    path = _bundle(tmp_path)
+    _rewrite(path, {"tracks/wald.mp3": None})
+    with BundleReader(path) as reader:
+        with pytest.raises(BundleError):
+            reader.extract("tracks/wald.mp3", str(tmp_path / "out.mp3"))
+
+@pytest.mark.parametrize("manifest", [None, b"{}", b"{kaputt", json.dumps({"format": 99, "entries": {}}).encode()])
+def test_missing_or_foreign_manifest_is_rejected(tmp_path, manifest):
+    path = _bundle(tmp_path)
+    _rewrite(path, {MANIFEST_JSON: manifest})
+    with pytest.raises(BundleError):
+        BundleReader(path)
+
+def test_non_zip_file_is_rejected(tmp_path):
+    path = tmp_path / "kaputt.sbz"
+    path.write_bytes(b"kein zip")
+    with pytest.raises(BundleError):
+        BundleReader(str(path))
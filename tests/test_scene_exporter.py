@@ -0,0 +1,13 @@
+import pytest
+from scene_bundle import BundleError
+from scene_exporter import import_legacy_dir
+
+@pytest.mark.parametrize("export_data", [
+    {"tracks": ["../../x.mp3"]},
+    {"mappings": {"../boese.json": {"track": "a.mp3"}}},
+    {"mappings": {"ok.json": {"track": "../../x.mp3"}}},
+    {"mappings": {"ok.json": {"track": "a.mp3", "scenes": {"S": {"icon": "..\\\\x.png"}}}}},
+])
+def test_legacy_import_rejects_paths(tmp_path, export_data):
+    with pytest.raises(BundleError):
+        import_legacy_dir(str(tmp_path), export_data)
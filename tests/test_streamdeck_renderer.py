@@ -0,0 +1,93 @@
+import threading
+import pytest
+from streamdeck_renderer import KeyRenderer, KeyFace, STATE_ACTIVE, STATE_IDLE, quantize_progress, PROGRESS_STEPS
+
+class FakeDeck:
+    """Genug StreamDeck für den Renderer: Format abfragen, Bilder annehmen, with-Sperre"""
+
+    def __init__(self, keys=6):
+        self.keys = keys
+        self.images = {}
+        self.sent = []
+        self._lock = threading.RLock()
+
+    def deck_type(self):
+        return "Fake Deck"
+
+    def key_count(self):
+        return self.keys
+
+    def key_image_format(self):
+        return {"size": (72, 72), "format": "JPEG", "rotation": 0, "flip": (False, False)}
+
+    def set_key_image(self, key, image):
+        self.images[key] = image
+        self.sent.append(key)
+
+    def __enter__(self):
+        self._lock.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self._lock.release()
+
+@pytest.fixture
+def deck():
+    return FakeDeck()
+
+@pytest.fixture
+def renderer(deck):
+    renderer = KeyRenderer(deck, show_icons=False)
+    yield renderer
+    renderer.stop()
+
+def test_sends_native_images_only_for_changed_keys(deck, renderer):
+    renderer.set_keys({0: KeyFace(label="Wald"), 1: KeyFace(label="Taverne")})
+    assert renderer.wait_idle(5)
+    assert sorted(deck.sent) == [0, 1]
+    assert deck.images[0][:2] == b"\xff\xd8"  # JPEG, wie vom Gerät verlangt
+
+    # Gleicher Inhalt wird nicht noch einmal gesendet
+    renderer.set_keys({0: KeyFace(label="Wald"), 1: KeyFace(label="Taverne", state=STATE_ACTIVE)})
+    assert renderer.wait_idle(5)
+    assert sorted(deck.sent) == [0, 1, 1]
+
+def test_blank_keys_are_not_resent_after_reset(deck, renderer):
+    renderer.set_key(2, None)
+    assert renderer.wait_idle(5)
+    assert deck.sent == []
+
+def test_cached_images_are_reused(deck, renderer):
+    face = KeyFace(label="Wald", state=STATE_IDLE)
+    renderer.set_key(0, face)
+    assert renderer.wait_idle(5)
+    renderer.set_key(1, KeyFace(label="Wald", state=STATE_IDLE))
+    assert renderer.wait_idle(5)
+    assert deck.images[0] is deck.images[1]
+    assert len(renderer._cache) == 1
+
+def test_prerender_fills_cache_without_sending(deck, renderer):
+    faces = [KeyFace(label=f"Szene {n}") for n in range(4)]
+    renderer.prerender(faces)
+    assert renderer.wait_idle(5)
+    assert deck.sent == []
+    assert all(renderer.cache_key(face) in renderer._cache for face in faces)
+
+def test_latest_content_per_key_wins(deck):
+    renderer = KeyRenderer(deck, show_icons=False)
+    try:
+        with renderer._cond:
+            # Während der Worker wartet, wird die Taste mehrfach umbelegt
+            for n in range(5):
+                renderer._pending[0] = KeyFace(label=f"Stand {n}")
+            renderer._cond.notify()
+        assert renderer.wait_idle(5)
+    finally:
+        renderer.stop()
+    assert deck.sent == [0]
+    assert renderer._sent[0] == renderer.cache_key(KeyFace(label="Stand 4"))
+
+def test_progress_is_quantized():
+    assert quantize_progress(0.0) == 0
+    assert quantize_progress(0.5) == PROGRESS_STEPS // 2
+    assert quantize_progress(2.0) == PROGRESS_STEPS
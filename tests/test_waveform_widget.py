@@ -0,0 +1,19 @@
+import threading
+import audio
+from waveform_widget import ScrubPreview
+
+def test_scrub_preview_thread_ends_on_stop(monkeypatch):
+    played = threading.Event()
+    monkeypatch.setattr(audio, "play_preview", lambda *args: played.set())
+    preview = ScrubPreview()
+    preview.request("track.mp3", 1.0)
+    assert played.wait(2)
+    thread = preview._thread
+    preview.stop()
+    assert not thread.is_alive()
+
+    # Nach dem Stoppen startet die nächste Anforderung einen neuen Thread
+    played.clear()
+    preview.request("track.mp3", 2.0)
+    assert played.wait(2)
+    preview.stop()
@@ -0,0 +1,91 @@
+# Datei: thumbnail_cache.py
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from PIL import Image
+from PySide6.QtGui import QPixmap
+from config import THUMBNAIL_DIR
+
+class ThumbnailCache:
+    """Erzeugt Icon-Vorschaubilder pro Größe genau einmal.
+    Stufen: LRU im Speicher -> PNG im Cache-Ordner (Hash der Quelle + Größe) -> Quelle dekodieren."""
+
+    def __init__(self, cache_dir=THUMBNAIL_DIR, max_entries=512):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._images = OrderedDict()   # (hash, size) -> PIL.Image
+        self._pixmaps = OrderedDict()  # (hash, size) -> QPixmap
+        self._hashes = {}              # (path, mtime, size) -> hash
+        self._lock = threading.Lock()
+
+    def source_hash(self, path):
+        """SHA1 der Quelldatei, gemerkt pro (Pfad, mtime, Größe)"""
+        stat = os.stat(path)
+        stamp = (os.path.abspath(path), stat.st_mtime, stat.st_size)
+        digest = self._hashes.get(stamp)
+        if digest is None:
+            sha = hashlib.sha1()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(65536), b""):
+                    sha.update(chunk)
+            digest = sha.hexdigest()
+            self._hashes[stamp] = digest
+        return digest
+
+    def get_path(self, path, size):
+        """Pfad des PNG-Vorschaubilds; erzeugt es bei Bedarf einmalig"""
+        digest = self.source_hash(path)
+        thumb_path = os.path.join(self.cache_dir, f"{digest}_{size}.png")
+        if not os.path.exists(thumb_path):
+            image = self._render(path, size)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{thumb_path}.{threading.get_ident()}.tmp"
+            image.save(tmp_path, "PNG")
+            os.replace(tmp_path, thumb_path)
+        return thumb_path
+
+    def get_image(self, path, size):
+        """PIL-Vorschaubild (RGBA, size x size). Liefert eine Kopie, die bemalt werden darf."""
+        key = (self.source_hash(path), size)
+        with self._lock:
+            image = self._lookup(self._images, key)
+        if image is None:
+            image = Image.open(self.get_path(path, size)).convert("RGBA")
+            with self._lock:
+                self._store(self._images, key, image)
+        return image.copy()
+
+    def get_pixmap(self, path, size):
+        """QPixmap-Vorschaubild (nur im GUI-Thread aufrufen)"""
+        key = (self.source_hash(path), size)
+        pixmap = self._lookup(self._pixmaps, key)
+        if pixmap is None:
+            pixmap = QPixmap(self.get_path(path, size))
+            if pixmap.isNull():
+                return pixmap
+            self._store(self._pixmaps, key, pixmap)
+        return pixmap
+
+    @staticmethod
+    def _render(path, size):
+        # Seitenverhältnis behalten und auf quadratischer, transparenter Fläche zentrieren
+        img = Image.open(path).convert("RGBA")
+        img.thumbnail((size, size), Image.LANCZOS)
+        bg = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+        bg.paste(img, ((size - img.width) // 2, (size - img.height) // 2), img)
+        return bg
+
+    @staticmethod
+    def _lookup(cache, key):
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+    def _store(self, cache, key, value):
+        cache[key] = value
+        while len(cache) > self.max_entries:
+            cache.popitem(last=False)
+
+thumbnails = ThumbnailCache()
@@ -2,7 +2,6 @@
 
 import os
 import json
-import shutil
 from PySide6.QtWidgets import (
     QFileDialog, QMessageBox, QDialog, QVBoxLayout, QListWidget,
     QPushButton, QHBoxLayout, QLabel
@@ -10,6 +9,8 @@ from PySide6.QtWidgets import (
 from send2trash import send2trash
 from config import ASSET_DIR, MAPPING_DIR
 from mapper import load_mapping
+from track_store import get_track_store
+from audio_analysis import get_analysis_service
 from PySide6.QtCore import Qt
 
 
@@ -18,15 +19,12 @@ def upload_track(parent):
     if not file_path:
         return None
 
-    filename = os.path.basename(file_path)
-    dest_path = os.path.join(ASSET_DIR, filename)
-
-    if os.path.exists(dest_path):
-        QMessageBox.information(parent, "Schon vorhanden", f"Die Datei '{filename}' ist bereits im Soundboard.")
+    # Datei kopieren – außer ihr Inhalt liegt schon (evtl. unter anderem Namen) im Soundboard
+    filename, duplicate = get_track_store().add_file(file_path, os.path.basename(file_path))
+    if duplicate:
+        QMessageBox.information(parent, "Schon vorhanden", f"Dieser Track ist bereits als '{filename}' im Soundboard.")
         return None
-
-    # Datei kopieren
-    shutil.copy(file_path, dest_path)
+    get_analysis_service().submit(filename)
 
     # Leeres Mapping erstellen, wenn nicht vorhanden
     #mapping_path = os.path.join(MAPPING_DIR, os.path.splitext(filename)[0] + ".json")
@@ -0,0 +1,180 @@
+# Datei: track_store.py
+import hashlib
+import json
+import os
+import shutil
+import threading
+from config import ASSET_DIR, CACHE_DIR
+
+TRACK_EXTENSIONS = (".mp3", ".mp4")
+INDEX_FILE = os.path.join(CACHE_DIR, "track_index.json")
+CHUNK_SIZE = 1024 * 1024
+
+def digest_file(path):
+    """SHA-256 einer Datei, blockweise gelesen (nie die ganze Datei im Speicher)"""
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+class TrackStore:
+    """Inhaltsadressierter Index über die Tracks in ASSET_DIR (Digest -> Dateiname).
+    Ein Track wird nur neu gehasht, wenn sich Größe oder mtime geändert haben."""
+
+    def __init__(self, asset_dir=ASSET_DIR, index_path=INDEX_FILE):
+        self.asset_dir = asset_dir
+        self.index_path = index_path
+        self._files = {}    # filename -> {"size", "mtime", "digest"}
+        self._digests = {}  # digest -> filename
+        self._lock = threading.RLock()
+        self._load()
+        self.refresh()
+
+    def refresh(self):
+        """Gleicht den Index mit ASSET_DIR ab"""
+        with self._lock:
+            present = set()
+            for filename in os.listdir(self.asset_dir):
+                if filename.lower().endswith(TRACK_EXTENSIONS):
+                    present.add(filename)
+                    self._entry(filename)
+            for filename in set(self._files) - present:
+                self._forget(filename)
+            self._save()
+
+    def find(self, digest):
+        """Dateiname eines Tracks mit diesem Inhalt oder None"""
+        with self._lock:
+            filename = self._digests.get(digest)
+            if filename and os.path.exists(os.path.join(self.asset_dir, filename)):
+                return filename
+            return None
+
+    def digest_of(self, filename):
+        with self._lock:
+            entry = self._entry(filename)
+            return entry["digest"] if entry else None
+
+    def add_file(self, src_path, preferred_name=None, move=False, digest=None):
+        """Übernimmt eine Datei in ASSET_DIR, sofern ihr Inhalt noch nicht vorhanden ist.
+        Gibt (gespeicherter Dateiname, war_duplikat) zurück."""
+        digest = digest or digest_file(src_path)
+        with self._lock:
+            existing = self.find(digest)
+            if existing:
+                if move:
+                    os.remove(src_path)
+                return existing, True
+            filename = self._free_name(preferred_name or os.path.basename(src_path))
+            dest = os.path.join(self.asset_dir, filename)
+            if move:
+                shutil.move(src_path, dest)
+            else:
+                shutil.copy2(src_path, dest)
+            self._record(filename, digest)
+            self._save()
+            return filename, False
+
+    def replace_file(self, src_path, filename, digest=None):
+        """Ersetzt den Track filename an Ort und Stelle durch src_path (wird verschoben),
+        z.B. wenn ein Delta-Bundle eine geänderte Fassung liefert"""
+        digest = digest or digest_file(src_path)
+        with self._lock:
+            os.replace(src_path, os.path.join(self.asset_dir, filename))
+            self._record(filename, digest)
+            self._save()
+        return filename
+
+    def register(self, filename):
+        """Meldet eine bereits in ASSET_DIR liegende Datei an (z.B. nach YouTube-Import).
+        Ist der Inhalt schon unter anderem Namen vorhanden, wird die neue Datei entfernt.
+        Gibt (gültiger Dateiname, war_duplikat) zurück."""
+        path = os.path.join(self.asset_dir, filename)
+        digest = digest_file(path)
+        with self._lock:
+            existing = self.find(digest)
+            if existing and existing != filename:
+                os.remove(path)
+                self._forget(filename)
+                self._save()
+                return existing, True
+            self._record(filename, digest)
+            self._save()
+            return filename, False
+
+    def _entry(self, filename):
+        # Aufrufer hält self._lock
+        path = os.path.join(self.asset_dir, filename)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self._forget(filename)
+            return None
+        entry = self._files.get(filename)
+        if entry is None or entry["size"] != stat.st_size or entry["mtime"] != stat.st_mtime:
+            self._record(filename, digest_file(path), stat)
+            entry = self._files[filename]
+        return entry
+
+    def _record(self, filename, digest, stat=None):
+        stat = stat or os.stat(os.path.join(self.asset_dir, filename))
+        old = self._files.get(filename)
+        if old and self._digests.get(old["digest"]) == filename:
+            del self._digests[old["digest"]]
+        self._files[filename] = {"size": stat.st_size, "mtime": stat.st_mtime, "digest": digest}
+        self._digests.setdefault(digest, filename)
+
+    def _forget(self, filename):
+        entry = self._files.pop(filename, None)
+        if entry and self._digests.get(entry["digest"]) == filename:
+            del self._digests[entry["digest"]]
+            # Gleicher Inhalt unter weiterem Namen? Dann diesen eintragen
+            for other, other_entry in self._files.items():
+                if other_entry["digest"] == entry["digest"]:
+                    self._digests[entry["digest"]] = other
+                    break
+
+    def _free_name(self, filename):
+        # Anderer Inhalt unter gleichem Namen: "Name (2).mp3", "Name (3).mp3", ...
+        base, ext = os.path.splitext(filename)
+        candidate, counter = filename, 2
+        while os.path.exists(os.path.join(self.asset_dir, candidate)):
+            candidate = f"{base} ({counter}){ext}"
+            counter += 1
+        return candidate
+
+    def _load(self):
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    self._files = json.load(f).get("files", {})
+            except Exception as e:
+                print(f"[WARN] Track-Index konnte nicht geladen werden: {e}")
+                self._files = {}
+        for filename, entry in sorted(self._files.items()):
+            self._digests.setdefault(entry["digest"], filename)
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"files": self._files}, f, indent=4)
+        os.replace(tmp_path, self.index_path)
+
+_store = None
+_store_lock = threading.Lock()
+_store_ready = threading.Event()
+
+def get_track_store(wait=True):
+    """Prozessweiter Track-Store (wird beim ersten Zugriff angelegt; dabei werden alle
+    neuen oder geänderten Tracks gehasht). Mit wait=False None, solange der Index
+    noch nicht fertig aufgebaut ist, statt darauf zu warten."""
+    global _store
+    if not wait and not _store_ready.is_set():
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = TrackStore()
+            _store_ready.set()
+        return _store
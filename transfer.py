@@ -0,0 +1,98 @@
+# Datei: transfer.py
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+from settings import get_setting
+
+CHUNK_SIZE = 1024 * 1024
+REPORT_INTERVAL_SEC = 0.1
+
+class TransferCancelled(Exception):
+    """Kopiervorgang wurde abgebrochen"""
+
+class TransferProgress:
+    """Fortschritt (Bytes und Dateien) und Abbruch eines Kopiervorgangs; threadsicher.
+    on_change wird höchstens alle REPORT_INTERVAL_SEC aus dem kopierenden Thread gerufen."""
+
+    def __init__(self, max_workers=None, on_change=None):
+        self.max_workers = max(1, max_workers or get_setting("transfer_workers"))
+        self.total_bytes = 0
+        self.total_files = 0
+        self.bytes_done = 0
+        self.files_done = 0
+        self.cancel_event = threading.Event()
+        self._on_change = on_change or (lambda progress: None)
+        self._lock = threading.Lock()
+        self._last_report = 0.0
+
+    def set_totals(self, total_bytes, total_files):
+        with self._lock:
+            self.total_bytes = total_bytes
+            self.total_files = total_files
+        self._report(force=True)
+
+    def add_bytes(self, count):
+        with self._lock:
+            self.bytes_done += count
+        self._report()
+
+    def file_done(self):
+        with self._lock:
+            self.files_done += 1
+        self._report(force=True)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def check(self):
+        """Wirft TransferCancelled, sobald abgebrochen wurde"""
+        if self.cancel_event.is_set():
+            raise TransferCancelled()
+
+    def run_parallel(self, fn, items):
+        """Führt fn für alle Einträge mit begrenzter Parallelität aus.
+        Schlägt ein Eintrag fehl, werden die übrigen abgebrochen und der Fehler weitergereicht."""
+        items = list(items)
+        if not items:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items)),
+                                thread_name_prefix="transfer") as pool:
+            futures = [pool.submit(fn, item) for item in items]
+            done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+            if any(future.exception() for future in done):
+                self.cancel_event.set()
+        errors = [future.exception() for future in futures if future.exception()]
+        real_errors = [e for e in errors if not isinstance(e, TransferCancelled)]
+        if real_errors:
+            raise real_errors[0]
+        if errors:
+            raise errors[0]
+        return [future.result() for future in futures]
+
+    def _report(self, force=False):
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_report < REPORT_INTERVAL_SEC:
+                return
+            self._last_report = now
+        self._on_change(self)
+
+def copy_file(src, dest, progress):
+    """Kopiert blockweise mit Fortschritt; bei Abbruch oder Fehler bleibt keine Teildatei liegen"""
+    try:
+        with open(src, 'rb') as fsrc, open(dest, 'wb') as fdst:
+            for chunk in iter(lambda: fsrc.read(CHUNK_SIZE), b""):
+                progress.check()
+                fdst.write(chunk)
+                progress.add_bytes(len(chunk))
+        shutil.copystat(src, dest)
+    except BaseException:
+        if os.path.exists(dest):
+            os.remove(dest)
+        raise
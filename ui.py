@@ -1,100 +1,135 @@
 import os
+import threading
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QMenu, QPushButton, QLabel, QHBoxLayout, QGridLayout, QSizePolicy,
-    QInputDialog, QMainWindow, QScrollArea, QMessageBox
+    QWidget, QVBoxLayout, QMenu, QPushButton, QLabel, QHBoxLayout, QInputDialog, QMainWindow,
+    QMessageBox, QSlider
 )
-from PySide6.QtGui import QPixmap, QIcon, QKeySequence, QAction
-from PySide6.QtCore import Qt, QTimer, QSize
-from audio import play_loop_segment, stop_playback
-from mapper import load_mapping, list_all_track_mappings
+from PySide6.QtGui import QKeySequence
+from PySide6.QtCore import Qt, QTimer, Signal
+from audio import (
+    play_loop_segment, play_oneshot, stop_playback, pause_playback, resume_playback,
+    set_layer_volume, get_layer_volume, get_position, save_layer_volumes
+)
+from audio_mixer import LAYER_AMBIENCE, LAYER_SFX, LAYER_LABELS
+from scene_catalog import get_catalog
+from mapper import make_scene_id
 from menu import MenuBar, create_menu
-from config import ASSET_DIR, APP_TITLE, WINDOW_WIDTH, WINDOW_HEIGHT, ICON_DIR
-from hotkey_manager import HotkeyManager
-from scene_manager import create_scene, edit_scene, delete_scene
+from config import ASSET_DIR, APP_TITLE, WINDOW_WIDTH, WINDOW_HEIGHT
+from hotkey_manager import HotkeyManager, MidiManager, format_midi_binding
+from scene_manager import create_scene, edit_scene, delete_scene, edit_specific_scene, delete_specific_scene
+from scene_grid import SceneListModel, SceneGridView
 from track_manager import upload_track, delete_track
 from streamdeck_manager import StreamDeckManager
+from streamdeck_layout import StreamDeckLayout
+from settings import get_setting
+from prefetcher import ScenePrefetcher
+from audio_analysis import get_analysis_service
+from input_dispatch import InputDispatcher
 
-def get_scene_button_style(is_active=False):
-    return f"""
-        QPushButton {{
-            text-align: center;
-            padding-top: 10px;
-            padding-bottom: 5px;
-            border: 2px solid {"#FFD700" if is_active else "#444"};
-            border-radius: 10px;
-            background-color: {"#4b4b4b" if is_active else "#3c3c3c"};
-            color: white;
-        }}
-        QPushButton:hover {{
-            background-color: #606060;
-            border: 2px solid {"#FFD700" if is_active else "#777"};
-        }}
-    """
-
-def make_context_menu(button, mapping_file, scene_name, main_window):
-    def contextMenuEvent(event):
-        menu = QMenu()
-        
-        # Aktuelle Szene ist aktiv
-        is_active = (main_window.current_scene_name == scene_name and main_window.current_playing)
-        
-        # Play/Pause Aktion
-        if is_active:
-            if main_window.is_paused:
-                action_play = menu.addAction("Weiter")
-            else:
-                action_play = menu.addAction("Pause")
-        else:
-            action_play = menu.addAction("Abspielen")
-        
-        menu.addSeparator()
-        action_edit = menu.addAction("Szene bearbeiten")
-        action_delete = menu.addAction("Szene löschen")
-        
-        # Hotkey-Menü
-        hotkey_menu = menu.addMenu("Hotkey")
-        current_key = main_window.hotkey_manager.hotkeys.get(mapping_file, {}).get(scene_name, "")
-        if current_key:
-            hotkey_menu.addAction(f"Aktuell: {current_key}")
-            hotkey_menu.addAction("Entfernen", lambda: main_window.remove_hotkey(mapping_file, scene_name))
-        hotkey_menu.addAction("Neuer Hotkey...", lambda: main_window.set_hotkey(mapping_file, scene_name))
-        
-        action = menu.exec(event.globalPos())
-        if action == action_play:
-            if is_active:
-                main_window.pause_playback()
-            else:
-                data = load_mapping(mapping_file)
-                scene = data["scenes"][scene_name]
-                main_window.play_scene(data["track"], scene, scene_name)
-        elif action == action_edit:
-            from scene_manager import edit_specific_scene
-            edit_specific_scene(main_window, mapping_file, scene_name)
-            main_window.load_all_scenes()
-        elif action == action_delete:
-            from scene_manager import delete_specific_scene
-            delete_specific_scene(main_window, mapping_file, scene_name)
-            main_window.load_all_scenes()
-    button.contextMenuEvent = contextMenuEvent
+# Ergebnis einer Auslösung, für das Nachziehen der Oberfläche
+ACTION_ONESHOT = "oneshot"
+ACTION_PLAY = "play"
+ACTION_PAUSE = "pause"
+ACTION_RESUME = "resume"
+
+def make_context_menu(main_window, mapping_file, scene_name):
+    """Baut das Kontextmenü einer Szene"""
+    menu = QMenu(main_window)
+
+    # Aktuelle Szene ist aktiv
+    scene_id = make_scene_id(mapping_file, scene_name)
+    is_active = (main_window.current_scene_id == scene_id and main_window.current_playing)
+
+    # Play/Pause Aktion
+    if is_active:
+        action_play = menu.addAction("Weiter" if main_window.is_paused else "Pause")
+        action_play.triggered.connect(main_window.pause_playback)
+    else:
+        action_play = menu.addAction("Abspielen")
+        action_play.triggered.connect(lambda: main_window.play_scene_by_id(scene_id))
+
+    menu.addSeparator()
+    menu.addAction("Szene bearbeiten", lambda: edit_specific_scene(main_window, mapping_file, scene_name))
+    menu.addAction("Szene löschen", lambda: delete_specific_scene(main_window, mapping_file, scene_name))
+
+    # Hotkey-Menü
+    hotkey_menu = menu.addMenu("Hotkey")
+    current_key = main_window.hotkey_manager.hotkeys.get(mapping_file, {}).get(scene_name, "")
+    if current_key:
+        hotkey_menu.addAction(f"Aktuell: {current_key}")
+        hotkey_menu.addAction("Entfernen", lambda: main_window.remove_hotkey(mapping_file, scene_name))
+    hotkey_menu.addAction("Neuer Hotkey...", lambda: main_window.set_hotkey(mapping_file, scene_name))
+
+    # MIDI-Menü
+    midi_menu = menu.addMenu("MIDI")
+    current_note = main_window.midi.midi_mappings.get(mapping_file, {}).get(scene_name)
+    if current_note is not None:
+        midi_menu.addAction(f"Aktuell: {format_midi_binding(current_note)}")
+        midi_menu.addAction("Entfernen", lambda: main_window.midi.remove_midi_mapping(mapping_file, scene_name))
+    midi_menu.addAction("MIDI lernen...", lambda: main_window.learn_midi(mapping_file, scene_name))
+
+    # StreamDeck-Menü
+    if main_window.streamdeck.device:
+        deck_menu = menu.addMenu("StreamDeck")
+        deck_menu.addAction("Auf Button legen...", lambda: main_window.map_to_streamdeck(scene_id))
+        if main_window.streamdeck.layout.find_scene(scene_id):
+            deck_menu.addAction("Entfernen", lambda: main_window.unmap_from_streamdeck(scene_id))
+    return menu
 
 class SoundboardApp(QMainWindow):
+    _loudness_measured = Signal(str, float)  # Szenen-ID, Lautheit (aus dem Nachtrags-Thread)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("D&D Soundboard")
         self.setMinimumSize(800, 600)
         
+        # Vorab-Dekodierung gebundener Szenen
+        self.prefetcher = ScenePrefetcher()
+
+        # Track-Index aufbauen und Tracks ohne aktuelle Analyse analysieren – beides im Hintergrund
+        self.analysis = get_analysis_service()
+        self._backfilling = set()  # Szenen-IDs, deren Lautheit gerade nachgetragen wird
+        self._loudness_measured.connect(self.save_loudness)
+        self.analysis.scan_in_background()
+
         # StreamDeck-Manager initialisieren
         self.streamdeck = StreamDeckManager()
         self.streamdeck.button_pressed.connect(self.trigger_scene_by_id)
+        self.streamdeck.bindings_changed.connect(self.prefetch_bound_scenes)
         
+        # Schieberegler und MIDI-Fader senden sehr oft, gespeichert wird erst, wenn sie ruhen
+        self.volume_save_timer = QTimer(self)
+        self.volume_save_timer.setSingleShot(True)
+        self.volume_save_timer.setInterval(500)
+        self.volume_save_timer.timeout.connect(save_layer_volumes)
+
         # UI aufbauen
         self.setup_ui()
+
+        # Geräte-Auslöser starten den Ton im Dispatcher-Thread, die Oberfläche folgt per Signal
+        self.playback_lock = threading.RLock()
+        self.dispatcher = InputDispatcher(self.catalog, self.start_scene_audio, parent=self)
+        self.dispatcher.triggered.connect(self.on_scene_triggered)
+        self.dispatcher.failed.connect(self.on_scene_failed)
+        self.streamdeck.dispatcher = self.dispatcher
+
+        # MIDI-Eingang: Noten lösen Szenen aus, Controller steuern die Ebenen
+        self.midi = MidiManager(self, dispatcher=self.dispatcher)
+        self.midi.layer_volume_changed.connect(self.on_layer_volume_changed)
+        self.midi.bindings_changed.connect(self.prefetch_bound_scenes)
+        self.midi.learn_finished.connect(self.on_midi_learned)
+        success, message = self.midi.open_port()
+        if not success:
+            print(f"[WARN] {message}")
         
         # StreamDeck verbinden wenn auto_connect aktiviert
         if self.streamdeck.config.get('auto_connect', True):
             success, message = self.streamdeck.connect_device()
             if not success:
                 QMessageBox.warning(self, "StreamDeck", message)
+
+        self.prefetch_bound_scenes()
                 
     def setup_ui(self):
         # Menü erstellen
@@ -108,38 +143,40 @@ class SoundboardApp(QMainWindow):
         layout = QVBoxLayout()
         main_widget.setLayout(layout)
         
-        # Szenen-Container
-        self.scenes_container = QWidget()
-        self.scenes_layout = QGridLayout()
-        self.scenes_layout.setSpacing(16)
-        self.scenes_container.setLayout(self.scenes_layout)
-        
-        # ScrollArea für Szenen
-        scroll = QScrollArea()
-        scroll.setWidget(self.scenes_container)
-        scroll.setWidgetResizable(True)
-        layout.addWidget(scroll)
+        # Szenen-Grid (Model/View, scrollt selbst)
+        self.scene_view = SceneGridView()
+        self.scene_view.scene_clicked.connect(self.play_scene_by_id)
+        self.scene_view.scene_context_requested.connect(self.show_scene_menu)
+        layout.addWidget(self.scene_view)
         
         # Status-Bar
         self.statusBar().showMessage("Bereit")
         
         self.current_track = None
         self.current_scene_name = None
+        self.current_scene_id = None
         self.current_start = 0
         self.current_duration = 0
+        self.current_layer = LAYER_AMBIENCE
         self.current_playing = False
         self.is_paused = False
-        self.elapsed = 0
 
+        # Fragt nur die Wiedergabe-Uhr der Audio-Engine ab, zählt selbst nichts mit
         self.timer = QTimer()
-        self.timer.setInterval(1000)
+        self.timer.setInterval(250)
         self.timer.timeout.connect(self.update_time)
 
+        # Szenen-Katalog: Mappings einmal laden, danach nur geänderte Dateien
+        self.catalog = get_catalog()
+        self.catalog.changed.connect(self.on_catalog_changed)
+
         # Hotkey-Manager initialisieren
         self.hotkey_manager = HotkeyManager(self)
         self.hotkey_manager.scene_triggered.connect(self.trigger_scene_by_hotkey)
+        self.hotkey_manager.bindings_changed.connect(self.prefetch_bound_scenes)
 
-        self.load_all_scenes()
+        self.scene_model = SceneListModel(self.catalog, self.get_hotkey, parent=self)
+        self.scene_view.setModel(self.scene_model)
 
         # Steuerungs-Buttons
         control_layout = QHBoxLayout()
@@ -149,14 +186,29 @@ class SoundboardApp(QMainWindow):
         self.stop_btn.clicked.connect(self.stop_playback)
         control_layout.addWidget(self.pause_btn)
         control_layout.addWidget(self.stop_btn)
+
+        # Lautstärke je Mixer-Ebene
+        self.layer_sliders = {}
+        for layer, label in LAYER_LABELS.items():
+            slider = QSlider(Qt.Horizontal)
+            slider.setRange(0, 100)
+            slider.setValue(int(get_layer_volume(layer) * 100))
+            slider.setToolTip(f"Lautstärke {label}")
+            slider.valueChanged.connect(lambda value, l=layer: self.on_slider_volume(l, value))
+            control_layout.addWidget(QLabel(label))
+            control_layout.addWidget(slider)
+            self.layer_sliders[layer] = slider
         layout.addLayout(control_layout)
 
     def trigger_scene_by_hotkey(self, mapping_file, scene_name):
         """Wird aufgerufen, wenn ein Hotkey gedrückt wird"""
-        data = load_mapping(mapping_file)
-        if scene_name in data.get("scenes", {}):
-            scene = data["scenes"][scene_name]
-            self.play_scene(data["track"], scene, scene_name)
+        self.dispatcher.push(make_scene_id(mapping_file, scene_name))
+
+    def prefetch_bound_scenes(self):
+        """Dekodiert alle per Hotkey/StreamDeck gebundenen Szenen im Hintergrund vor"""
+        scenes = (self.hotkey_manager.bound_scenes() + self.streamdeck.bound_scenes()
+                  + self.midi.bound_scenes())
+        self.prefetcher.schedule(scenes)
 
     def set_hotkey(self, mapping_file, scene_name):
         """Öffnet Dialog zum Setzen eines Hotkeys"""
@@ -168,181 +220,259 @@ class SoundboardApp(QMainWindow):
         )
         if ok and key:
             self.hotkey_manager.set_hotkey(mapping_file, scene_name, key)
+            self.refresh_scene_button(make_scene_id(mapping_file, scene_name))
 
     def remove_hotkey(self, mapping_file, scene_name):
         """Entfernt einen Hotkey"""
         self.hotkey_manager.remove_hotkey(mapping_file, scene_name)
+        self.refresh_scene_button(make_scene_id(mapping_file, scene_name))
 
     def load_all_scenes(self):
-        # GridLayout robust leeren
-        while self.scenes_layout.count():
-            item = self.scenes_layout.takeAt(0)
-            widget = item.widget()
-            if widget is not None:
-                widget.deleteLater()
-
-        mappings = list_all_track_mappings()
-        row = 0
-        col = 0
-        max_cols = 2  # Anzahl der Spalten
-        for file in mappings:
-            data = load_mapping(file)
-            track = data.get("track")
-            scenes = data.get("scenes", {})
-            for name, scene in scenes.items():
-                duration = scene.get("duration", 0)
-                icon_name = scene.get("icon")
-
-                # Hotkey-Info zum Button-Text hinzufügen
-                hotkey = self.hotkey_manager.hotkeys.get(file, {}).get(name, "")
-                btn_text = f"{name}\n({duration}s)"
-                if hotkey:
-                    btn_text += f"\n[{hotkey}]"
-
-                btn = QPushButton(btn_text)
-                btn.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-
-                if icon_name:
-                    icon_path = os.path.join(ICON_DIR, icon_name)
-                    if os.path.exists(icon_path):
-                        btn.setIcon(QIcon(QPixmap(icon_path)))
-                        btn.resizeEvent = lambda event, b=btn: b.setIconSize(
-                            QSize(int(b.width() * 0.6), int(b.height() * 0.6))
-                        )
-
-                is_active = (self.current_scene_name == name and self.current_playing)
-                btn.setStyleSheet(get_scene_button_style(is_active))
-                make_context_menu(btn, file, name, self)
-
-                btn.clicked.connect(lambda _, s=scene, t=track, n=name: self.play_scene(t, s, n))
-                self.scenes_layout.addWidget(btn, row, col)
-                col += 1
-                if col >= max_cols:
-                    col = 0
-                    row += 1
-
-    def play_scene(self, track, scene, name):
-        # Wenn die gleiche Szene bereits läuft, nur Pause/Weiter
-        if self.current_scene_name == name and self.current_playing:
-            self.pause_playback()
+        """Gleicht das Szenen-Grid mit dem Katalog ab"""
+        self.scene_model.sync()
+
+    def on_catalog_changed(self, added, removed, modified):
+        """Übernimmt Katalog-Änderungen ins Grid – nur betroffene Zeilen"""
+        self.scene_model.apply_catalog_diff(added, removed, modified)
+
+    def get_hotkey(self, mapping_file, scene_name):
+        return self.hotkey_manager.hotkeys.get(mapping_file, {}).get(scene_name, "")
+
+    def show_scene_menu(self, scene_id, global_pos):
+        entry = self.catalog.get_by_id(scene_id)
+        if entry:
+            make_context_menu(self, entry.mapping_file, entry.name).exec(global_pos)
+
+    def refresh_scene_button(self, scene_id):
+        """Zeichnet genau eine Kachel neu, z.B. nach Hotkey-Wechsel"""
+        self.scene_model.refresh(scene_id)
+
+    def _set_active_scene(self, scene_id):
+        # Nur die alte und die neue aktive Kachel werden neu gezeichnet
+        self.current_scene_id = scene_id
+        self.scene_model.set_active(scene_id, self.is_paused)
+        self.streamdeck.set_active(scene_id if self.current_playing else None, self.is_paused)
+        self.midi.set_active(scene_id if self.current_playing else None, self.is_paused)
+
+    def play_scene_by_id(self, scene_id):
+        entry = self.catalog.get_by_id(scene_id)
+        if entry:
+            try:
+                action = self.start_scene_audio(entry)
+            except Exception as e:
+                self.on_scene_failed(scene_id, str(e))
+                return
+            self.on_scene_triggered(scene_id, action)
+
+    def start_scene_audio(self, entry, gain=1.0):
+        """Startet den Ton einer Szene und übernimmt den Wiedergabezustand; liefert die Aktion.
+        gain (0.0 - 1.0, z.B. aus der MIDI-Anschlagstärke) gilt nur für diesen Sound.
+        Läuft auch im Dispatcher-Thread: nur Audio-Engine und Attribute, keine Widgets."""
+        scene = entry.scene
+        path = os.path.join(ASSET_DIR, entry.track)
+        layer = scene.get('layer', LAYER_AMBIENCE)
+        # Nur der im Mapping gespeicherte Wert; ohne ihn mit Originalpegel (Nachtrag im Hintergrund)
+        loudness = scene.get('loudness')
+
+        # Effekte laufen einmalig über den Schleifen und ändern den Szenen-Status nicht
+        if layer == LAYER_SFX:
+            play_oneshot(path, scene['start'], scene['duration'], loudness, gain)
+            return ACTION_ONESHOT
+
+        with self.playback_lock:
+            # Wenn die gleiche Szene bereits läuft, nur Pause/Weiter
+            if self.current_scene_id == entry.scene_id and self.current_playing:
+                return self._toggle_pause()
+
+            # Neue Szene starten; der Zustand wird erst übernommen, wenn der Ton wirklich läuft
+            crossfade = scene.get('crossfade', get_setting("crossfade_sec"))
+            play_loop_segment(path, scene['start'], scene['duration'], layer, crossfade, loudness, gain)
+            self.current_track = entry.track
+            self.current_scene_name = entry.name
+            self.current_scene_id = entry.scene_id
+            self.current_start = scene['start']
+            self.current_duration = scene['duration']
+            self.current_layer = layer
+            self.is_paused = False
+            self.current_playing = True
+            return ACTION_PLAY
+
+    def on_scene_triggered(self, scene_id, action):
+        """Zieht die Oberfläche nach einer Auslösung nach (GUI-Thread). Maßgeblich ist der
+        aktuelle Zustand, falls inzwischen schon die nächste Szene gestartet wurde."""
+        if action == ACTION_PLAY:
+            self.timer.start()
+        if action != ACTION_ONESHOT:
+            self._set_active_scene(self.current_scene_id if self.current_playing else None)
+            self.update_time()
+        self.backfill_loudness(scene_id)
+
+    def on_scene_failed(self, scene_id, message):
+        """Szene konnte nicht gestartet werden (GUI-Thread); der bisherige Zustand bleibt"""
+        entry = self.catalog.get_by_id(scene_id)
+        name = entry.name if entry else scene_id
+        self.statusBar().showMessage(f'"{name}" konnte nicht gestartet werden: {message}', 5000)
+
+    def backfill_loudness(self, scene_id):
+        """Trägt den Messwert bei älteren Szenen einmalig nach, danach kostet das Abspielen
+        keine Messung mehr. Die Analyse-Datei wird im Hintergrund gelesen, gespeichert wird
+        im GUI-Thread (save_loudness)."""
+        entry = self.catalog.get_by_id(scene_id)
+        if entry is None or 'loudness' in entry.scene or scene_id in self._backfilling:
             return
+        self._backfilling.add(scene_id)
+        threading.Thread(target=self._measure_loudness, args=(entry,), name="loudness-backfill",
+                         daemon=True).start()
 
-        # Neue Szene starten
-        self.current_track = track
-        self.current_scene_name = name
-        self.current_start = scene['start']
-        self.current_duration = scene['duration']
-        self.elapsed = 0
-        self.is_paused = False
-        self.current_playing = True
-        self.timer.start()
-        self.update_time()
-        path = os.path.join(ASSET_DIR, track)
-        play_loop_segment(path, self.current_start, self.current_duration)
-        self.load_all_scenes()
+    def _measure_loudness(self, entry):
+        try:
+            loudness = self.analysis.scene_loudness(entry.track, entry.scene['start'], entry.scene['duration'])
+        except Exception as e:
+            print(f"[WARN] Lautheit von {entry.name} nicht nachgetragen: {e}")
+            loudness = None
+        if loudness is None:
+            # Analyse liegt noch nicht vor: beim nächsten Auslösen erneut versuchen
+            self._backfilling.discard(entry.scene_id)
+            return
+        self._loudness_measured.emit(entry.scene_id, loudness)
 
-    def pause_playback(self):
-        from pygame import mixer
-        if self.current_playing:
+    def save_loudness(self, scene_id, loudness):
+        self._backfilling.discard(scene_id)
+        entry = self.catalog.get_by_id(scene_id)
+        if entry is None or 'loudness' in entry.scene:
+            return
+        data = self.catalog.get_mapping(entry.mapping_file)
+        if entry.name in data.get("scenes", {}):
+            data["scenes"][entry.name]["loudness"] = loudness
+            self.catalog.save(entry.mapping_file, data)
+
+    def _toggle_pause(self):
+        with self.playback_lock:
             if not self.is_paused:
-                mixer.music.pause()
+                pause_playback()
                 self.is_paused = True
-            else:
-                mixer.music.unpause()
-                self.is_paused = False
-            self.load_all_scenes()  # Aktualisiere UI nach Pause/Weiter
+                return ACTION_PAUSE
+            resume_playback()
+            self.is_paused = False
+            return ACTION_RESUME
+
+    def pause_playback(self):
+        if self.current_playing:
+            self._toggle_pause()
+            self.update_time()
+            self._set_active_scene(self.current_scene_id)  # Aktualisiere UI nach Pause/Weiter
 
     def stop_playback(self):
-        stop_playback()
-        self.current_playing = False
-        self.is_paused = False
+        with self.playback_lock:
+            stop_playback()
+            self.current_playing = False
+            self.is_paused = False
         self.timer.stop()
         self.update_time()
         self.statusBar().clearMessage()  # Anzeige leeren
-        self.load_all_scenes()
+        self._set_active_scene(None)
 
     def update_time(self):
-        if self.current_playing and not self.is_paused:
-            self.elapsed += 1
-            total = int(self.current_duration)
-            text = f'Szene: "{self.current_scene_name}" — Laufzeit: {self.elapsed}s / {total}s'
-            self.statusBar().showMessage(text)
-
-    def create_scene_button(self, scene_id, name, icon_path=None):
-        """Erstellt einen Button für eine Szene"""
-        btn = QPushButton(name)
-        btn.setProperty("scene_id", scene_id)
-        
-        if icon_path:
-            btn.setIcon(QIcon(icon_path))
-            
-        # Kontextmenü für StreamDeck-Mapping
-        btn.setContextMenuPolicy(Qt.CustomContextMenu)
-        btn.customContextMenuRequested.connect(
-            lambda pos, b=btn: self.show_scene_context_menu(pos, b)
-        )
-        
-        return btn
-        
-    def show_scene_context_menu(self, pos, button):
-        """Zeigt das Kontextmenü für eine Szene"""
-        menu = QMenu()
-        
-        # StreamDeck-Mapping
-        if self.streamdeck.device:
-            map_action = QAction("Auf StreamDeck mappen...", self)
-            map_action.triggered.connect(lambda: self.map_to_streamdeck(button))
-            menu.addAction(map_action)
-            
-            # Wenn bereits gemappt, Option zum Entfernen anzeigen
-            for key, mapping in self.streamdeck.button_mappings.items():
-                if mapping.get('scene_id') == button.property("scene_id"):
-                    unmap_action = QAction(f"StreamDeck-Mapping entfernen (Button {key})", self)
-                    unmap_action.triggered.connect(lambda k=key: self.unmap_from_streamdeck(k))
-                    menu.addAction(unmap_action)
-                    break
-                    
-        menu.exec_(button.mapToGlobal(pos))
-        
-    def map_to_streamdeck(self, button):
-        """Mapped eine Szene auf einen StreamDeck-Button"""
+        if not self.current_playing:
+            return
+        clock = get_position(self.current_layer)
+        if clock is None:
+            return
+        position, loops, length = clock
+        if length > 0:
+            self.streamdeck.set_progress(position / length)
+        text = (f'Szene: "{self.current_scene_name}" — Position: {position:.1f}s / {length:.1f}s'
+                f' — Durchlauf {loops + 1}')
+        if self.is_paused:
+            text += " (pausiert)"
+        self.statusBar().showMessage(text)
+
+    def map_to_streamdeck(self, scene_id):
+        """Legt eine Szene auf einen Button der angezeigten StreamDeck-Seite"""
         if not self.streamdeck.device:
             QMessageBox.warning(self, "StreamDeck", "Kein StreamDeck verbunden")
             return
-            
-        # Button auswählen
+        entry = self.catalog.get_by_id(scene_id)
+        if not entry:
+            return
+
+        # Button auswählen (die letzten Tasten sind zum Blättern reserviert)
+        last = self.streamdeck.slots_per_page - 1
         key, ok = QInputDialog.getInt(
             self,
             "StreamDeck Button",
-            "Button-Nummer (0-14):",
-            0, 0, 14
+            f"Button-Nummer auf Seite {self.streamdeck.page + 1} (0-{last}):",
+            0, 0, last
         )
-        
         if ok:
-            scene_id = button.property("scene_id")
-            name = button.text()
-            icon = button.icon().pixmap(72, 72).toImage()
-            
-            # Icon speichern
-            icon_path = f"scene_{scene_id}.png"
-            icon.save(os.path.join(ICON_DIR, icon_path))
-            
-            # Mapping erstellen
-            self.streamdeck.map_button(key, scene_id, name, icon_path)
-            
-    def unmap_from_streamdeck(self, key):
-        """Entfernt ein StreamDeck-Mapping"""
-        self.streamdeck.unmap_button(key)
+            self.streamdeck.map_button(key, scene_id, entry.name, entry.scene.get('icon'))
+
+    def unmap_from_streamdeck(self, scene_id):
+        """Entfernt eine Szene vom StreamDeck"""
+        self.streamdeck.unmap_scene(scene_id)
+
+    def auto_layout_streamdeck(self):
+        """Erstellt das StreamDeck-Layout neu: ein Ordner pro Mapping mit allen Szenen"""
+        reply = QMessageBox.question(
+            self, "StreamDeck",
+            "Das StreamDeck-Layout wird durch ein automatisch erzeugtes ersetzt. Fortfahren?"
+        )
+        if reply == QMessageBox.Yes:
+            self.streamdeck.apply_layout(StreamDeckLayout.from_catalog(self.catalog.scenes()))
         
     def trigger_scene_by_id(self, scene_id):
         """Löst eine Szene per ID aus"""
-        for i in range(self.scenes_layout.count()):
-            btn = self.scenes_layout.itemAt(i).widget()
-            if btn.property("scene_id") == scene_id:
-                btn.click()
-                break
+        self.dispatcher.push(scene_id)
+
+    def on_slider_volume(self, layer, value):
+        """Lautstärke sofort setzen, gespeichert wird erst nach dem Ziehen (Timer)"""
+        set_layer_volume(layer, value / 100, persist=False)
+        self.volume_save_timer.start()
+
+    def on_layer_volume_changed(self, layer, volume):
+        """Schieberegler nachziehen, wenn ein MIDI-Fader die Ebene ändert"""
+        slider = self.layer_sliders.get(layer)
+        if slider:
+            slider.blockSignals(True)
+            slider.setValue(int(volume * 100))
+            slider.blockSignals(False)
+        self.volume_save_timer.start()
+
+    def learn_midi(self, mapping_file, scene_name):
+        """Wartet auf die nächste Note am Controller und belegt damit die Szene"""
+        if self.midi.port is None:
+            QMessageBox.warning(self, "MIDI", "Kein MIDI-Eingang geöffnet")
+            return
+        self.midi.start_learn(mapping_file, scene_name)
+        self.statusBar().showMessage(f'MIDI lernen: Pad/Taste für "{scene_name}" drücken...')
+
+    def on_midi_learned(self, mapping_file, scene_name, binding):
+        if binding is None:
+            self.statusBar().showMessage("MIDI lernen abgebrochen", 3000)
+        else:
+            self.statusBar().showMessage(f'"{scene_name}" liegt auf {format_midi_binding(binding)}', 3000)
+
+    def select_midi_port(self):
+        """MIDI-Eingang auswählen"""
+        ports = self.midi.available_ports()
+        if not ports:
+            QMessageBox.warning(self, "MIDI", "Kein MIDI-Eingang gefunden")
+            return
+        current = ports.index(self.midi.port_name) if self.midi.port_name in ports else 0
+        port, ok = QInputDialog.getItem(self, "MIDI", "MIDI-Eingang:", ports, current, False)
+        if ok:
+            success, message = self.midi.select_port(port)
+            self.statusBar().showMessage(message, 3000)
+
+    def show_input_latency(self):
+        """Zeigt die gemessene Zeit vom Tastendruck bis zum Start des Tons"""
+        QMessageBox.information(self, "Eingabe-Latenz", self.dispatcher.latency.summary())
                 
     def closeEvent(self, event):
         """Wird beim Schließen der App aufgerufen"""
         self.streamdeck.disconnect_device()
+        self.midi.close_port()
+        self.dispatcher.shutdown()
+        self.prefetcher.shutdown()
+        self.analysis.shutdown()
         event.accept()
@@ -0,0 +1,355 @@
+# Datei: waveform_widget.py
+import threading
+import time
+import numpy as np
+from PySide6.QtWidgets import QWidget
+from PySide6.QtGui import QPainter, QColor, QPen, QPolygonF
+from PySide6.QtCore import Qt, Signal, QPointF, QLineF, QRectF
+from audio_decode import decode_pcm
+import audio
+
+MAX_PIXELS_PER_SAMPLE = 8  # stärkste Vergrößerung
+ZOOM_STEP = 1.25
+EDGE_GRAB_PX = 5           # Fangbereich für die Ränder der Auswahl
+SCRUB_GRAIN_SEC = 0.15     # Länge eines Vorschau-Schnipsels
+SCRUB_INTERVAL_SEC = 0.08  # Mindestabstand zwischen zwei Schnipseln
+
+def _format_time(seconds):
+    minutes, seconds = divmod(max(0.0, seconds), 60)
+    return f"{int(minutes):02}:{seconds:06.3f}"
+
+class ScrubPreview:
+    """Spielt beim Ziehen kurze Ausschnitte ab. Ein eigener Thread dekodiert,
+    und nur die jeweils letzte angeforderte Position wird gespielt.
+    stop() beendet den Thread; der nächste request() startet ihn bei Bedarf neu."""
+
+    def __init__(self):
+        self._pending = None
+        self._lock = threading.Lock()
+        self._event = threading.Event()
+        self._thread = None
+        self._stopped = False
+
+    def request(self, track_path, position):
+        with self._lock:
+            self._pending = (track_path, max(0.0, position))
+            if self._thread is None:
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run, name="scrub-preview", daemon=True)
+                self._thread.start()
+        self._event.set()
+
+    def stop(self):
+        """Beendet den Thread und die laufende Vorschau (z.B. beim Schließen des Dialogs)"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._stopped = True
+            self._pending = None
+        self._event.set()
+        if thread is not None:
+            thread.join(timeout=2)
+            audio.stop_preview()
+
+    def _run(self):
+        while True:
+            self._event.wait()
+            self._event.clear()
+            with self._lock:
+                if self._stopped:
+                    return
+                job, self._pending = self._pending, None
+            if job is None:
+                continue
+            try:
+                audio.play_preview(job[0], job[1], SCRUB_GRAIN_SEC)
+            except Exception as e:
+                print(f"[WARN] Vorschau fehlgeschlagen: {e}")
+            time.sleep(SCRUB_INTERVAL_SEC)
+
+class WaveformWidget(QWidget):
+    """Wellenform eines Tracks mit Zoom, ziehbarer Schleifen-Auswahl und Scrub-Vorschau.
+    Gezeichnet wird aus den vorberechneten Peak-Stufen der Track-Analyse; erst unterhalb
+    der feinsten Stufe wird der sichtbare Ausschnitt bei Bedarf dekodiert.
+    Mausrad zoomt um den Mauszeiger, Umschalt+Mausrad oder rechte Maustaste verschiebt."""
+
+    selection_changed = Signal(float, float)  # Start, Dauer in Sekunden
+    _samples_ready = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumHeight(120)
+        self.setFocusPolicy(Qt.WheelFocus)
+        self.analysis = None
+        self.track_path = None
+        self.view_start = 0.0         # Sekunde am linken Rand
+        self.seconds_per_pixel = 1.0
+        self.selection = None         # (Start, Ende) in Sekunden
+        self._drag = None             # "start", "end" oder "pan"
+        self._anchor = 0.0
+        self._pan_x = 0
+        self._samples = None          # (Startframe, Samples) für den Sample-Zoom
+        self._decoding = False
+        self._decode_failed = False
+        self._decode_lock = threading.Lock()
+        self.scrub = ScrubPreview()
+        self._samples_ready.connect(self.update)
+
+    # --- Daten und Ansicht ---
+
+    def set_track(self, analysis, track_path):
+        self.analysis = analysis
+        self.track_path = track_path
+        with self._decode_lock:
+            self._samples = None
+            self._decode_failed = False
+        self.zoom_to_fit()
+
+    @property
+    def duration(self):
+        return self.analysis.duration if self.analysis else 0.0
+
+    @property
+    def sample_rate(self):
+        return self.analysis.sample_rate if self.analysis else 1
+
+    def set_selection(self, start, duration):
+        """Setzt die Auswahl von außen (ohne selection_changed auszulösen)"""
+        if self.analysis:
+            start = min(max(0.0, start), self.duration)
+            end = min(start + max(0.0, duration), self.duration)
+        else:
+            end = start + duration
+        self.selection = (start, end)
+        self.update()
+
+    def zoom_to_fit(self):
+        self.view_start = 0.0
+        self.seconds_per_pixel = self.duration / max(1, self.width()) if self.analysis else 1.0
+        self.update()
+
+    def zoom_to_selection(self):
+        if not self.selection or self.selection[1] <= self.selection[0]:
+            return
+        start, end = self.selection
+        margin = (end - start) * 0.05
+        self.seconds_per_pixel = (end - start + 2 * margin) / max(1, self.width())
+        self.view_start = start - margin
+        self._clamp_view()
+        self.update()
+
+    def _clamp_view(self):
+        if not self.analysis:
+            return
+        width = max(1, self.width())
+        min_spp = 1.0 / (self.sample_rate * MAX_PIXELS_PER_SAMPLE)
+        max_spp = self.duration / width
+        self.seconds_per_pixel = min(max(self.seconds_per_pixel, min_spp), max(max_spp, min_spp))
+        self.view_start = min(max(0.0, self.view_start), max(0.0, self.duration - width * self.seconds_per_pixel))
+
+    def _x_for(self, seconds):
+        return (seconds - self.view_start) / self.seconds_per_pixel
+
+    def _seconds_at(self, x):
+        return min(max(0.0, self.view_start + x * self.seconds_per_pixel), self.duration)
+
+    def resizeEvent(self, event):
+        if self.analysis and self.view_start == 0.0 and self.seconds_per_pixel * event.oldSize().width() >= self.duration:
+            self.zoom_to_fit()  # Gesamtansicht bleibt Gesamtansicht
+        else:
+            self._clamp_view()
+        super().resizeEvent(event)
+
+    # --- Maus ---
+
+    def wheelEvent(self, event):
+        if not self.analysis:
+            return
+        delta = event.angleDelta()
+        if event.modifiers() & Qt.ShiftModifier or delta.x():
+            steps = (delta.x() or delta.y()) / 120
+            self.view_start -= steps * self.width() * 0.1 * self.seconds_per_pixel
+        else:
+            x = event.position().x()
+            anchor = self.view_start + x * self.seconds_per_pixel
+            self.seconds_per_pixel *= ZOOM_STEP ** (-delta.y() / 120)
+            self._clamp_view()
+            self.view_start = anchor - x * self.seconds_per_pixel
+        self._clamp_view()
+        self.update()
+
+    def mousePressEvent(self, event):
+        if not self.analysis:
+            return
+        x = event.position().x()
+        if event.button() in (Qt.RightButton, Qt.MiddleButton):
+            self._drag = "pan"
+            self._pan_x = x
+            return
+        if event.button() != Qt.LeftButton:
+            return
+        seconds = self._seconds_at(x)
+        if self.selection and abs(x - self._x_for(self.selection[0])) <= EDGE_GRAB_PX:
+            self._drag, self._anchor = "start", self.selection[1]
+        elif self.selection and abs(x - self._x_for(self.selection[1])) <= EDGE_GRAB_PX:
+            self._drag, self._anchor = "end", self.selection[0]
+        else:
+            self._drag, self._anchor = "end", seconds
+            self.selection = (seconds, seconds)
+        self.scrub.request(self.track_path, seconds)
+        self.update()
+
+    def mouseMoveEvent(self, event):
+        if not self._drag:
+            return
+        x = event.position().x()
+        if self._drag == "pan":
+            self.view_start -= (x - self._pan_x) * self.seconds_per_pixel
+            self._pan_x = x
+            self._clamp_view()
+            self.update()
+            return
+        seconds = self._seconds_at(x)
+        self.selection = (min(seconds, self._anchor), max(seconds, self._anchor))
+        self.scrub.request(self.track_path, seconds)
+        self._emit_selection()
+        self.update()
+
+    def mouseReleaseEvent(self, event):
+        if self._drag and self._drag != "pan":
+            self._emit_selection()
+        self._drag = None
+
+    def mouseDoubleClickEvent(self, event):
+        self.zoom_to_selection()
+
+    def _emit_selection(self):
+        start, end = self.selection
+        self.selection_changed.emit(start, end - start)
+
+    # --- Zeichnen ---
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#2b2b2b"))
+        if not self.analysis:
+            painter.setPen(QColor("#888"))
+            painter.drawText(self.rect(), Qt.AlignCenter, "Wellenform wird berechnet...")
+            return
+
+        width, height = self.width(), self.height()
+        mid = height / 2
+
+        # Auswahl
+        if self.selection:
+            left, right = (self._x_for(t) for t in self.selection)
+            painter.fillRect(QRectF(left, 0, max(1.0, right - left), height), QColor(255, 215, 0, 50))
+
+        samples_per_pixel = self.seconds_per_pixel * self.sample_rate
+        columns = None
+        drawn = False
+        if samples_per_pixel < self.analysis.levels[0][0]:
+            samples = self._visible_samples(width, samples_per_pixel)
+            if samples is not None and samples_per_pixel < 1:
+                self._draw_samples(painter, samples, samples_per_pixel, mid)
+                drawn = True
+            elif samples is not None:
+                columns = self._sample_columns(samples, width, samples_per_pixel)
+        if columns is None and not drawn:
+            # Bis die Samples da sind, reicht die feinste Stufe als Platzhalter
+            columns = self._level_columns(width, samples_per_pixel)
+        if columns is not None:
+            peaks, rms = columns
+            painter.setPen(QPen(QColor("#4a90d9"), 1))
+            painter.drawLines([QLineF(x, mid - p * mid, x, mid + p * mid) for x, p in enumerate(peaks) if p > 0])
+            painter.setPen(QPen(QColor("#8cc4ff"), 1))
+            painter.drawLines([QLineF(x, mid - r * mid, x, mid + r * mid) for x, r in enumerate(rms) if r > 0])
+
+        # Ränder der Auswahl und Zeitangaben
+        painter.setPen(QColor("#FFD700"))
+        if self.selection:
+            for t in self.selection:
+                x = self._x_for(t)
+                painter.drawLine(QLineF(x, 0, x, height))
+        painter.setPen(QColor("#aaa"))
+        painter.drawText(4, 14, _format_time(self.view_start))
+        end_text = _format_time(self.view_start + width * self.seconds_per_pixel)
+        painter.drawText(QRectF(0, 0, width - 4, 18), Qt.AlignRight | Qt.AlignVCenter, end_text)
+
+    def _level_columns(self, width, samples_per_pixel):
+        """Peak/RMS je Pixelspalte aus der passenden Stufe; Aufwand ~ Breite, nie ~ Tracklänge"""
+        block, peaks, rms = self.analysis.level_for(samples_per_pixel)
+        start_frame = self.view_start * self.sample_rate
+        edges = ((start_frame + np.arange(width + 1) * samples_per_pixel) / block).astype(np.int64)
+        edges = np.clip(edges, 0, len(peaks))
+        first, last = edges[0], edges[-1]
+        if last <= first:
+            return None
+        visible_peaks = peaks[first:last].astype(np.float32) / 255.0
+        visible_rms = rms[first:last].astype(np.float32) / 255.0
+        starts = np.minimum(edges[:-1] - first, last - first - 1)
+        counts = np.maximum(edges[1:] - edges[:-1], 1)
+        column_peaks = np.maximum.reduceat(visible_peaks, starts)
+        column_rms = np.sqrt(np.add.reduceat(visible_rms ** 2, starts) / counts)
+        empty = edges[:-1] >= len(peaks)
+        column_peaks[empty] = 0
+        column_rms[empty] = 0
+        return column_peaks, np.minimum(column_rms, column_peaks)
+
+    def _sample_columns(self, samples, width, samples_per_pixel):
+        start_frame, data = samples
+        offset = self.view_start * self.sample_rate - start_frame
+        edges = np.clip((offset + np.arange(width + 1) * samples_per_pixel).astype(np.int64), 0, len(data))
+        if edges[-1] <= edges[0]:
+            return None
+        visible = np.abs(data[edges[0]:edges[-1]])
+        starts = np.minimum(edges[:-1] - edges[0], len(visible) - 1)
+        counts = np.maximum(edges[1:] - edges[:-1], 1)
+        column_peaks = np.minimum(np.maximum.reduceat(visible, starts), 1.0)
+        column_rms = np.sqrt(np.add.reduceat(visible ** 2, starts) / counts)
+        return column_peaks, np.minimum(column_rms, column_peaks)
+
+    def _draw_samples(self, painter, samples, samples_per_pixel, mid):
+        # Stärkste Vergrößerung: einzelne Samples als Linienzug
+        start_frame, data = samples
+        first = int(self.view_start * self.sample_rate) - start_frame
+        count = int(self.width() * samples_per_pixel) + 2
+        visible = data[max(0, first):max(0, first + count)]
+        origin = self._x_for((start_frame + max(0, first)) / self.sample_rate)
+        step = 1.0 / samples_per_pixel
+        painter.setPen(QPen(QColor("#8cc4ff"), 1))
+        painter.drawPolyline(QPolygonF([QPointF(origin + i * step, mid - v * mid) for i, v in enumerate(visible)]))
+
+    def _visible_samples(self, width, samples_per_pixel):
+        """Dekodierte Samples für den sichtbaren Bereich oder None (Dekodierung läuft dann)"""
+        first = int(self.view_start * self.sample_rate)
+        last = first + int(width * samples_per_pixel) + 1
+        with self._decode_lock:
+            samples = self._samples
+            if samples is not None and samples[0] <= first and samples[0] + len(samples[1]) >= last:
+                return samples
+            if self._decoding or self._decode_failed:
+                return None
+            self._decoding = True
+        # Eine Bildschirmbreite Vorrat links und rechts, damit Verschieben nicht sofort neu dekodiert
+        margin = last - first
+        start = max(0, first - margin)
+        threading.Thread(target=self._decode, args=(self.track_path, start, last + margin - start),
+                         name="waveform-decode", daemon=True).start()
+        return None
+
+    def _decode(self, track_path, start_frame, frames):
+        samples = None
+        try:
+            pcm = decode_pcm(track_path, start_frame / self.sample_rate, frames / self.sample_rate,
+                             self.sample_rate, 1, "f32le")
+            if pcm:
+                samples = (start_frame, np.frombuffer(pcm, dtype="<f4"))
+        except Exception as e:
+            print(f"[WARN] Wellenform-Ausschnitt konnte nicht dekodiert werden: {e}")
+        with self._decode_lock:
+            self._decoding = False
+            self._decode_failed = samples is None
+            if samples is not None and track_path == self.track_path:
+                self._samples = samples
+        if samples is not None:
+            self._samples_ready.emit()
@@ -2,12 +2,35 @@ import os
 import json
 import yt_dlp
 import shutil
+import threading
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QLabel, QLineEdit, QPushButton, QMessageBox,
-    QProgressBar, QTextEdit, QApplication
+    QProgressBar, QTextEdit, QApplication, QListWidget, QHBoxLayout
 )
 from PySide6.QtCore import Qt, QThread, Signal, QMetaObject, QObject
 from config import MAPPING_DIR, FFMPEG_DIR, ASSET_DIR
+from settings import get_setting
+from track_store import get_track_store
+from audio_analysis import get_analysis_service
+from import_pipeline import (
+    BulkImportPipeline, STAGE_QUEUED, STAGE_DOWNLOAD, STAGE_TRANSCODE, STAGE_DONE,
+    STAGE_ERROR, STAGE_CANCELLED
+)
+
+def register_imported_track(filepath):
+    """Meldet einen importierten Track im Track-Store an und legt sein leeres Mapping-JSON an.
+    Gibt den gültigen Dateinamen zurück (bei Duplikaten den des vorhandenen Tracks)."""
+    filename = os.path.basename(filepath)
+    # Gleicher Inhalt schon vorhanden? Dann wird die neue Datei verworfen
+    filename, duplicate = get_track_store().register(filename)
+    if duplicate:
+        return filename
+    get_analysis_service().submit(filename)
+    json_path = os.path.join(MAPPING_DIR, os.path.splitext(filename)[0] + ".json")
+    if not os.path.exists(json_path):
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({"track": filename, "scenes": {}}, f, indent=4)
+    return filename
 
 class YoutubeDownloadWorker(QThread):
     progress_changed = Signal(int)
@@ -135,11 +158,9 @@ class YoutubeImportDialog(QDialog):
         self.import_btn.setEnabled(True)
         self.progress.setRange(0, 100)
         if success:
-            filename = os.path.basename(filepath)
-            json_path = os.path.join(MAPPING_DIR, os.path.splitext(filename)[0] + ".json")
-            if not os.path.exists(json_path):
-                with open(json_path, "w", encoding="utf-8") as f:
-                    json.dump({"track": filename, "scenes": {}}, f, indent=4)
+            filename = register_imported_track(filepath)
+            if filename != os.path.basename(filepath):
+                message = f"Dieser Track ist bereits als '{filename}' im Soundboard."
 
             self.set_status("Track erstellt!")
             QMessageBox.information(self, "Erfolg", message)
@@ -150,6 +171,15 @@ class YoutubeImportDialog(QDialog):
 
 bulk_workers = []
 
+STAGE_LABELS = {
+    STAGE_QUEUED: "Wartet",
+    STAGE_DOWNLOAD: "Download",
+    STAGE_TRANSCODE: "Konvertierung",
+    STAGE_DONE: "Fertig",
+    STAGE_ERROR: "Fehler",
+    STAGE_CANCELLED: "Abgebrochen",
+}
+
 class YoutubeBulkImportDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -163,63 +193,116 @@ class YoutubeBulkImportDialog(QDialog):
         self.links_edit.setPlaceholderText("https://youtube.com/...")
         layout.addWidget(self.links_edit)
 
+        # Status je Link
+        self.item_list = QListWidget()
+        self.item_list.setVisible(False)
+        layout.addWidget(self.item_list)
+
         self.progress = QProgressBar()
         self.progress.setAlignment(Qt.AlignCenter)
         self.progress.setValue(0)
         layout.addWidget(self.progress)
 
+        btn_layout = QHBoxLayout()
         self.start_btn = QPushButton("Bulk-Import starten")
         self.start_btn.clicked.connect(self.start_bulk_import)
-        layout.addWidget(self.start_btn)
+        self.cancel_btn = QPushButton("Abbrechen")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel_bulk_import)
+        btn_layout.addWidget(self.start_btn)
+        btn_layout.addWidget(self.cancel_btn)
+        layout.addLayout(btn_layout)
 
         self.setLayout(layout)
         self.worker = None
+        self.links = []
 
     def start_bulk_import(self):
         links = [l.strip() for l in self.links_edit.toPlainText().splitlines() if l.strip()]
         if not links:
             QMessageBox.warning(self, "Fehler", "Bitte gib mindestens einen YouTube-Link ein.")
             return
+        self.links = links
         self.start_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+        self.links_edit.setReadOnly(True)
+        self.item_list.clear()
+        self.item_list.addItems(links)
+        self.item_list.setVisible(True)
         self.progress.setMaximum(len(links))
         self.progress.setValue(0)
         global bulk_workers
         self.worker = YoutubeBulkWorker(links)
         bulk_workers.append(self.worker)
         self.worker.progress_changed.connect(self.progress.setValue)
+        self.worker.item_progress.connect(self.on_item_progress)
         self.worker.show_result.connect(show_bulk_result_message)
-        self.worker.finished.connect(lambda _: bulk_workers.remove(self.worker))
+        self.worker.finished.connect(self.on_finished)
         self.worker.start()
+
+    def cancel_bulk_import(self):
+        if self.worker:
+            self.cancel_btn.setEnabled(False)
+            self.worker.cancel()
+
+    def on_item_progress(self, index, stage, percent):
+        text = STAGE_LABELS.get(stage, stage)
+        if stage in (STAGE_DOWNLOAD, STAGE_TRANSCODE) and percent:
+            text += f" {percent}%"
+        self.item_list.item(index).setText(f"{text} — {self.links[index]}")
+
+    def on_finished(self, _results):
+        if self.worker in bulk_workers:
+            bulk_workers.remove(self.worker)
         self.accept()
 
+    def reject(self):
+        # Schließen während des Imports bricht ab, statt den Worker zu verwaisen
+        if self.worker and self.worker.isRunning():
+            self.cancel_bulk_import()
+            return
+        super().reject()
+
 class YoutubeBulkWorker(QThread):
     progress_changed = Signal(int)
+    item_progress = Signal(int, str, int)  # Index, Stufe, Prozent
     finished = Signal(list)  # Liste von (ok, link, err)
     show_result = Signal(list)  # NEU: Ergebnis an Hauptthread
 
-    def __init__(self, links):
+    def __init__(self, links, ydl_factory=None, transcoder=None):
         super().__init__(None)  # Kein Parent!
         self.links = links
         self.results = []
+        self._done = 0
+        self._done_lock = threading.Lock()
+        kwargs = {}
+        if ydl_factory:
+            kwargs['ydl_factory'] = ydl_factory
+        if transcoder:
+            kwargs['transcoder'] = transcoder
+        self.pipeline = BulkImportPipeline(
+            links, ASSET_DIR,
+            download_workers=get_setting("import_download_workers"),
+            transcode_workers=get_setting("import_transcode_workers") or os.cpu_count() or 2,
+            on_progress=self._on_progress,
+            on_track=register_imported_track,
+            **kwargs
+        )
+
+    def cancel(self):
+        self.pipeline.cancel()
+
+    def _on_progress(self, index, stage, percent):
+        # Läuft in den Pipeline-Threads; Signale werden in den Hauptthread zugestellt
+        self.item_progress.emit(index, stage, percent)
+        if stage in (STAGE_DONE, STAGE_ERROR, STAGE_CANCELLED):
+            with self._done_lock:
+                self._done += 1
+                done = self._done
+            self.progress_changed.emit(done)
 
     def run(self):
-        from config import ASSET_DIR, MAPPING_DIR
-        import os, json
-        for idx, link in enumerate(self.links, 1):
-            try:
-                worker = YoutubeDownloadWorker(link, ASSET_DIR)
-                worker.run()  # synchron!
-                # Mapping-JSON wie beim Einzelimport anlegen
-                if worker.downloaded_file:
-                    filename = os.path.basename(worker.downloaded_file)
-                    json_path = os.path.join(MAPPING_DIR, os.path.splitext(filename)[0] + ".json")
-                    if not os.path.exists(json_path):
-                        with open(json_path, "w", encoding="utf-8") as f:
-                            json.dump({"track": filename, "scenes": {}}, f, indent=4)
-                self.results.append((True, link, None))
-            except Exception as e:
-                self.results.append((False, link, str(e)))
-            self.progress_changed.emit(idx)
+        self.results = self.pipeline.run()
         # Abschlussmeldung per Signal an Hauptthread
         self.show_result.emit(self.results)
         self.finished.emit(self.results)
@@ -234,4 +317,4 @@ def show_bulk_result_message(results):
         msg = "Folgende Links konnten nicht importiert werden:\n\n"
         for ok, link, err in errors:
             msg += f"{link}\nFehler: {err}\n\n"
-        QMessageBox.warning(app.activeWindow(), "Fehler beim Import", msg)
\ No newline at end of file
+        QMessageBox.warning(app.activeWindow(), "Fehler beim Import", msg)